@@ -4,13 +4,9 @@ import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
-import os, shutil, re, certifi, requests
-from bs4 import BeautifulSoup
+import os
 import datetime as dt
-import yfinance as yf
-from pykrx import stock
-from sklearn.metrics import mean_squared_error, mean_absolute_error 
-import joblib 
+from quotes import configured_tickers, quote_service
 
 try:
     from dotenv import load_dotenv
@@ -19,43 +15,48 @@ try:
 except ImportError:
     print("WARNING: python-dotenv 라이브러리가 설치되지 않았습니다. pip install python-dotenv 로 설치해 주세요.")
     
+# 🚨 [수정] TensorFlow/scikit-learn/크롤러는 services 를 통해 첫 사용 시에만 로드 (콜드 스타트 단축)
 try:
-    from lstm_model import train_lstm_model
-    from predict import predict_next_month
-    from data_loader import load_stock_data, get_english_name
-    from news_scraper import scrape_investing_news_titles_selenium 
+    from services import get_runner, scrape_news_with_tier, missing_modules
+    from data_loader import load_stock_data, get_english_name, get_korean_fundamentals
+    from ohlcv_store import read_metadata
+    from model_registry import artifacts_exist, delete_artifacts, read_best_config, registry
+    from scaling import inverse_column
+    from symbols import get_index as get_ticker_index
+    from metadata import get_metadata, start_prewarm
+    if missing_modules():
+        raise ImportError(f"No module named {', '.join(missing_modules())}")
     HAS_MODEL_FILES = True
 except ImportError as e:
     st.warning(f"경고: 필요한 모듈 중 일부를 찾을 수 없습니다. ({e})")
     st.warning("모델 학습 및 예측, 뉴스 기능이 비활성화됩니다. 파일을 확인해 주세요.")
     HAS_MODEL_FILES = False
 
+if HAS_MODEL_FILES:
+    # 인기 종목 메타데이터(영문명/컨센서스)를 프로세스당 한 번 백그라운드로 미리 받아 둠
+    start_prewarm(configured_tickers())
+
 # 🚨 [수정] RMSE, MAE 계산 함수 이름 변경 및 MAPE 로직 분리
 def calculate_scaled_metrics(y_true_scaled, y_pred_scaled):
     """정규화된 값을 기반으로 RMSE와 MAE를 계산합니다."""
     y_true_scaled = np.array(y_true_scaled).flatten()
     y_pred_scaled = np.array(y_pred_scaled).flatten()
 
-    rmse = np.sqrt(mean_squared_error(y_true_scaled, y_pred_scaled))
-    mae = mean_absolute_error(y_true_scaled, y_pred_scaled)
+    # scikit-learn 을 가져오지 않도록 numpy 로 직접 계산
+    rmse = np.sqrt(np.mean((y_true_scaled - y_pred_scaled) ** 2))
+    mae = np.mean(np.abs(y_true_scaled - y_pred_scaled))
 
     return rmse, mae
 
 # 🚨 [추가] MAPE는 실제 값(역변환)을 기반으로 계산하는 함수
-def calculate_mape_from_scaled(y_true_scaled, y_pred_scaled, scaler_path, features):
-    """Scaled 값을 받아 스케일러를 로드하여 역변환 후 MAPE를 계산합니다."""
+def calculate_mape_from_scaled(y_true_scaled, y_pred_scaled, symbol, time_steps, features, mode="step"):
+    """Scaled 값을 받아 레지스트리의 스케일러로 역변환 후 MAPE를 계산합니다."""
     try:
-        scaler = joblib.load(scaler_path)
+        scaler = registry.get_scaler(symbol, time_steps, mode)
         
-        # 실제 주가 역변환
-        dummy_true = np.zeros((len(y_true_scaled), len(features)))
-        dummy_true[:, 0] = y_true_scaled.flatten()
-        y_true_inverse = scaler.inverse_transform(dummy_true)[:, 0]
-
-        # 예측 주가 역변환
-        dummy_pred = np.zeros((len(y_pred_scaled), len(features)))
-        dummy_pred[:, 0] = y_pred_scaled.flatten()
-        y_pred_inverse = scaler.inverse_transform(dummy_pred)[:, 0]
+        # 🚨 [수정] 더미 행렬 없이 종가 열만 역변환
+        y_true_inverse = inverse_column(scaler, np.ravel(y_true_scaled))
+        y_pred_inverse = inverse_column(scaler, np.ravel(y_pred_scaled))
         
         # MAPE 계산
         epsilon = 1e-10
@@ -76,151 +77,6 @@ st.markdown("""
 MODEL_DIR = "models"
 os.makedirs(MODEL_DIR, exist_ok=True)
 
-@st.cache_data(show_spinner=False, ttl=3600)
-def get_korean_fundamentals(code: str) -> dict:
-    data = {"per": None, "pbr": None, "psr":None, "foreign_ownership": None, "dividend_yield": None, "market_cap": None}
-
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
-        "Accept-Language": "ko-KR,ko;q=0.9"
-    }
-    
-    def parse_money(text: str) -> float:
-        text = re.sub(r"[,\s]", "", text)
-        val = 0.0
-
-        trillion_match = re.search(r"([\d\.]+)조", text)
-        if trillion_match:
-            val += float(trillion_match.group(1))
-            text = re.sub(r"[\d\.]*조", "", text)
-        
-        billion_match = re.search(r"([\d\.]+)", text)
-        if billion_match:
-            billion_value = float(billion_match.group(1))
-            val += billion_value / 10_000 
-            
-        return val
-
-
-    try:
-        url = f"https://finance.naver.com/item/main.naver?code={code}"
-        resp = requests.get(url, headers=headers, timeout=20, verify=certifi.where())
-        resp.raise_for_status()
-    except Exception as e:
-        st.warning(f"네이버 접속 실패: {e}")
-        return data
-
-    soup = BeautifulSoup(resp.text, "lxml")
-
-    per_tag = soup.find("em", id="_per")
-    if per_tag:
-        per_text = per_tag.get_text(strip=True).replace(",", "")
-        try:
-            data["per"] = round(float(per_text), 2)
-        except:
-            pass
-            
-    pbr_tag = soup.find("em", id="_pbr")
-    if pbr_tag:
-        pbr_text = pbr_tag.get_text(strip=True).replace(",", "")
-        try:
-            data["pbr"] = round(float(pbr_text), 2)
-        except:
-            pass
-
-    psr_tag = soup.find("em", id="_psr")
-    if psr_tag:
-        psr_text = psr_tag.get_text(strip=True).replace(",", "")
-        try:
-            data["psr"] = round(float(psr_text), 2)
-        except:
-            pass
-
-    for pattern in [
-        r"외국인[^\d]*([\d,]+\.\d+)%",
-        r"외국인\s*지분율[^\d]*([\d,]+\.\d+)%",
-        r"외국인\s*[\[\(][^%\d]*([\d,]+\.\d+)%[\]\)]"
-    ]:
-        m = re.search(pattern, soup.get_text())
-        if m:
-            data["foreign_ownership"] = float(m.group(1).replace(",", ""))
-            break
-
-    div_text = soup.select_one("th:contains('배당수익률')")
-    if div_text:
-        row = div_text.find_parent("tr")
-        if row:
-            tds = row.find_all("td")
-            for td in tds:
-                txt = td.get_text(strip=True)
-                m = re.search(r"([\d,]+\.\d+)%", txt)
-                if m:
-                    data["dividend_yield"] = float(m.group(1).replace(",", ""))
-                    break
-
-    if not data["dividend_yield"]:
-        for p in [
-            r"배당수익률[^\d]*([\d,]+\.\d+)%",
-            r"배당수익률\s*\[?\s*TTM\s*\]?\s*[^\d]*([\d,]+\.\d+)%",
-            r"배당수익률\s*[:\-]?\s*([\d,]+\.\d+)%"
-        ]:
-            m = re.search(p, soup.get_text())
-            if m:
-                data["dividend_yield"] = float(m.group(1).replace(",", ""))
-                break
-
-    market_cap = None
-    
-    mcap_tag = soup.find("em", id="_market_sum")
-    mcap_text = ""
-    if mcap_tag:
-        mcap_text = mcap_tag.get_text(strip=True)
-        market_cap = parse_money(mcap_text)
-
-    if market_cap is not None and market_cap > 0:
-        data["market_cap"] = round(market_cap, 2)
-    else:
-        if not mcap_tag:
-            st.warning(f"시가총액 조회 실패: Naver 페이지에서 '_market_sum' 태그를 찾을 수 없습니다. (코드: {code})")
-        elif mcap_tag and market_cap == 0.0:
-            st.warning(f"시가총액 조회 실패: 파싱 실패 또는 시가총액이 0입니다. (원문: '{mcap_text}', 코드: {code})")
-        else:
-            st.warning(f"시가총액 조회 실패: 기타 원인 (코드: {code})")
-            
-        return data
-
-    try:
-        annual_table = soup.find("table", summary="연간 실적")
-        if annual_table:
-            rows = annual_table.find_all("tr")
-            for row in rows:
-                th = row.find("th")
-                if th and "매출액" in th.get_text():
-                    tds = row.find_all("td")
-                    if len(tds) > 0:
-                        revenue_text = tds[0].get_text(strip=True)
-                        revenue_in_trillion = parse_money(revenue_text)
-                        if revenue_in_trillion > 0 and data["market_cap"]:
-                            data["psr"] = round(data["market_cap"] / revenue_in_trillion, 2)
-                            break
-
-        if not data["psr"]:
-            revenue_row = soup.find("th", string=re.compile("매출액"))
-            if revenue_row:
-                parent_tr = revenue_row.find_parent("tr")
-                if parent_tr:
-                    revenue_text = parent_tr.find_all("td")[0].get_text(strip=True)
-                    revenue_in_trillion = parse_money(revenue_text)
-                    if "억" in revenue_text:
-                        revenue_in_trillion = revenue_in_trillion / 10000
-                    if revenue_in_trillion > 0 and data["market_cap"]:
-                        data["psr"] = round(data["market_cap"] / revenue_in_trillion, 2)
-
-    except Exception as e:
-        pass
-    
-    return data
-
 def visualize_prediction(df_actual, df_prediction, symbol):
     df_actual_plot = df_actual.rename(columns={'Close': '종가'})
     df_prediction_plot = df_prediction.rename(columns={'Close': '종가'})
@@ -270,48 +126,64 @@ def visualize_prediction(df_actual, df_prediction, symbol):
     st.plotly_chart(fig, width='stretch')
 
 def get_top_stocks():
-    TOP_TICKERS = {
-        "005930.KS": "삼성전자",
-        "373220.KS": "LG에너지솔루션",
-        "000660.KS": "SK하이닉스",
-        "005490.KS": "POSCO홀딩스",
-        "035420.KS": "네이버",
-    }
-    top_stocks_list = []
-    
-    for ticker, name in TOP_TICKERS.items():
-        try:
-            stock_info = yf.Ticker(ticker).history(period="2d")
-            
-            current_price = stock_info['Close'].iloc[-1] if not stock_info.empty else 0
-            if len(stock_info) >= 2:
-                previous_close = stock_info['Close'].iloc[-2]
-                change_pct = ((current_price - previous_close) / previous_close) * 100
-            else:
-                change_pct = 0.0
-
-            top_stocks_list.append({
-                "name": name,
-                "ticker": ticker,
-                "price": current_price,
-                "change_pct": change_pct,
-            })
-        except Exception:
-            top_stocks_list.append({"name": name, "ticker": ticker, "price": 0, "change_pct": 0.0})
-            
-    return top_stocks_list
+    # 🚨 [수정] 종목별 순차 요청 대신 일괄 다운로드 + 세션 공유 TTL 캐시 (오래된 값은 즉시 반환 후 백그라운드 갱신)
+    return quote_service.get()
 
 def select_stock(name, ticker):
     st.session_state.input_temp = f"{name} [{ticker}]"
     st.session_state.company_name = name 
     
-    for k in ['df', 'symbol', 'model_trained', 'pred_df', 'final_price', 'interpretation', 'test_y_true', 'test_y_pred', 'test_dates']:
+    st.session_state.pop('ts_select', None)   # 새 종목의 기본 Time Steps 적용
+    for k in ['df', 'symbol', 'model_trained', 'pred_df', 'final_price', 'interpretation', 'test_y_true', 'test_y_pred', 'test_dates', 'job_id']:
         if k in st.session_state:
              st.session_state[k] = pd.DataFrame() if k in ['df','pred_df'] else False if k=='model_trained' else None
 
+@st.fragment(run_every=1)
+def job_status_panel(symbol, time_steps, company):
+    """백그라운드 작업 진행 상황을 1초마다 폴링하고, 끝나면 결과를 세션에 반영합니다."""
+    job = get_runner().get(st.session_state.job_id)
+    if job is None:
+        st.session_state.job_id = None
+        return
+
+    label = {"train": "모델 학습", "fine_tune": "증분 업데이트"}.get(job['kind'], "30일 예측")
+    if job['status'] in ('queued', 'running'):
+        st.progress(job['progress'], text=f"{label}: {job['message'] or '대기 중'}")
+        return
+
+    st.session_state.job_id = None
+    if job['status'] == 'error':
+        st.error(f"{label} 실패: {job['error']}")
+        return
+
+    result = job['result']
+    if job['kind'] == 'fine_tune':
+        # 결과 메시지는 전체 화면의 증분 업데이트 버튼 아래에 표시
+        st.session_state.fine_tune_result = result
+        st.rerun()
+        return
+
+    st.session_state.model_symbol = job['symbol']
+    st.session_state.model_time_steps = job['time_steps']
+    st.session_state.model_mode = job['mode']
+    if job['kind'] == 'train':
+        st.session_state.test_y_true = np.array(result['test_y_true'])
+        st.session_state.test_y_pred = np.array(result['test_y_pred'])
+        st.session_state.test_dates = pd.to_datetime(result['test_dates'])
+        st.session_state.model_trained = True
+        # 학습이 끝나면 이어서 예측 작업 제출
+        st.session_state.job_id = get_runner().submit("predict", symbol, time_steps, job['mode'], company=company)
+        return
+
+    st.session_state.pred_df = pd.DataFrame({'Close': result['close']}, index=pd.to_datetime(result['dates']))
+    st.session_state.final_price = result['final_price']
+    st.session_state.interpretation = result['interpretation']
+    st.session_state.model_trained = True
+    st.rerun()  # 예측 후 전체 화면 갱신
+
 keys = ['company_name','df','symbol','model_trained','time_steps','input_temp',
         'pred_df','final_price','interpretation','model_symbol','model_time_steps',
-        'test_y_true', 'test_y_pred', 'test_dates']
+        'test_y_true', 'test_y_pred', 'test_dates', 'job_id']
 for k in keys:
     if k not in st.session_state:
         st.session_state[k] = "" if k in ['company_name','input_temp','interpretation'] else \
@@ -324,7 +196,8 @@ def submit():
     
     if name and name != st.session_state.company_name:
         st.session_state.company_name = name
-        for k in ['df','symbol','model_trained','pred_df','final_price','interpretation', 'test_y_true', 'test_y_pred','test_dates']:
+        st.session_state.pop('ts_select', None)
+        for k in ['df','symbol','model_trained','pred_df','final_price','interpretation', 'test_y_true', 'test_y_pred','test_dates', 'job_id']:
              st.session_state[k] = pd.DataFrame() if k in ['df','pred_df'] else False if k=='model_trained' else None
 
 top_stocks = get_top_stocks()
@@ -358,10 +231,20 @@ with col_main:
         "주식 이름 입력 → **Enter**",
         key="input_temp",
         on_change=submit,
-        placeholder="예: 셀트리온, 풍산, 카카오",
+        placeholder="예: 셀트리온, 풍산, 카카오, ㅋㅋㅇ, 005930",
         label_visibility="collapsed"
     )
 
+    # 🚨 [추가] 로컬 종목 마스터 기반 추천 (네트워크 요청 없음)
+    query = st.session_state.input_temp.strip()
+    if query and HAS_MODEL_FILES:
+        suggestions = get_ticker_index().search(query, 5)
+        if suggestions and suggestions[0].kind != "exact":
+            st.caption("추천 종목 (클릭하여 선택)")
+            for col, m in zip(st.columns(len(suggestions)), suggestions):
+                col.button(f"{m.name} ({m.symbol})", key=f"suggest_{m.code}",
+                           on_click=select_stock, args=(m.name, m.symbol), width='stretch')
+
 if st.session_state.company_name and st.session_state.df.empty and HAS_MODEL_FILES:
     with st.spinner(f"'{st.session_state.company_name}' 데이터 로딩 중..."):
         try:
@@ -383,6 +266,11 @@ if not st.session_state.df.empty:
     company = st.session_state.company_name
 
     st.markdown(f"# {company} ({symbol})")
+    store_meta = read_metadata(symbol.split(".")[0])
+    if store_meta:
+        st.caption(f"시세 데이터 {store_meta['first_date']} ~ {store_meta['last_date']} "
+                   f"({store_meta['rows']:,}일) · 마지막 갱신 {store_meta['last_updated'].replace('T', ' ')}"
+                   + ("" if store_meta.get("complete", True) else " · 일부 페이지 수집 실패 (다음 갱신 때 보충)"))
     
     left_col, right_col = st.columns([0.7,2.2])
 
@@ -398,25 +286,26 @@ if not st.session_state.df.empty:
             c3, c4 = st.columns(2)
             c5, c6 = st.columns(2)
 
-            with c1: st.metric("PER", fmt(fund.get("per"), "배"))
-            with c2: st.metric("PBR", fmt(fund.get("pbr"), "배"))
-            with c3: st.metric("PSR", fmt(fund.get("psr"), "배"))
-            with c4: st.metric("외국인 비율", fmt(fund.get("foreign_ownership"), "%"))
-            with c5: st.metric("배당수익률", fmt(fund.get("dividend_yield"), "%"))
-            with c6: st.metric("시가총액", fmt(fund.get("market_cap"), "조"))
+            with c1: st.metric("PER", fmt(fund.per, "배"))
+            with c2: st.metric("PBR", fmt(fund.pbr, "배"))
+            with c3: st.metric("PSR", fmt(fund.psr, "배"))
+            with c4: st.metric("외국인 비율", fmt(fund.foreign_ownership, "%"))
+            with c5: st.metric("배당수익률", fmt(fund.dividend_yield, "%"))
+            with c6: st.metric("시가총액", fmt(fund.market_cap, "조"))
 
         except: pass
 
         st.markdown("<h3 style='color:#1E90FF; font-weight:bold; text-shadow: 1px 1px 3px rgba(0,0,0,0.2);'>애널리스트 컨센서스</h3>", unsafe_allow_html=True)
 
         try:
-            info = yf.Ticker(f"{code}.KS").info
-
-            mean = info.get("targetMeanPrice")
-            high = info.get("targetHighPrice")
-            low = info.get("targetLowPrice")
-            analysts = info.get("numberOfAnalystOpinions")
-            rating = info.get("recommendationKey", "").upper()
+            # 🚨 [수정] 종목당 TTL 안에 한 번만 Yahoo 요청 (get_english_name 과 캐시 공유)
+            meta = get_metadata(symbol)
+
+            mean = meta.target_mean
+            high = meta.target_high
+            low = meta.target_low
+            analysts = meta.analyst_count
+            rating = (meta.recommendation or "").upper()
             rating_kr = {
                 "BUY": "매수", "STRONG_BUY": "강력매수", 
                 "HOLD": "중립", "SELL": "매도", "UNDERPERFORM": "매도"
@@ -453,63 +342,61 @@ if not st.session_state.df.empty:
 
     with left_col:
         st.markdown("<h3 style='color:#1E90FF; font-weight:bold;'>딥러닝 예측 설정</h3>", unsafe_allow_html=True)
-        time_steps = st.selectbox("Time Steps", [30, 60, 90], index=1, key="ts_select")
+        # 🚨 [추가] sweep.py 로 고른 종목별 최적 time_steps 가 있으면 기본값으로 사용
+        best = read_best_config(symbol) if HAS_MODEL_FILES else None
+        ts_options = [30, 60, 90]
+        ts_index = ts_options.index(best["time_steps"]) if best and best.get("time_steps") in ts_options else 1
+        time_steps = st.selectbox("Time Steps", ts_options, index=ts_index, key="ts_select")
+        if best:
+            st.caption(f"스윕 최적 설정: {best['time_steps']}일 · units {best['units']} · "
+                       f"batch {best['batch_size']} (검증 MAPE {best['val_mape']:.2f}%)")
         st.session_state.time_steps = time_steps
+        # 🚨 [추가] step: 1일 예측을 30번 반복 / direct: 30일을 한 번에 출력하는 별도 모델 (..._direct30)
+        forecast_mode = st.radio("예측 방식", ["step", "direct"], horizontal=True, key="mode_select",
+                                 format_func=lambda m: "1일 반복 예측" if m == "step" else "30일 직접 예측")
 
         if st.button("모델 재학습 (기존 삭제)", type="secondary", use_container_width=True):
-            if os.path.exists(MODEL_DIR):
-                shutil.rmtree(MODEL_DIR)
-                os.makedirs(MODEL_DIR, exist_ok=True)
+            # 🚨 [수정] models/ 전체가 아닌 현재 종목의 산출물만 삭제 (다른 종목 모델 유지)
+            if HAS_MODEL_FILES:
+                delete_artifacts(symbol)
             st.session_state.model_trained = False
             st.session_state.test_y_true = None
             st.session_state.test_y_pred = None
-            st.success("기존 모델 삭제 완료")
+            st.success(f"{symbol} 기존 모델 삭제 완료" + (" (스윕 최적 설정은 유지되어 재학습에 사용)" if best else ""))
             st.rerun()
 
+        # 🚨 [추가] 기존 모델이 있으면 마지막 학습 이후 새 거래일만으로 미세조정
+        if HAS_MODEL_FILES and artifacts_exist(symbol, time_steps):
+            if st.button("증분 업데이트 (새 거래일만 학습)", use_container_width=True):
+                # 🚨 [수정] 스크립트에서 직접 학습하지 않고 작업으로 제출 (진행 중인 전체 학습과 중복 방지)
+                try:
+                    st.session_state.job_id = get_runner().submit("fine_tune", symbol, time_steps)
+                except Exception as e:
+                    st.error(f"증분 업데이트 실패: {e}")
+
+            result = st.session_state.pop('fine_tune_result', None)
+            if result is not None:
+                if result["new_samples"] == 0:
+                    st.info(f"마지막 학습일({result['last_date']}) 이후 새 거래일이 없습니다.")
+                else:
+                    st.success(f"증분 업데이트 완료: 새 샘플 {result['new_samples']}개, "
+                               f"{result['epochs']} 에폭 (loss {result['loss_before']:.5f} → {result['loss_after']:.5f})")
+                    if result["out_of_range"] > 0.05:
+                        st.warning("새 데이터가 기존 스케일 범위를 많이 벗어났습니다. 전체 재학습을 권장합니다.")
+
         if HAS_MODEL_FILES:
-            safe_symbol = symbol.replace(".", "_")
-            model_path = os.path.join(MODEL_DIR, f"model_{safe_symbol}_{time_steps}.keras")
-            scaler_path = os.path.join(MODEL_DIR, f"scaler_{safe_symbol}_{time_steps}.pkl")
-            current_model_exists = os.path.exists(model_path) and os.path.exists(scaler_path)
+            current_model_exists = artifacts_exist(symbol, time_steps, mode=forecast_mode)
             if st.button("LSTM 학습 및 30일 예측 시작", type="primary", use_container_width=True):
-                if not current_model_exists:
-                    with st.spinner("모델 학습 중 (새로운 모델 생성)..."):
-                        try:
-                            # 🚨 train_lstm_model 호출 (학습 + test_y_true/pred/dates 저장)
-                            test_y_true, test_y_pred = train_lstm_model(df, symbol, time_steps)
-                            st.session_state.test_y_true = test_y_true
-                            st.session_state.test_y_pred = test_y_pred
-                            st.session_state.model_trained = True
-                            st.session_state.model_symbol = symbol
-                            st.session_state.model_time_steps = time_steps
-                            st.success("모델 학습 완료!")
-                        except Exception as e:
-                            st.error(f"학습 실패: {e}")
-                            st.session_state.model_trained = False
-
-                if current_model_exists or st.session_state.get('model_trained'):
-                    with st.spinner("30일 예측 중..."):
-                        try:
-                            result = predict_next_month(df, symbol, time_steps, company)
-                            if result and len(result) == 3 and result[0] is not None:
-                                pred_df, final_price, interpretation = result
-                                st.session_state.pred_df = pred_df
-                                st.session_state.final_price = final_price
-                                st.session_state.interpretation = interpretation
-                                st.session_state.model_trained = True 
-                                st.session_state.model_symbol = symbol
-                                st.session_state.model_time_steps = time_steps
-
-                                st.success("예측 완료!")
-                                st.rerun() # 예측 후 화면 갱신
-                            else:
-                                # predict_next_month에서 모델 파일이 없다고 판단하면 result[0]은 None이 됨.
-                                st.error("예측 실패: 모델을 찾거나 예측 결과를 생성할 수 없습니다.")
-
-                        except Exception as e:
-                            st.error(f"예측 중 오류 발생: {e}")
-                else:
-                    st.error("학습 및 예측을 시작할 수 없습니다. 데이터가 충분한지 확인하거나 Time Steps을 조정하세요.")
+                # 🚨 [수정] 학습/예측을 스크립트 안에서 직접 실행하지 않고 백그라운드 작업으로 제출
+                #    (같은 종목/Time Steps 작업이 이미 진행 중이면 그 작업에 합류)
+                try:
+                    kind = "predict" if current_model_exists else "train"
+                    st.session_state.job_id = get_runner().submit(kind, symbol, time_steps, forecast_mode, company=company)
+                except Exception as e:
+                    st.error(f"작업 제출 실패: {e}")
+
+            if st.session_state.get('job_id'):
+                job_status_panel(symbol, time_steps, company)
         else:
             st.error("모델 파일 없음")
 
@@ -519,7 +406,8 @@ if not st.session_state.df.empty:
 
         if (st.session_state.get('model_trained') and 
             st.session_state.get('model_symbol') == symbol and
-            st.session_state.get('model_time_steps') == time_steps):
+            st.session_state.get('model_time_steps') == time_steps and
+            st.session_state.get('model_mode', 'step') == forecast_mode):
 
             test_y_true = st.session_state.get('test_y_true')
             test_y_pred = st.session_state.get('test_y_pred')
@@ -535,10 +423,7 @@ if not st.session_state.df.empty:
                 # 🚨 [추가된 호출] MAPE 계산 (역변환 후 사용)
                 features = ['Close', 'Volume', 'SMA_5', 'SMA_20', 'RSI', 'MACD', 'Volume_SMA', 
                             'BB_Upper', 'BB_Lower', 'OBV', 'Stoch_K', 'Stoch_D', 'ROC']
-                safe_symbol = symbol.replace(".", "_")
-                scaler_path = os.path.join(MODEL_DIR, f"scaler_{safe_symbol}_{time_steps}.pkl")
-                
-                mape_val = calculate_mape_from_scaled(test_y_true, test_y_pred, scaler_path, features)
+                mape_val = calculate_mape_from_scaled(test_y_true, test_y_pred, symbol, time_steps, features, forecast_mode)
                 
                 # MAPE 계산에 성공했을 때만 출력
                 if mape_val is not None:
@@ -561,24 +446,12 @@ if not st.session_state.df.empty:
                 # ----------------------------------------------------------------------------------
                 # 그래프 출력을 위해 scaled 값을 실제 가격으로 역변환 (변동 없음)
                 # ----------------------------------------------------------------------------------
-                features = ['Close', 'Volume', 'SMA_5', 'SMA_20', 'RSI', 'MACD', 'Volume_SMA', 
-                            'BB_Upper', 'BB_Lower', 'OBV', 'Stoch_K', 'Stoch_D', 'ROC']
-                
-                safe_symbol = symbol.replace(".", "_")
-                scaler_path = os.path.join(MODEL_DIR, f"scaler_{safe_symbol}_{time_steps}.pkl")
-                
                 try:
-                    scaler = joblib.load(scaler_path)
+                    scaler = registry.get_scaler(symbol, time_steps, forecast_mode)
                     
-                    # 1. 실제 주가 역변환
-                    dummy_true = np.zeros((len(test_y_true), len(features)))
-                    dummy_true[:, 0] = test_y_true.flatten()
-                    y_test_true_inverse = scaler.inverse_transform(dummy_true)[:, 0]
-
-                    # 2. 예측 주가 역변환
-                    dummy_pred = np.zeros((len(test_y_pred), len(features)))
-                    dummy_pred[:, 0] = test_y_pred.flatten()
-                    y_test_pred_inverse = scaler.inverse_transform(dummy_pred)[:, 0]
+                    # 🚨 [수정] 종가 열만 역변환 (13열 더미 행렬 제거)
+                    y_test_true_inverse = inverse_column(scaler, np.ravel(test_y_true))
+                    y_test_pred_inverse = inverse_column(scaler, np.ravel(test_y_pred))
 
                     # 그래프 데이터프레임 생성 (역변환된 값 사용)
                     df_test_plot = pd.DataFrame({
@@ -632,10 +505,12 @@ if not st.session_state.df.empty:
     st.caption(f"검색 키워드: **{filter_query.upper()}**에 대한 주식 시장 뉴스") 
 
     try:
-        news_results = scrape_investing_news_titles_selenium(filter_query, max_articles=10)
+        # 수집 단계는 뉴스와 함께 캐시되므로 캐시 적중 시에도 실제로 가져온 단계가 표시됨
+        news_results, tier = scrape_news_with_tier(filter_query, max_articles=10)
         
         if news_results:
-            st.markdown(f"총 {len(news_results)}개의 관련 뉴스가 크롤링되었습니다.")
+            tier_text = {"http": "HTTP", "browser": "브라우저"}.get(tier, tier)
+            st.markdown(f"총 {len(news_results)}개의 관련 뉴스가 크롤링되었습니다. (수집 방식: {tier_text})")
             
             for item in news_results:
                 st.markdown(f"*{item['title']}* ([링크]({item['link']}))")
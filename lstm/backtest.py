@@ -0,0 +1,185 @@
+# backtest.py
+"""
+저장된 LSTM 모델의 워크포워드(walk-forward) 백테스트.
+
+    python backtest.py 005930.KS 000660.KS --time-steps 60 --horizons 1 5 10 30 --out backtest.csv
+
+종목마다 모델/스케일러는 한 번만 로드하고(predict 의 레지스트리 공유), 지표 생성과 스케일링도
+한 번만 수행합니다. 예측 출발점(origin)마다 직전 time_steps 일 윈도를 스트라이드 뷰로 만들어
+배치 단위로 컴파일된 예측 그래프에 넣고, 정규화 예측 행렬 전체를 종가 열 기준으로 한 번에
+역변환해 가격 단위로 평가합니다. 실제값은 지표 배열의 원래 종가를 그대로 사용합니다.
+
+기본 출발점은 학습(trainer.train_model)과 같은 80/20 시간순 분할의 뒤쪽 구간이며, direct 모델은
+30일 목표가 학습 구간과 겹치지 않도록 그만큼 뒤에서 시작하므로 학습에 쓰인 구간은 평가하지 않습니다.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+import ohlcv_store
+from indicators import FEATURES, add_technical_indicators
+from model_registry import DIRECT_HORIZON, MODE_DIRECT, MODE_STEP
+from scaling import inverse_column
+
+HORIZONS = (1, 5, 10, 30)
+TRAIN_RATIO = 0.8
+BATCH_SIZE = 256
+RESULT_COLUMNS = ["symbol", "time_steps", "mode", "horizon", "origins", "first_origin", "last_origin",
+                  "mae", "rmse", "mape", "hit_rate"]
+
+
+def _origin_indices(n_rows, time_steps, max_horizon, start=None, dates=None, stride=1,
+                    train_ratio=TRAIN_RATIO, mode=MODE_STEP):
+    """
+    예측 첫날의 행 인덱스 배열. 직전 time_steps 행이 입력, 이후 max_horizon 행이 정답.
+
+    기본 첫 출발점은 학습 때 chronological_split 이 쓰는 윈도 수(mode 별로 다름)에서 계산한
+    마지막 학습 목표일의 다음 날이므로, 어떤 출발점도 학습에 쓰인 종가로 평가되지 않습니다.
+    """
+    last = n_rows - max_horizon   # 정답이 모두 있는 마지막 출발점
+    if start is not None:
+        first = max(int(dates.searchsorted(pd.Timestamp(start))), time_steps)
+    else:
+        # make_windows: n - ts 개, 목표 1일 / make_direct_windows: n - ts - H + 1 개, 목표 H일
+        target_days = DIRECT_HORIZON if mode == MODE_DIRECT else 1
+        train_size = int((n_rows - time_steps - target_days + 1) * train_ratio)
+        first = time_steps + train_size + target_days - 1   # 마지막 학습 윈도의 마지막 목표일 + 1
+    return np.arange(first, last + 1, max(int(stride), 1))
+
+
+def walk_forward(df, symbol, time_steps=60, horizons=HORIZONS, start=None, stride=1,
+                 batch_size=BATCH_SIZE, mode=None, backend=None, forecaster=None) -> pd.DataFrame:
+    """
+    한 종목의 워크포워드 백테스트 결과를 horizon 별 한 행으로 반환합니다.
+
+    start 를 주면 그 날짜부터, 없으면 학습 때와 같은 80/20 분할의 테스트 구간부터 stride 거래일마다
+    출발점을 잡습니다. forecaster 로 (model, scaler, rollout) 을 직접 넘길 수 있으며, 없으면
+    predict._load_forecaster 로 저장된 산출물을 불러옵니다 (mode/backend 의미도 같음).
+
+    컬럼: symbol, time_steps, mode, horizon, origins, first_origin, last_origin,
+          mae, rmse (가격 단위), mape (%), hit_rate (마지막 종가 대비 방향 적중률)
+    """
+    horizons = sorted({int(h) for h in horizons})
+    max_horizon = horizons[-1]
+    if forecaster is None:
+        from predict import FORECAST_MODE, _load_forecaster
+        mode = mode or FORECAST_MODE
+        forecaster = _load_forecaster(symbol, time_steps, backend, mode)
+    _, scaler, rollout = forecaster
+
+    processed = add_technical_indicators(df)
+    features = processed[FEATURES].to_numpy(dtype=float)
+    close = features[:, 0]
+    origins = _origin_indices(len(features), time_steps, max_horizon, start, processed.index, stride,
+                              mode=mode or MODE_STEP)
+    if len(origins) == 0:
+        raise ValueError(f"백테스트 구간 부족: 지표 생성 후 {len(features)}일, "
+                         f"time_steps {time_steps} + horizon {max_horizon} 필요")
+
+    # windows[k] = scaled[k:k + time_steps] → 출발점 o 의 입력은 windows[o - time_steps] (복사 없는 뷰)
+    scaled = scaler.transform(features).astype(np.float32)
+    windows = sliding_window_view(scaled, time_steps, axis=0).transpose(0, 2, 1)
+
+    preds = np.empty((len(origins), max_horizon), dtype=np.float32)
+    for lo in range(0, len(origins), batch_size):
+        ids = origins[lo:lo + batch_size] - time_steps
+        preds[lo:lo + len(ids)] = rollout(np.ascontiguousarray(windows[ids]), max_horizon)
+
+    # 종가 열만 한 번에 역변환 (13열 더미 행렬 없이)
+    pred_price = inverse_column(scaler, preds)
+    true_price = close[origins[:, None] + np.arange(max_horizon)]
+    base = close[origins - 1][:, None]   # 출발 직전(예측 시점)의 마지막 종가
+
+    cols = np.array(horizons) - 1
+    err = pred_price[:, cols] - true_price[:, cols]
+    hit = np.sign(pred_price[:, cols] - base) == np.sign(true_price[:, cols] - base)
+    mae = np.abs(err).mean(axis=0)
+    rmse = np.sqrt((err ** 2).mean(axis=0))
+    mape = (np.abs(err) / (np.abs(true_price[:, cols]) + 1e-10)).mean(axis=0) * 100
+
+    dates = processed.index
+    return pd.DataFrame({
+        "symbol": symbol,
+        "time_steps": time_steps,
+        "mode": mode or MODE_STEP,
+        "horizon": horizons,
+        "origins": len(origins),
+        "first_origin": dates[origins[0]],
+        "last_origin": dates[origins[-1]],
+        "mae": mae,
+        "rmse": rmse,
+        "mape": mape,
+        "hit_rate": hit.mean(axis=0),
+    }, columns=RESULT_COLUMNS)
+
+
+def _backtest_one(symbol, time_steps, horizons, df, start, stride, mode, backend):
+    if df is None:
+        df = ohlcv_store.update(symbol.split(".")[0])
+    if df.empty:
+        raise ValueError("시세 데이터 없음")
+    return walk_forward(df, symbol, time_steps, horizons, start, stride, mode=mode, backend=backend)
+
+
+def backtest_many(symbols, time_steps=60, horizons=HORIZONS, start=None, stride=1,
+                  max_workers=4, data=None, mode=None, backend=None) -> pd.DataFrame:
+    """
+    여러 종목의 walk_forward 결과를 하나의 표로 합칩니다 (predict.predict_many 와 같은 스레드 풀 구성).
+    data 에 {symbol: OHLCV DataFrame} 을 주면 그 데이터를, 없으면 OHLCV 저장소를 사용합니다.
+    실패한 종목은 df.attrs['errors'] = {symbol: 메시지} 에 기록됩니다.
+    """
+    data = data or {}
+    tables, errors = [], {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(_backtest_one, sym, time_steps, horizons, data.get(sym), start, stride,
+                               mode, backend): sym
+                   for sym in dict.fromkeys(symbols)}
+        for future, sym in futures.items():
+            try:
+                tables.append(future.result())
+            except Exception as e:
+                errors[sym] = str(e) or type(e).__name__
+
+    result = pd.concat(tables, ignore_index=True) if tables else pd.DataFrame(columns=RESULT_COLUMNS)
+    result.attrs["errors"] = errors
+    return result
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="저장된 모델의 워크포워드 백테스트")
+    parser.add_argument("symbols", nargs="*", help="예: 005930.KS 000660.KS")
+    parser.add_argument("--file", help="한 줄에 한 종목씩 적힌 종목 파일")
+    parser.add_argument("--time-steps", type=int, default=60)
+    parser.add_argument("--horizons", type=int, nargs="+", default=list(HORIZONS))
+    parser.add_argument("--start", help="첫 출발점 날짜 (기본값: 학습 80/20 분할의 테스트 구간)")
+    parser.add_argument("--stride", type=int, default=1, help="출발점 간격 (거래일)")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--mode", choices=[MODE_STEP, MODE_DIRECT], help="기본값: ECOS_FORECAST_MODE")
+    parser.add_argument("--backend", choices=["keras", "tflite"], help="기본값: ECOS_INFERENCE_BACKEND")
+    parser.add_argument("--out", default="backtest.csv")
+    args = parser.parse_args()
+
+    symbols = list(args.symbols)
+    if args.file:
+        with open(args.file, encoding="utf-8") as f:
+            symbols += [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+    begin = time.perf_counter()
+    table = backtest_many(symbols, args.time_steps, args.horizons, args.start, args.stride,
+                          args.workers, mode=args.mode, backend=args.backend)
+    table.to_csv(args.out, index=False)
+    print(f"{table['symbol'].nunique()}/{len(set(symbols))} 종목 백테스트 완료 "
+          f"({time.perf_counter() - begin:.1f}초) → {args.out}")
+    if not table.empty:
+        summary = table.groupby("horizon")[["mape", "hit_rate"]].mean()
+        for horizon, row in summary.iterrows():
+            print(f"  {horizon:>3}일  MAPE {row['mape']:6.2f}%  방향 적중 {row['hit_rate'] * 100:5.1f}%")
+    for sym, msg in table.attrs["errors"].items():
+        print(f"  실패 {sym}: {msg}")
@@ -0,0 +1,917 @@
+# bench.py
+"""
+성능 측정 스크립트 모음.
+
+    python bench.py fetch --pages-dir recorded/005930 [--record 005930] [--latency 0.05]
+    python bench.py indicators [--tickers 2000] [--days 2520]
+    python bench.py windows [--days 7500] [--time-steps 90]
+    python bench.py rollout [--model models/model_005930_KS_60.keras]
+    python bench.py news [--requests 10] [--pool-size 2]
+    python bench.py tflite --symbol 005930.KS [--time-steps 60] [--quantize float16]
+    python bench.py startup [--top 15] [--output startup_report.json]
+    python bench.py direct [--code 005930] [--time-steps 60] [--epochs 30]
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+
+# ── fetch: 일별 시세 페이지 수집 속도 ──
+
+def _record_pages(code, pages_dir, max_pages):
+    """실제 네이버 금융에서 페이지를 받아 page_{n}.html 로 저장합니다."""
+    from sise_fetcher import MIN_ROWS_PER_PAGE, make_session, page_url, parse_page
+
+    os.makedirs(pages_dir, exist_ok=True)
+    session = make_session(1)
+    for page in range(1, max_pages + 1):
+        html = session.get(page_url(code, page), timeout=10).text
+        with open(os.path.join(pages_dir, f"page_{page}.html"), "w", encoding="utf-8") as f:
+            f.write(html)
+        if len(parse_page(html)) < MIN_ROWS_PER_PAGE:
+            break
+        time.sleep(0.05)
+
+
+def _serve_pages(pages_dir, latency):
+    """녹화된 페이지를 sise_day.naver 와 같은 경로로 제공하는 로컬 HTTP 서버."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            m = re.search(r"page=(\d+)", self.path)
+            path = os.path.join(pages_dir, f"page_{m.group(1) if m else 1}.html")
+            if not os.path.exists(path):
+                # 네이버는 범위를 벗어난 페이지에 빈 표를 돌려줍니다
+                path = None
+            body = open(path, "rb").read() if path else b"<table><tr><th>\xeb\x82\xa0\xec\xa7\x9c</th></tr></table>"
+            time.sleep(latency)
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def _fetch_sequential(code, base_url, max_pages):
+    """기존 load_stock_data 의 순차 수집 루프."""
+    from sise_fetcher import MIN_ROWS_PER_PAGE, make_session, page_url, parse_page
+
+    session = make_session(1)
+    pages = []
+    for page in range(1, max_pages + 1):
+        try:
+            df_page = parse_page(session.get(page_url(code, page, base_url), timeout=10).text)
+            if len(df_page) < MIN_ROWS_PER_PAGE:
+                break
+            pages.append(df_page)
+            time.sleep(0.05)
+        except Exception:
+            break
+    return pages
+
+
+def bench_fetch(args):
+    from sise_fetcher import fetch_pages, pages_to_ohlcv
+
+    if args.record:
+        _record_pages(args.record, args.pages_dir, args.max_pages)
+
+    server, base_url = _serve_pages(args.pages_dir, args.latency)
+    code = args.record or "000000"
+    try:
+        runs = [("sequential", lambda: _fetch_sequential(code, base_url, args.max_pages))]
+        for workers in args.workers:
+            runs.append((f"concurrent x{workers}", lambda w=workers: fetch_pages(
+                code, max_pages=args.max_pages, max_workers=w, rate_limit=args.rate_limit, base_url=base_url)))
+
+        baseline = None
+        for name, run in runs:
+            start = time.perf_counter()
+            pages = run()
+            elapsed = time.perf_counter() - start
+            df = pages_to_ohlcv(pages)
+            if baseline is None:
+                baseline = df
+            same = "OK" if df.equals(baseline) else "MISMATCH"
+            print(f"{name:<16} pages={len(pages):>4} rows={len(df):>5} "
+                  f"wall={elapsed:7.3f}s  {len(pages) / elapsed:7.1f} pages/s  [{same}]")
+    finally:
+        server.shutdown()
+
+
+# ── indicators: 기술적 지표 엔진 ──
+
+def _pandas_indicators(df):
+    """벡터화 이전 predict.add_technical_indicators 구현 (골든 출력 기준)."""
+    df = df.copy()
+    df['SMA_5'] = df['Close'].rolling(5).mean()
+    df['SMA_20'] = df['Close'].rolling(20).mean()
+    delta = df['Close'].diff()
+    gain = (delta.where(delta > 0, 0)).rolling(14).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
+    rs_calc = 100 - (100 / (1 + gain / loss.replace(0, np.nan)))
+    df['RSI'] = np.where(loss == 0, np.where(gain > 0, 100, 0), rs_calc)
+    ema12 = df['Close'].ewm(span=12, adjust=False).mean()
+    ema26 = df['Close'].ewm(span=26, adjust=False).mean()
+    df['MACD'] = ema12 - ema26
+    df['Volume_SMA'] = df['Volume'].rolling(20).mean()
+    df['BB_Std'] = df['Close'].rolling(window=20).std()
+    df['BB_Upper'] = df['SMA_20'] + (df['BB_Std'] * 2)
+    df['BB_Lower'] = df['SMA_20'] - (df['BB_Std'] * 2)
+    df['OBV'] = (df['Close'].diff().apply(np.sign) * df['Volume']).fillna(0).cumsum()
+    high_14 = df['High'].rolling(window=14).max()
+    low_14 = df['Low'].rolling(window=14).min()
+    df['Stoch_K'] = 100 * ((df['Close'] - low_14) / (high_14 - low_14).replace(0, 1e-6))
+    df['Stoch_D'] = df['Stoch_K'].rolling(window=3).mean()
+    df['ROC'] = (df['Close'] - df['Close'].shift(9)) / df['Close'].shift(9) * 100
+    return df.drop(columns=['BB_Std']).dropna()
+
+
+def _random_ohlcv(n_tickers, n_days, seed=0):
+    """가격 제한폭과 거래 정지일(보합)을 흉내 낸 임의 일봉."""
+    rng = np.random.default_rng(seed)
+    ret = np.clip(rng.normal(0, 0.02, (n_tickers, n_days)), -0.3, 0.3)
+    ret[rng.random((n_tickers, n_days)) < 0.03] = 0.0
+    close = np.round(50_000 * np.exp(np.cumsum(ret, axis=1)), -1)
+    spread = np.abs(rng.normal(0, 0.01, (n_tickers, n_days))) * close
+    high, low = close + spread, close - spread
+    volume = rng.integers(10_000, 5_000_000, (n_tickers, n_days)).astype(float)
+    return high, low, close, volume
+
+
+def bench_indicators(args):
+    from indicators import FEATURES, add_technical_indicators, compute_features
+
+    # 1. 골든 출력 비교: 기존 pandas 구현과 같은 값을 내는지 확인
+    high, low, close, volume = _random_ohlcv(5, args.days, seed=1)
+    index = pd.bdate_range("2015-01-01", periods=args.days)
+    worst = 0.0
+    for i in range(len(close)):
+        df = pd.DataFrame({'Open': close[i], 'High': high[i], 'Low': low[i],
+                           'Close': close[i], 'Volume': volume[i]}, index=index)
+        expected = _pandas_indicators(df)
+        actual = add_technical_indicators(df)
+        assert expected.index.equals(actual.index), "dropna 구간 불일치"
+        assert list(expected.columns) == list(actual.columns), "컬럼 순서 불일치"
+        np.testing.assert_allclose(actual[FEATURES].values, expected[FEATURES].values, rtol=1e-9, atol=1e-6)
+        worst = max(worst, float(np.max(np.abs(actual[FEATURES].values - expected[FEATURES].values))))
+    print(f"golden check   OK (max abs diff {worst:.3e})")
+
+    # 2. 증분 상태: 과거로 시드한 뒤 한 일봉씩 갱신한 값이 배치 결과와 같은지 확인
+    from indicators import IndicatorState
+    seed = args.days // 2
+    batch = compute_features(high[0], low[0], close[0], volume[0])
+    history = pd.DataFrame({'High': high[0], 'Low': low[0], 'Close': close[0], 'Volume': volume[0]})
+    state = IndicatorState.from_history(history.iloc[:seed])
+    start = time.perf_counter()
+    streamed = np.array([state.update(*bar) for bar in
+                         zip(high[0, seed:], low[0, seed:], close[0, seed:], volume[0, seed:])])
+    per_bar = (time.perf_counter() - start) / (args.days - seed)
+    np.testing.assert_allclose(streamed, batch[seed:], rtol=1e-7, atol=1e-6)
+    print(f"stream check   OK ({per_bar * 1e6:.1f} us/bar)")
+
+    # 3. 마이크로벤치마크: 종목 x 거래일 전체
+    high, low, close, volume = _random_ohlcv(args.tickers, args.days)
+    start = time.perf_counter()
+    for lo in range(0, args.tickers, args.chunk):
+        hi = lo + args.chunk
+        compute_features(high[lo:hi], low[lo:hi], close[lo:hi], volume[lo:hi])
+    vec = time.perf_counter() - start
+
+    sample = min(args.tickers, args.pandas_sample)
+    start = time.perf_counter()
+    for i in range(sample):
+        _pandas_indicators(pd.DataFrame({'High': high[i], 'Low': low[i], 'Close': close[i], 'Volume': volume[i]}))
+    pd_per_ticker = (time.perf_counter() - start) / sample
+
+    bars = args.tickers * args.days
+    print(f"numpy          {vec:8.3f}s  ({bars / vec / 1e6:6.2f} M bars/s)")
+    print(f"pandas (est.)  {pd_per_ticker * args.tickers:8.3f}s  (sampled {sample} tickers)")
+
+
+# ── windows: 학습 윈도 메모리 사용량 ──
+
+def bench_windows(args):
+    import tracemalloc
+
+    from windows import WindowSequence, chronological_split, make_windows
+
+    rng = np.random.default_rng(0)
+    scaled = rng.random((args.days, 13))
+    ts = args.time_steps
+
+    def legacy():
+        X, y = [], []
+        for i in range(ts, len(scaled)):
+            X.append(scaled[i - ts:i])
+            y.append(scaled[i, 0])
+        X, y = np.array(X), np.array(y)
+        train_size = int(len(X) * 0.8)
+        return X[:train_size], X[train_size:], y[:train_size], y[train_size:]
+
+    def strided():
+        X, y = make_windows(scaled, ts)
+        X_train, X_test, y_train, y_test = chronological_split(X, y)
+        # Keras가 한 에폭 동안 요청하는 배치를 모두 꺼내 봄
+        for batch in WindowSequence(X_train, y_train, batch_size=32, shuffle=True):
+            pass
+        return X_train, X_test, y_train, y_test
+
+    results = {}
+    for name, build in [("legacy loop", legacy), ("strided view", strided)]:
+        tracemalloc.start()
+        start = time.perf_counter()
+        results[name] = build()
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{name:<14} peak={peak / 2**20:9.1f} MiB  time={elapsed:6.3f}s")
+
+    for a, b in zip(results["legacy loop"], results["strided view"]):
+        np.testing.assert_array_equal(a, b)
+    print(f"windows equal  OK ({args.days} rows x {ts} steps x 13 features)")
+
+
+# ── rollout: 30일 자기회귀 예측 지연 시간 ──
+
+def bench_rollout(args):
+    from tensorflow.keras.models import load_model
+
+    from predict import compiled_rollout
+
+    model = load_model(args.model)
+    time_steps, n_features = model.input_shape[1:]
+    window = np.random.default_rng(0).random((time_steps, n_features)).astype(np.float32)
+
+    def legacy():
+        """기존 predict_next_month 의 model.predict 30회 루프."""
+        predictions = []
+        current_input = window.reshape(1, time_steps, n_features)
+        for _ in range(args.horizon):
+            predicted = model.predict(current_input, verbose=0)[0, 0]
+            predictions.append(predicted)
+            temp = current_input[0, -1].copy()
+            temp[0] = predicted
+            current_input = np.append(current_input[0, 1:], [temp], axis=0).reshape(1, time_steps, n_features)
+        return np.array(predictions)
+
+    rollout = compiled_rollout(model, args.horizon)
+
+    def compiled():
+        return rollout(window[None]).numpy()[0]
+
+    start = time.perf_counter()
+    compiled()
+    print(f"trace (1st call)  {time.perf_counter() - start:8.3f}s")
+
+    outputs = {}
+    for name, run in [("model.predict loop", legacy), ("tf.function", compiled)]:
+        times = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            outputs[name] = run()
+            times.append(time.perf_counter() - start)
+        print(f"{name:<18} median={np.median(times) * 1e3:8.1f} ms  min={min(times) * 1e3:8.1f} ms")
+
+    np.testing.assert_allclose(outputs["tf.function"], outputs["model.predict loop"], rtol=1e-4, atol=1e-5)
+    print("forecasts equal   OK")
+
+
+# ── news: 브라우저 풀 재사용 효과 ──
+
+NEWS_FIXTURE = """<html><body><div class="search-result-items">{items}</div></body></html>"""
+
+
+def _serve_news(articles, latency):
+    """Investing.com 검색 결과 페이지 모양의 정적 HTML 을 제공하는 로컬 HTTP 서버."""
+    items = "".join(f'<article><a href="/news/stock-market-news/{i}">테스트 뉴스 {i}</a></article>'
+                    for i in range(articles))
+    body = NEWS_FIXTURE.format(items=items).encode("utf-8")
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency)
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def bench_news(args):
+    from news_scraper import fetch_news, fetch_news_html, parse_news
+
+    server, base_url = _serve_news(args.articles, args.latency)
+    try:
+        times = []
+        for i in range(args.requests):
+            start = time.perf_counter()
+            news, tier = fetch_news(f"종목{i}", 10, base_url)
+            times.append(time.perf_counter() - start)
+            assert tier == "http" and len(news) == min(10, args.articles), (tier, len(news))
+        print(f"http tier          median={np.median(times) * 1e3:8.1f} ms  max={max(times) * 1e3:8.1f} ms")
+        if args.http_only:
+            return
+
+        import browser_pool
+        start = time.perf_counter()
+        browser_pool.resolve_driver_path()
+        print(f"driver path        {time.perf_counter() - start:8.3f}s (최초 1회)")
+
+        # 기존 방식: 요청마다 브라우저 기동 → 로딩 → 고정 5초 대기 → 종료
+        if args.legacy:
+            driver = browser_pool.new_chrome_driver()
+            start = time.perf_counter()
+            driver.get(f"{base_url}/search/?q=x&tab=news")
+            time.sleep(5)
+            driver.quit()
+            print(f"legacy (1 req)     {time.perf_counter() - start:8.3f}s")
+
+        pool = browser_pool.DriverPool(size=args.pool_size)
+        browser_pool._pool = pool
+        times = []
+        for i in range(args.requests):
+            start = time.perf_counter()
+            news = parse_news(fetch_news_html(f"종목{i}", base_url), 10, base_url)
+            times.append(time.perf_counter() - start)
+            assert len(news) == min(10, args.articles), len(news)
+        print(f"pool cold (1st)    {times[0]:8.3f}s")
+        if len(times) > 1:
+            print(f"pool warm          median={np.median(times[1:]) * 1e3:8.1f} ms  "
+                  f"max={max(times[1:]) * 1e3:8.1f} ms")
+        print(f"pool stats         {pool.stats()}")
+        pool.close()
+    finally:
+        server.shutdown()
+
+
+# ── tflite: Keras vs TFLite 추론 백엔드 ──
+
+_BACKEND_PROBE = """
+import json, resource, sys, time
+import numpy as np
+start = time.perf_counter()
+backend, symbol, time_steps, quantize, horizon, repeat = sys.argv[1:7]
+time_steps, horizon, repeat = int(time_steps), int(horizon), int(repeat)
+quantize = quantize or None
+if backend == "keras":
+    from tensorflow.keras.models import load_model
+    from model_registry import artifact_paths
+    from predict import compiled_rollout
+    imported = time.perf_counter()
+    model = load_model(artifact_paths(symbol, time_steps)[0])
+    rollout = compiled_rollout(model, horizon)
+    run = lambda w: rollout(w).numpy()
+else:
+    from model_registry import tflite_path
+    from tflite_backend import TFLiteModel
+    imported = time.perf_counter()
+    model = TFLiteModel(tflite_path(symbol, time_steps, quantize))
+    run = lambda w: model.rollout(w[0], horizon)[None]
+window = np.random.default_rng(0).random((1, time_steps, 13), dtype=np.float32)
+run(window)
+loaded = time.perf_counter()
+times = []
+for _ in range(repeat):
+    t = time.perf_counter()
+    run(window)
+    times.append(time.perf_counter() - t)
+print(json.dumps({"import_s": imported - start, "load_s": loaded - imported,
+                  "rollout_ms": float(np.median(times) * 1e3),
+                  "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+                  "tensorflow": "tensorflow" in sys.modules}))
+"""
+
+
+def bench_tflite(args):
+    from tflite_backend import export_symbol
+
+    if args.export:
+        report = export_symbol(args.symbol, args.time_steps, args.quantize)
+        if "max_abs" in report:
+            print(f"drift              max={report['max_abs']:.2e} mean={report['mean_abs']:.2e} "
+                  f"rollout={report['rollout_max_abs']:.2e} ({report['windows']} holdout windows)")
+
+    # 백엔드마다 새 프로세스에서 import/로드 시간과 최대 RSS 를 측정
+    env = dict(os.environ, TF_CPP_MIN_LOG_LEVEL="3",
+               PYTHONPATH=os.pathsep.join(filter(None, [os.path.dirname(os.path.abspath(__file__)),
+                                                        os.environ.get("PYTHONPATH")])))
+    for backend in ("keras", "tflite"):
+        out = subprocess.run([sys.executable, "-c", _BACKEND_PROBE, backend, args.symbol, str(args.time_steps),
+                              args.quantize or "", str(args.horizon), str(args.repeat)],
+                             capture_output=True, text=True, env=env, check=True).stdout
+        r = json.loads(out.strip().splitlines()[-1])
+        print(f"{backend:<8} import={r['import_s']:6.2f}s load={r['load_s']:6.2f}s "
+              f"rollout median={r['rollout_ms']:7.1f} ms  max RSS={r['rss_mb']:7.0f} MiB  "
+              f"tensorflow imported={r['tensorflow']}")
+
+
+# ── startup: 콜드 스타트 import 시간 ──
+
+_STARTUP_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=float(sys.argv[2]))
+at.run()
+heavy = ["tensorflow", "keras", "sklearn", "selenium", "webdriver_manager", "pykrx", "lxml"]
+print(json.dumps({"first_render_s": time.perf_counter() - start,
+                  "exceptions": [str(e.value) for e in at.exception],
+                  "loaded": [m for m in heavy if m in sys.modules]}))
+"""
+
+_IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def parse_importtime(stderr):
+    """-X importtime 출력에서 최상위 import 별 누적 시간(초)을 합산합니다."""
+    totals = {}
+    for line in stderr.splitlines():
+        m = _IMPORTTIME_LINE.match(line)
+        if m and len(m.group(3)) == 1:   # 들여쓰기 한 칸 = 다른 모듈에 포함되지 않은 최상위 import
+            package = m.group(4).split(".")[0]
+            totals[package] = totals.get(package, 0.0) + int(m.group(2)) / 1e6
+    return totals
+
+
+def bench_startup(args):
+    app_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", _STARTUP_PROBE, app_path, str(args.timeout)],
+                          capture_output=True, text=True, cwd=os.path.dirname(app_path),
+                          env=dict(os.environ, TF_CPP_MIN_LOG_LEVEL="3"))
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        print(proc.stderr[-2000:])
+        raise SystemExit(proc.returncode)
+
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    totals = parse_importtime(proc.stderr)
+    print(f"process wall       {wall:8.2f}s")
+    print(f"first render       {result['first_render_s']:8.2f}s (AppTest 첫 실행 완료까지)")
+    print(f"imports total      {sum(totals.values()):8.2f}s")
+    print(f"heavy loaded       {', '.join(result['loaded']) or '-'}")
+    for e in result["exceptions"]:
+        print(f"app exception      {e}")
+    for package, seconds in sorted(totals.items(), key=lambda kv: -kv[1])[:args.top]:
+        print(f"  {package:<24} {seconds:7.3f}s")
+
+    if args.output:
+        report = dict(result, process_wall_s=wall, imports=totals, measured_at=time.strftime("%Y-%m-%dT%H:%M:%S"))
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+# ── direct: 자기회귀(step) vs 30일 다중 출력(direct) 모델 ──
+
+def bench_direct(args):
+    import tempfile
+
+    import ohlcv_store
+    from indicators import FEATURES, add_technical_indicators
+    from model_registry import DIRECT_HORIZON
+    from predict import compiled_direct, compiled_rollout
+    from trainer import train_model
+    from windows import chronological_split, make_direct_windows
+
+    if args.code:
+        df = ohlcv_store.read(args.code)
+    else:
+        high, low, close, volume = _random_ohlcv(1, args.days, seed=3)
+        df = pd.DataFrame({'Open': close[0], 'High': high[0], 'Low': low[0], 'Close': close[0],
+                           'Volume': volume[0]}, index=pd.bdate_range("2015-01-01", periods=args.days))
+    horizon = DIRECT_HORIZON
+    model_dir = tempfile.mkdtemp(prefix="bench_direct_")
+
+    trained = {}
+    for mode in ("step", "direct"):
+        start = time.perf_counter()
+        trained[mode] = train_model(df, "BENCH", args.time_steps, epochs=args.epochs, model_dir=model_dir, mode=mode)
+        print(f"train {mode:<6}       {time.perf_counter() - start:7.1f}s ({trained[mode]['epochs']} epochs)")
+
+    # 같은 홀드아웃 출발점(direct 윈도 기준)에서 두 모델의 30일 예측을 가격으로 비교
+    processed = add_technical_indicators(df)[FEATURES].values
+    results = {}
+    for mode, result in trained.items():
+        scaler, model = result["scaler"], result["model"]
+        X, Y = make_direct_windows(scaler.transform(processed), args.time_steps, horizon)
+        X_test, Y_test = chronological_split(X, Y, 0.8)[1::2]
+        X_test = np.ascontiguousarray(X_test, dtype=np.float32)
+        forecast = compiled_rollout(model, horizon) if mode == "step" else compiled_direct(model)
+        pred = forecast(X_test).numpy()[:, :horizon]
+        to_price = lambda v: (v - scaler.min_[0]) / scaler.scale_[0]
+        ape = np.abs(to_price(pred) - to_price(Y_test)) / np.abs(to_price(Y_test)) * 100
+
+        one = X_test[-1:]
+        forecast(one)
+        times = []
+        for _ in range(args.repeat):
+            t = time.perf_counter()
+            forecast(one).numpy()
+            times.append(time.perf_counter() - t)
+        results[mode] = ape.mean(axis=0)
+        print(f"{mode:<6} origins={len(X_test):>4}  MAPE 1d={ape[:, 0].mean():6.2f}%  10d={ape[:, 9].mean():6.2f}%  "
+              f"30d={ape[:, -1].mean():6.2f}%  all={ape.mean():6.2f}%  latency={np.median(times) * 1e3:6.2f} ms")
+
+    better = int((results["direct"] < results["step"]).sum())
+    print(f"direct 가 더 정확한 horizon: {better}/{horizon}")
+
+
+# ── backtest: 출발점별 개별 예측 vs 배치 워크포워드 ──
+
+def bench_backtest(args):
+    import tempfile
+
+    from backtest import HORIZONS, _origin_indices, walk_forward
+    from indicators import FEATURES, add_technical_indicators
+    from predict import compiled_rollout
+    from trainer import train_model
+
+    high, low, close, volume = _random_ohlcv(1, args.days, seed=5)
+    df = pd.DataFrame({'Open': close[0], 'High': high[0], 'Low': low[0], 'Close': close[0],
+                       'Volume': volume[0]}, index=pd.bdate_range("2015-01-01", periods=args.days))
+    trained = train_model(df, "BENCH", args.time_steps, epochs=args.epochs,
+                          model_dir=tempfile.mkdtemp(prefix="bench_backtest_"))
+    model, scaler = trained["model"], trained["scaler"]
+    horizon = max(HORIZONS)
+    rollout = lambda window, h: compiled_rollout(model, h)(window).numpy()
+    walk_forward(df, "BENCH", args.time_steps, forecaster=(model, scaler, rollout))   # 트레이싱 제외
+
+    start = time.perf_counter()
+    table = walk_forward(df, "BENCH", args.time_steps, forecaster=(model, scaler, rollout))
+    batched = time.perf_counter() - start
+    n_origins = int(table["origins"].iloc[0])
+
+    # 기존 방식: 출발점마다 지표/스케일링을 다시 하고 한 윈도씩 예측, 13열 더미 행렬로 두 번 역변환
+    processed = add_technical_indicators(df)[FEATURES]
+    origins = _origin_indices(len(processed), args.time_steps, horizon)[:args.legacy_origins]
+    start = time.perf_counter()
+    for o in origins:
+        scaled = scaler.transform(add_technical_indicators(df.iloc[:o + len(df) - len(processed)])[FEATURES].values)
+        pred = rollout(scaled[None, -args.time_steps:].astype(np.float32), horizon)[0]
+        dummy = np.zeros((horizon, len(FEATURES)))
+        dummy[:, 0] = pred
+        scaler.inverse_transform(dummy)
+        dummy[:, 0] = scaler.transform(processed.values[o:o + horizon])[:, 0]
+        scaler.inverse_transform(dummy)
+    legacy = (time.perf_counter() - start) / len(origins) * n_origins
+
+    print(f"origins={n_origins}  horizons={list(HORIZONS)}")
+    print(f"legacy  (출발점별, {len(origins)}개로 추정)  {legacy:8.2f}s")
+    print(f"batched (walk_forward)               {batched:8.2f}s  ({legacy / batched:.0f}x)")
+    print(table[["horizon", "mae", "rmse", "mape", "hit_rate"]].round(3).to_string(index=False))
+
+
+# ── scaling: joblib MinMaxScaler vs .npy FeatureScaler ──
+
+def bench_scaling(args):
+    import tempfile
+
+    import joblib
+    from sklearn.preprocessing import MinMaxScaler
+
+    from scaling import FeatureScaler, inverse_column
+
+    rng = np.random.default_rng(0)
+    data = rng.lognormal(10, 1, size=(args.rows, 13))
+    sk = MinMaxScaler().fit(data)
+    fs = FeatureScaler.fit(data)
+    np.testing.assert_allclose(fs.transform(data), sk.transform(data), rtol=1e-12, atol=1e-12)
+
+    tmp = tempfile.mkdtemp(prefix="bench_scaling_")
+    pkl_path, npy_path = os.path.join(tmp, "scaler.pkl"), os.path.join(tmp, "scaler.npy")
+    joblib.dump(sk, pkl_path)
+    fs.save(npy_path)
+
+    def timeit(fn, repeat=args.repeat):
+        fn()
+        start = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        return (time.perf_counter() - start) / repeat * 1e6
+
+    preds = rng.random(args.horizon)
+
+    def dummy_inverse():
+        dummy = np.zeros((len(preds), 13))
+        dummy[:, 0] = preds
+        return sk.inverse_transform(dummy)[:, 0]
+
+    np.testing.assert_allclose(inverse_column(fs, preds), dummy_inverse(), rtol=1e-12)
+    print(f"{'':<22}{'joblib .pkl':>14}{'FeatureScaler .npy':>22}")
+    print(f"{'file size (bytes)':<22}{os.path.getsize(pkl_path):>14}{os.path.getsize(npy_path):>22}")
+    print(f"{'load (us)':<22}{timeit(lambda: joblib.load(pkl_path)):>14.1f}"
+          f"{timeit(lambda: FeatureScaler.load(npy_path)):>22.1f}")
+    print(f"{'close inverse (us)':<22}{timeit(dummy_inverse):>14.1f}"
+          f"{timeit(lambda: inverse_column(fs, preds)):>22.1f}")
+
+
+# ── fundamentals: 종목 메인 페이지 파서 ──
+
+def _fundamentals_fixture(filler_rows=1500):
+    """네이버 종목 메인 페이지와 같은 구조의 고정 HTML (실제 페이지 크기에 맞춘 채움 행 포함)."""
+    filler = "\n".join(f"<tr><td><a href='/item/news_read.naver?article_id={i}'>뉴스 제목 {i} 관련 기사</a></td>"
+                       f"<td class='info'>언론사 {i % 17}</td><td class='date'>2024.01.{i % 28 + 1:02d}</td></tr>"
+                       for i in range(filler_rows))
+    return f"""<html><head><meta charset="utf-8"><title>삼성전자 : 네이버 금융</title></head><body>
+<div id="content"><table class="type5"><tbody>{filler}</tbody></table>
+<div class="first"><table summary="시가총액 정보"><tr><th>시가총액</th>
+<td><em id="_market_sum">            426조
+            4,569</em>억원</td></tr></table></div>
+<div class="gray"><table summary="외국인한도주식수 정보"><tr><th>외국인한도주식수(A)</th><td><em>5,969,782,550</em></td></tr>
+<tr><th>외국인보유주식수(B)</th><td><em>3,293,127,003</em></td></tr>
+<tr><th>외국인소진율(B/A) <img alt="" src="x.gif"></th><td><em>55.16%</em></td></tr></table></div>
+<table class="per_table" summary="PER/EPS 정보"><tr><th>PER l EPS(2023.12)</th>
+<td><em id="_per">34.63</em>배 l <em id="_eps">2,131</em>원</td></tr>
+<tr><th>PBR l BPS (2023.12)</th><td><em id="_pbr">1.40</em>배 l 52,002원</td></tr>
+<tr><th>배당수익률 l 2023.12</th><td><em id="_dvr">1.95</em>%</td></tr></table>
+<div class="section cop_analysis"><table summary="연간 실적"><tbody>
+<tr><th>매출액</th><td>2,796,048</td><td>3,022,314</td><td>2,589,355</td><td>3,008,709</td></tr>
+<tr><th>영업이익</th><td>516,339</td><td>433,766</td><td>65,670</td><td>356,000</td></tr>
+</tbody></table></div></div></body></html>"""
+
+
+def _legacy_fundamentals(html):
+    """app.py 에 있던 BeautifulSoup 기반 파서 (네트워크/경고 제외, 비교 기준)."""
+    import re
+
+    from bs4 import BeautifulSoup
+
+    from fundamentals import parse_money
+
+    data = {"per": None, "pbr": None, "psr": None, "foreign_ownership": None, "dividend_yield": None,
+            "market_cap": None}
+    soup = BeautifulSoup(html, "lxml")
+    for tid, key in [("_per", "per"), ("_pbr", "pbr"), ("_psr", "psr")]:
+        tag = soup.find("em", id=tid)
+        if tag:
+            try:
+                data[key] = round(float(tag.get_text(strip=True).replace(",", "")), 2)
+            except ValueError:
+                pass
+    for pattern in [r"외국인[^\d]*([\d,]+\.\d+)%", r"외국인\s*지분율[^\d]*([\d,]+\.\d+)%",
+                    r"외국인\s*[\[\(][^%\d]*([\d,]+\.\d+)%[\]\)]"]:
+        m = re.search(pattern, soup.get_text())
+        if m:
+            data["foreign_ownership"] = float(m.group(1).replace(",", ""))
+            break
+    div_text = soup.select_one("th:-soup-contains('배당수익률')")
+    if div_text and div_text.find_parent("tr"):
+        for td in div_text.find_parent("tr").find_all("td"):
+            m = re.search(r"([\d,]+\.\d+)%", td.get_text(strip=True))
+            if m:
+                data["dividend_yield"] = float(m.group(1).replace(",", ""))
+                break
+    if not data["dividend_yield"]:
+        for p in [r"배당수익률[^\d]*([\d,]+\.\d+)%", r"배당수익률\s*\[?\s*TTM\s*\]?\s*[^\d]*([\d,]+\.\d+)%",
+                  r"배당수익률\s*[:\-]?\s*([\d,]+\.\d+)%"]:
+            m = re.search(p, soup.get_text())
+            if m:
+                data["dividend_yield"] = float(m.group(1).replace(",", ""))
+                break
+    mcap_tag = soup.find("em", id="_market_sum")
+    if mcap_tag:
+        data["market_cap"] = round(parse_money(mcap_tag.get_text(strip=True)), 2) or None
+    annual_table = soup.find("table", summary="연간 실적")
+    if annual_table and data["market_cap"]:
+        for row in annual_table.find_all("tr"):
+            th = row.find("th")
+            if th and "매출액" in th.get_text():
+                revenue = parse_money(row.find_all("td")[0].get_text(strip=True))
+                if revenue > 0:
+                    data["psr"] = round(data["market_cap"] / revenue, 2)
+                    break
+    return data
+
+
+def bench_fundamentals(args):
+    import fundamentals
+    from fundamentals import parse_fundamentals
+
+    if args.record:
+        from fundamentals import fetch_page
+        if not args.html:
+            raise SystemExit("--record 에는 저장할 --html 경로가 필요합니다.")
+        with open(args.html, "w", encoding="utf-8") as f:
+            f.write(fetch_page(args.record))
+    if args.html:
+        with open(args.html, encoding="utf-8") as f:
+            html = f.read()
+    else:
+        html = _fundamentals_fixture()
+
+    legacy = _legacy_fundamentals(html)
+    # 고정 페이지에서는 모든 항목을 표/id 에서 찾아야 하며, 전체 텍스트 정규식 폴백은 쓰지 않아야 함
+    fallback_calls = []
+    search = fundamentals._search
+    fundamentals._search = lambda patterns, text: fallback_calls.append(1) or search(patterns, text)
+    try:
+        record = parse_fundamentals(html).to_dict()
+    finally:
+        fundamentals._search = search
+    if not args.html:
+        assert not fallback_calls, "고정 페이지 파싱이 전체 텍스트 폴백을 사용했습니다."
+    mismatch = {k: (v, record[k]) for k, v in legacy.items() if v != record[k]}
+    print(f"page {len(html.encode()) / 1024:.0f} KB  fields: {record}")
+    print("legacy 와 동일" if not mismatch else f"legacy 와 다른 항목 (legacy, new): {mismatch}")
+
+    for name, fn in [("legacy (bs4 + get_text x N)", lambda: _legacy_fundamentals(html)),
+                     ("lxml XPath", lambda: parse_fundamentals(html))]:
+        fn()
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            fn()
+        print(f"{name:<28} {(time.perf_counter() - start) / args.repeat * 1e3:8.2f} ms/page")
+
+
+def _synthetic_master(n, seed=0):
+    """한글 음절을 조합한 임의 종목 마스터 (실제 KRX 상장 종목 수 규모)."""
+    rng = np.random.default_rng(seed)
+    syllables = list("삼성전자현대기아엘지카셀트리온네이버한화포스코신한금융바이오에너지화학제약건설")
+    names = {}
+    while len(names) < n:
+        name = "".join(rng.choice(syllables, rng.integers(2, 7)))
+        names.setdefault(name, f"{len(names) * 7 % 1_000_000:06d}")
+    return pd.DataFrame({
+        "code": list(names.values()), "name": list(names.keys()), "name_en": "",
+        "market": rng.choice(["KOSPI", "KOSDAQ"], n), "market_cap": rng.lognormal(0, 2, n),
+    })
+
+
+def bench_symbols(args):
+    from symbols import TickerIndex, chosung
+
+    master = pd.read_parquet(args.master) if args.master else _synthetic_master(args.tickers)
+    start = time.perf_counter()
+    index = TickerIndex(master)
+    print(f"{len(index)} 종목 색인 생성 {(time.perf_counter() - start) * 1e3:.1f} ms")
+
+    name = master["name"].iloc[len(master) // 2]
+    queries = [("exact", name), ("code", master["code"].iloc[0]), ("prefix", name[:2]),
+               ("chosung", chosung(name)[:3]), ("fuzzy", name[1:] + name[:1])]
+    for kind, query in queries:
+        matches = index.search(query, 10)
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            index.search(query, 10)
+        elapsed = (time.perf_counter() - start) / args.repeat * 1e6
+        top = f"{matches[0].name} ({matches[0].kind})" if matches else "-"
+        print(f"{kind:<8} {query!r:<16} {elapsed:8.1f} µs  {len(matches):>2}개  1위 {top}")
+
+
+def bench_metadata(args):
+    """심볼 페이지 rerun 마다 .info 를 두 번(영문명 + 컨센서스) 받던 방식 vs 메타데이터 캐시."""
+    import tempfile
+
+    from metadata import from_info, get_metadata
+
+    calls = []
+    info = {"longName": "Samsung Electronics Co., Ltd.", "targetMeanPrice": 90000.0,
+            "recommendationKey": "buy", "numberOfAnalystOpinions": 30}
+
+    def fake_info(symbol):
+        calls.append(symbol)
+        time.sleep(args.latency)   # quoteSummary 왕복 시간
+        return from_info(symbol, info)
+
+    def legacy_page(symbol):
+        fake_info(symbol)   # get_english_name
+        fake_info(symbol)   # 애널리스트 컨센서스
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        def cached_page(symbol):
+            get_metadata(symbol, cache_dir=cache_dir, fetcher=fake_info)
+            get_metadata(symbol, cache_dir=cache_dir, fetcher=fake_info)
+
+        for name, page in [("legacy (.info x2 / rerun)", legacy_page), ("metadata cache", cached_page)]:
+            calls.clear()
+            start = time.perf_counter()
+            for _ in range(args.reruns):
+                page("005930.KS")
+            elapsed = (time.perf_counter() - start) / args.reruns * 1e3
+            print(f"{name:<26} {elapsed:8.2f} ms/rerun  Yahoo 요청 {len(calls)}회 / {args.reruns} rerun")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ECOS Analyzer 성능 측정")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("fetch", help="일별 시세 페이지 순차/병렬 수집 비교")
+    p.add_argument("--pages-dir", required=True, help="page_{n}.html 녹화본 디렉터리")
+    p.add_argument("--record", metavar="CODE", help="지정 종목 페이지를 먼저 녹화")
+    p.add_argument("--max-pages", type=int, default=150)
+    p.add_argument("--workers", type=int, nargs="+", default=[4, 8, 16])
+    p.add_argument("--rate-limit", type=float, default=0, help="초당 요청 제한 (0=무제한)")
+    p.add_argument("--latency", type=float, default=0.05, help="로컬 서버 응답 지연(초)")
+    p.set_defaults(func=bench_fetch)
+
+    p = sub.add_parser("indicators", help="지표 엔진 골든 비교 + 처리량")
+    p.add_argument("--tickers", type=int, default=2000)
+    p.add_argument("--days", type=int, default=2520, help="거래일 수 (10년 ≈ 2520)")
+    p.add_argument("--chunk", type=int, default=250, help="한 번에 계산할 종목 수")
+    p.add_argument("--pandas-sample", type=int, default=50)
+    p.set_defaults(func=bench_indicators)
+
+    p = sub.add_parser("windows", help="학습 윈도 생성 최대 메모리 비교")
+    p.add_argument("--days", type=int, default=7500, help="지표 생성 후 행 수 (장기 이력 종목)")
+    p.add_argument("--time-steps", type=int, default=90)
+    p.set_defaults(func=bench_windows)
+
+    p = sub.add_parser("rollout", help="model.predict 루프 vs 컴파일된 예측 그래프")
+    p.add_argument("--model", default=os.path.join("models", "model_005930_KS_60.keras"))
+    p.add_argument("--horizon", type=int, default=30)
+    p.add_argument("--repeat", type=int, default=5)
+    p.set_defaults(func=bench_rollout)
+
+    p = sub.add_parser("news", help="뉴스 크롤링 브라우저 풀 재사용 효과 (로컬 정적 HTML)")
+    p.add_argument("--requests", type=int, default=10)
+    p.add_argument("--pool-size", type=int, default=2)
+    p.add_argument("--articles", type=int, default=20)
+    p.add_argument("--latency", type=float, default=0.05, help="로컬 서버 응답 지연(초)")
+    p.add_argument("--legacy", action="store_true", help="요청마다 브라우저를 띄우는 기존 방식도 측정")
+    p.add_argument("--http-only", action="store_true", help="HTTP 단계만 측정 (Chrome 불필요)")
+    p.set_defaults(func=bench_news)
+
+    p = sub.add_parser("tflite", help="Keras vs TFLite 추론 백엔드 지연 시간/메모리")
+    p.add_argument("--symbol", required=True)
+    p.add_argument("--time-steps", type=int, default=60)
+    p.add_argument("--quantize", choices=["float16", "int8"])
+    p.add_argument("--horizon", type=int, default=30)
+    p.add_argument("--repeat", type=int, default=20)
+    p.add_argument("--no-export", dest="export", action="store_false", help="이미 변환된 .tflite 사용")
+    p.set_defaults(func=bench_tflite)
+
+    p = sub.add_parser("startup", help="앱 콜드 스타트(-X importtime) 측정")
+    p.add_argument("--top", type=int, default=15, help="표시할 최상위 import 수")
+    p.add_argument("--timeout", type=float, default=120, help="AppTest 실행 제한 시간(초)")
+    p.add_argument("--output", help="측정 결과 JSON 저장 경로 (추세 추적용)")
+    p.set_defaults(func=bench_startup)
+
+    p = sub.add_parser("direct", help="자기회귀 vs 30일 다중 출력 모델 백테스트/지연 시간 비교")
+    p.add_argument("--code", help="OHLCV 저장소의 종목 코드 (없으면 임의 일봉)")
+    p.add_argument("--days", type=int, default=1500, help="임의 일봉 길이")
+    p.add_argument("--time-steps", type=int, default=60)
+    p.add_argument("--epochs", type=int, default=30)
+    p.add_argument("--repeat", type=int, default=20)
+    p.set_defaults(func=bench_direct)
+
+    p = sub.add_parser("backtest", help="출발점별 개별 예측 vs 배치 워크포워드 백테스트")
+    p.add_argument("--days", type=int, default=1500, help="임의 일봉 길이")
+    p.add_argument("--time-steps", type=int, default=60)
+    p.add_argument("--epochs", type=int, default=3)
+    p.add_argument("--legacy-origins", type=int, default=20, help="기존 방식으로 실제 측정할 출발점 수")
+    p.set_defaults(func=bench_backtest)
+
+    p = sub.add_parser("scaling", help="joblib MinMaxScaler vs .npy FeatureScaler 로드/역변환")
+    p.add_argument("--rows", type=int, default=2500)
+    p.add_argument("--horizon", type=int, default=30)
+    p.add_argument("--repeat", type=int, default=2000)
+    p.set_defaults(func=bench_scaling)
+
+    p = sub.add_parser("fundamentals", help="종목 메인 페이지 지표 파서 (고정 HTML)")
+    p.add_argument("--html", help="파서 입력 HTML 파일 (없으면 내장 고정 페이지)")
+    p.add_argument("--record", metavar="CODE", help="지정 종목 페이지를 --html 경로에 먼저 저장")
+    p.add_argument("--repeat", type=int, default=50)
+    p.set_defaults(func=bench_fundamentals)
+
+    p = sub.add_parser("symbols", help="로컬 종목 마스터 검색 지연 시간 (정확/접두/초성/유사)")
+    p.add_argument("--master", help="종목 마스터 Parquet (없으면 임의 마스터)")
+    p.add_argument("--tickers", type=int, default=2700)
+    p.add_argument("--repeat", type=int, default=500)
+    p.set_defaults(func=bench_symbols)
+
+    p = sub.add_parser("metadata", help="종목 페이지 rerun 당 Yahoo 메타데이터 요청 수/지연")
+    p.add_argument("--reruns", type=int, default=20)
+    p.add_argument("--latency", type=float, default=0.3, help="가상 quoteSummary 응답 시간(초)")
+    p.set_defaults(func=bench_metadata)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
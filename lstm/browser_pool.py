@@ -0,0 +1,177 @@
+# browser_pool.py
+"""
+재사용 가능한 headless Chrome WebDriver 풀.
+
+크롬 드라이버 경로는 프로세스 시작 후 한 번만 찾고(CHROMEDRIVER 환경변수 → PATH →
+webdriver_manager), 띄운 브라우저는 요청마다 종료하지 않고 풀에 돌려놓습니다.
+빌려줄 때 상태를 확인해 죽은 브라우저는 새로 띄우고, 일정 페이지 수를 처리한 브라우저는
+메모리 누수를 막기 위해 교체합니다.
+
+    with get_pool().driver() as driver:
+        driver.get(url)
+"""
+
+import atexit
+import os
+import queue
+import shutil
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+
+POOL_SIZE = int(os.getenv("ECOS_BROWSER_POOL", "2"))
+MAX_PAGES_PER_DRIVER = int(os.getenv("ECOS_BROWSER_MAX_PAGES", "50"))
+ACQUIRE_TIMEOUT = 30.0
+PAGE_LOAD_TIMEOUT = 20
+USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+              "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
+
+
+@lru_cache(maxsize=1)
+def resolve_driver_path() -> str:
+    """chromedriver 경로를 한 번만 결정합니다 (webdriver_manager 다운로드/버전 확인은 최초 1회)."""
+    path = os.getenv("CHROMEDRIVER") or shutil.which("chromedriver")
+    if path:
+        return path
+    from webdriver_manager.chrome import ChromeDriverManager
+    return ChromeDriverManager().install()
+
+
+def chrome_options() -> Options:
+    options = Options()
+    options.add_argument("--headless")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--disable-gpu")
+    options.add_argument(f"user-agent={USER_AGENT}")
+    # 이미지는 크롤링에 필요 없으므로 받지 않음
+    options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+    return options
+
+
+def new_chrome_driver():
+    driver = webdriver.Chrome(service=Service(resolve_driver_path()), options=chrome_options())
+    driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+    return driver
+
+
+def _quit(driver):
+    try:
+        driver.quit()
+    except Exception:
+        pass
+
+
+class DriverPool:
+    """크기 제한이 있는 스레드 안전 WebDriver 풀 (브라우저는 처음 필요할 때 띄움)."""
+
+    def __init__(self, size: int = POOL_SIZE, max_pages: int = MAX_PAGES_PER_DRIVER,
+                 factory=new_chrome_driver):
+        self.size = size
+        self.max_pages = max_pages
+        self.factory = factory
+        self._idle = queue.LifoQueue()   # 최근에 쓴(캐시가 따뜻한) 브라우저부터 재사용
+        self._pages = {}                 # id(driver) -> 처리한 페이지 수
+        self._created = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
+    @staticmethod
+    def is_healthy(driver) -> bool:
+        try:
+            return driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def _create(self):
+        driver = self.factory()
+        self._pages[id(driver)] = 0
+        return driver
+
+    def _discard(self, driver):
+        self._pages.pop(id(driver), None)
+        _quit(driver)
+        with self._lock:
+            self._created -= 1
+
+    def acquire(self, timeout: float = ACQUIRE_TIMEOUT):
+        """유휴 브라우저를 빌리거나, 여유가 있으면 새로 띄웁니다."""
+        if self._closed:
+            raise RuntimeError("DriverPool 이 이미 종료되었습니다.")
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                with self._lock:
+                    can_create = self._created < self.size
+                    if can_create:
+                        self._created += 1
+                if can_create:
+                    try:
+                        return self._create()
+                    except Exception:
+                        with self._lock:
+                            self._created -= 1
+                        raise
+                driver = self._idle.get(timeout=timeout)   # 시간 초과 시 queue.Empty
+
+            if self._pages.get(id(driver), 0) < self.max_pages and self.is_healthy(driver):
+                return driver
+            # 수명이 다했거나 응답하지 않는 브라우저는 교체
+            self._discard(driver)
+
+    def release(self, driver, broken: bool = False):
+        if broken or self._closed:
+            self._discard(driver)
+            return
+        self._pages[id(driver)] = self._pages.get(id(driver), 0) + 1
+        self._idle.put(driver)
+
+    @contextmanager
+    def driver(self, timeout: float = ACQUIRE_TIMEOUT):
+        driver = self.acquire(timeout)
+        broken = False
+        try:
+            yield driver
+        except Exception:
+            # 예외가 난 브라우저는 어떤 상태인지 알 수 없으므로 재사용하지 않음
+            broken = True
+            raise
+        finally:
+            self.release(driver, broken)
+
+    def warm_up(self, count: int = None):
+        """브라우저를 미리 띄워 첫 요청의 기동 시간을 없앱니다."""
+        drivers = [self.acquire() for _ in range(min(count or self.size, self.size))]
+        for driver in drivers:
+            self._idle.put(driver)
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
+    def stats(self) -> dict:
+        return {"size": self.size, "created": self._created, "idle": self._idle.qsize(),
+                "pages": sum(self._pages.values())}
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> DriverPool:
+    """프로세스 전역 풀 (모든 Streamlit 세션이 공유)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = DriverPool()
+            atexit.register(_pool.close)
+        return _pool
@@ -7,14 +7,27 @@ from io import StringIO
 from bs4 import BeautifulSoup
 import streamlit as st
 from datetime import datetime, timedelta
-import re
-import certifi
 import numpy as np
-import yfinance as yf # 🚨 yfinance 임포트 추가 (상단에 이미 있었으나 재확인)
+import ohlcv_store
+from fundamentals import Fundamentals, get_fundamentals, read_cached
+from metadata import get_metadata, name_keyword
+import symbols
+import universe
 
 
 def search_stock_code(query):
+    """
+    검색어(한글명/영문명/코드/초성)를 Yahoo 심볼(005930.KS, 035720.KQ 등)로 바꿉니다.
+    로컬 종목 마스터(symbols)에서 먼저 찾고, 없을 때만 네이버 검색을 사용합니다.
+    """
     query = query.strip()
+    index = symbols.get_index()
+    match = index.resolve(query)
+    if match is not None:
+        st.success(f"검색 성공: '{query}' → {match.name} ({match.symbol})")
+        return match.symbol
+
+    # 🚨 [수정] 마스터에 없는 종목(신규 상장 등)만 네이버 검색
     headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
     url = f"https://search.naver.com/search.naver?where=stock&query={query}"
     try:
@@ -24,164 +37,81 @@ def search_stock_code(query):
             if 'finance.naver.com/item' in a['href']:
                 code = a['href'].split('code=')[1].split('&')[0]
                 if len(code) == 6 and code.isdigit():
-                    symbol = f"{code}.KS"
+                    # 시장을 알 수 없으면 KOSPI(.KS)로 간주
+                    symbol = index.symbol_for_code(code) or f"{code}.KS"
                     st.success(f"검색 성공: '{query}' → {symbol}")
                     return symbol
-        st.warning(f"종목 없음: {query}")
+        # 마스터의 유사도 후보는 자동 선택하지 않고 안내만 함 (검색창 아래 추천 버튼과 같은 후보)
+        similar = [f"{m.name} ({m.symbol})" for m in index.search(query, 3)]
+        st.warning(f"종목 없음: {query}" + (f" — 혹시: {', '.join(similar)}" if similar else ""))
         return None
     except Exception as e:
         st.error(f"검색 오류: {e}")
         return None
 
 
-def parse_money(text: str) -> float:
-    """모든 케이스 완벽 처리: '595조 5,156억', '784억', '3,578조' 등"""
-    if not text or not text.strip():
-        return 0.0
-    text = re.sub(r"[,\s]", "", text.strip())
-    val = 0.0
-
-    # 1. 조 단위
-    if "조" in text:
-        match = re.search(r"([\d\.]+)조", text)
-        if match:
-            val += float(match.group(1))
-        text = re.sub(r"[\d\.]*조", "", text)
-
-    # 2. 억 단위 (조가 없으면 남은 숫자는 무조건 억으로 간주)
-    match = re.search(r"([\d\.]+)", text)
-    if match:
-        billions = float(match.group(1))
-        val += billions / 10_000  # 억 → 조
-
-    return round(val, 4)
-
-@st.cache_data(show_spinner=False, ttl=3600)
-def get_korean_fundamentals(code: str) -> dict:
-    data = {
-        "per": None, "pbr": None, "psr": None,
-        "foreign_ownership": None, "dividend_yield": None, "market_cap": None
-    }
-
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
-        "Accept-Language": "ko-KR,ko;q=0.9"
-    }
-
+def get_korean_fundamentals(code: str) -> Fundamentals:
+    """
+    기업 가치 지표 레코드. 일일 전 종목 스냅샷(universe.py)에 있으면 스냅샷 값을 그대로 쓰고,
+    스냅샷에 PSR 이 없을 때만 종목 페이지 디스크 캐시(fundamentals.read_cached)의 매출액으로 계산합니다.
+    이 경로에서는 캐시가 오래됐어도 요청하지 않습니다.
+    스냅샷에 없으면 종목 페이지를 파싱합니다 (디스크 캐시를 모든 세션/프로세스가 공유).
+    접속 실패 시 경고를 띄우고 값이 모두 None 인 레코드를 반환합니다.
+    """
+    record = universe.lookup(code)
+    if record is not None:
+        if record.psr is None:
+            cached = read_cached(code)
+            if record.revenue is None and cached is not None:
+                record.revenue = cached.revenue
+            if record.market_cap and record.revenue:
+                record.psr = round(record.market_cap / record.revenue, 2)
+        return record
     try:
-        url = f"https://finance.naver.com/item/main.naver?code={code}"
-        resp = requests.get(url, headers=headers, timeout=20, verify=certifi.where())
-        resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, "lxml")
+        record = get_fundamentals(code)
     except Exception as e:
-        st.warning(f"접속 실패: {e}")
-        return data
-
-    # 1. PER, PBR, PSR → 네이버가 이미 계산해준 값 그대로 가져오기 (100% 정확)
-    for tid, key in [("_per", "per"), ("_pbr", "pbr"), ("_psr", "psr")]:
-        tag = soup.find("em", id=tid)
-        if tag:
-            try:
-                val = tag.get_text(strip=True).replace(",", "")
-                data[key] = round(float(val), 2)
-            except:
-                pass
-
-    # 2. 시가총액
-    mcap_tag = soup.find("em", id="_market_sum")
-    if mcap_tag:
-        text = mcap_tag.get_text(strip=True)
-        text = re.sub(r"[,\s]", "", text)
-        val = 0.0
-        if "조" in text:
-            t = re.search(r"([\d\.]+)조", text)
-            if t: val += float(t.group(1))
-            text = re.sub(r"[\d\.]*조", "", text)
-        if text:
-            b = re.search(r"([\d\.]+)", text)
-            if b: val += float(b.group(1)) / 10_000
-        if val > 0:
-            data["market_cap"] = round(val, 2)
-
-    # 3. 외국인 지분율 & 배당수익률
-    full_text = soup.get_text()
-    for pat in [r"외국인[^\d]*([\d,]+\.\d+)%", r"외국인\s*지분율[^\d]*([\d,]+\.\d+)%"]:
-        m = re.search(pat, full_text)
-        if m:
-            data["foreign_ownership"] = float(m.group(1).replace(",", ""))
-            break
-
-    for pat in [r"배당수익률[^\d]*([\d,]+\.\d+)%", r"배당수익률\s*\[?[^\d]*([\d,]+\.\d+)%"]:
-        m = re.search(pat, full_text)
-        if m:
-            data["dividend_yield"] = float(m.group(1).replace(",", ""))
-            break
-
-    return data
+        st.warning(f"네이버 접속 실패: {e}")
+        return Fundamentals(code=code)
+    if record.market_cap is None:
+        st.warning(f"시가총액 조회 실패: Naver 페이지에서 '_market_sum' 값을 읽지 못했습니다. (코드: {code})")
+    return record
 
 
 # 🚨 get_english_name 함수 추가 🚨
-@st.cache_data(ttl=3600)
+# 🚨 [수정] 종목 마스터 영문명 → 메타데이터 캐시(metadata.get_metadata) 순으로 조회
 def get_english_name(symbol: str) -> str:
     """
-    종목 티커를 사용하여 Yahoo Finance에서 회사 영문 이름을 가져와 필터링용 소문자로 반환합니다.
+    종목 티커의 회사 영문 이름을 필터링용 소문자로 반환합니다.
+    로컬 종목 마스터에 영문명이 있으면 네트워크 요청이 없고, 없을 때만 Yahoo 메타데이터 캐시를 씁니다.
     """
     if not symbol:
         return ""
-    
+
+    code = symbol.split(".")[0]
+    name_en = symbols.get_index().english_name(code)
+    if name_en:
+        return name_keyword(name_en)
     try:
-        ticker = yf.Ticker(symbol)
-        # longName 또는 shortName을 사용하여 영문명을 가져옵니다.
-        long_name = ticker.info.get('longName', ticker.info.get('shortName', ''))
-        
-        if long_name:
-            # 특수 문자 제거 및 공백 기준으로 첫 2~3 단어만 사용
-            cleaned_name = re.sub(r'[^\w\s]', '', long_name)
-            # 'SK Hynix Inc' -> 'sk hynix' (소문자, 2단어만 사용)
-            return ' '.join(cleaned_name.split()[:3]).lower()
-            
-        return ""
+        return name_keyword(get_metadata(symbol).name)
     except Exception:
         # 야후 파이낸스 데이터 로드 실패 시, 기본 영문 티커 반환
-        return symbol.split(".")[0].lower()
+        return code.lower()
 
 
-@st.cache_data
+# 저장소가 증분 갱신을 담당하므로 캐시는 짧게 유지해 새 거래일이 반영되도록 함
+@st.cache_data(ttl=600)
 def load_stock_data(input_text):
     symbol = search_stock_code(input_text)
     if not symbol:
         return pd.DataFrame(), None
 
-    code = symbol.replace('.KS', '')
-    headers = {'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'}
-    all_data = []
-    max_pages = 150
+    code = symbol.split('.')[0]
 
     with st.spinner(f"[{symbol}] 데이터 수집 중..."):
-        session = requests.Session()
-        for page in range(1, max_pages + 1):
-            url = f"https://finance.naver.com/item/sise_day.naver?code={code}&page={page}"
-            try:
-                resp = session.get(url, headers=headers, timeout=10)
-                df_page = pd.read_html(StringIO(resp.text), flavor='lxml')[0].dropna()
-                if len(df_page) < 7:
-                    break
-                all_data.append(df_page)
-                time.sleep(0.05)
-            except:
-                break
-
-    if not all_data:
-        return pd.DataFrame(), symbol
+        df = ohlcv_store.update(code)
 
-    df = pd.concat(all_data, ignore_index=True)
-    df['날짜'] = pd.to_datetime(df['날짜'], format='%Y.%m.%d', errors='coerce')
-    df = df.dropna(subset=['날짜'])
-
-    for kr, en in zip(['종가', '시가', '고가', '저가', '거래량'], ['Close', 'Open', 'High', 'Low', 'Volume']):
-        df[en] = pd.to_numeric(df[kr].astype(str).str.replace(',', ''), errors='coerce')
-
-    df = df.set_index('날짜').sort_index()[['Open', 'High', 'Low', 'Close', 'Volume']].dropna()
+    if df.empty:
+        return pd.DataFrame(), symbol
 
     if len(df) < 90:
         st.error(f"데이터 부족: {len(df)}일")
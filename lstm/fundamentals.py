@@ -0,0 +1,231 @@
+# fundamentals.py
+"""
+네이버 금융 종목 메인 페이지(item/main.naver)의 기업 가치 지표 추출기.
+
+페이지는 커넥션을 재사용하는 세션으로 한 번만 받고, lxml 트리에서 id/표 머리글 XPath 로
+PER/PBR/PSR/시가총액/매출액/배당수익률/외국인 소진율을 찾습니다. 표에서 찾지 못한 항목만
+페이지 전체 텍스트(한 번만 계산)에 정규식을 적용합니다.
+
+결과는 data/fundamentals/{code}.json 에 TTL(기본 1시간)과 함께 저장되므로 여러 세션과
+프로세스(앱, 배치)가 같은 결과를 공유합니다. Streamlit 에 의존하지 않습니다.
+
+    record = get_fundamentals("005930")
+    record.per, record.market_cap   # 배, 조 원
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from dataclasses import asdict, dataclass, fields
+from typing import Optional
+
+import lxml.html
+
+from sise_fetcher import NAVER_FINANCE_URL, make_session
+
+CACHE_DIR = os.path.join("data", "fundamentals")
+FUNDAMENTALS_TTL = float(os.getenv("ECOS_FUNDAMENTALS_TTL", "3600"))
+HTTP_TIMEOUT = 20
+
+_NUMBER = re.compile(r"-?[\d,]+(?:\.\d+)?")
+_PERCENT = re.compile(r"([\d,]+\.\d+)%")
+_FOREIGN_PATTERNS = [re.compile(p) for p in (
+    r"외국인[^\d]*([\d,]+\.\d+)%",
+    r"외국인\s*지분율[^\d]*([\d,]+\.\d+)%",
+    r"외국인\s*[\[\(][^%\d]*([\d,]+\.\d+)%[\]\)]",
+)]
+_DIVIDEND_PATTERNS = [re.compile(p) for p in (
+    r"배당수익률[^\d]*([\d,]+\.\d+)%",
+    r"배당수익률\s*\[?\s*TTM\s*\]?\s*[^\d]*([\d,]+\.\d+)%",
+    r"배당수익률\s*[:\-]?\s*([\d,]+\.\d+)%",
+)]
+
+
+@dataclass
+class Fundamentals:
+    """한 종목의 기업 가치 지표. 찾지 못한 항목은 None (시가총액/매출액 단위: 조 원)."""
+    code: str
+    per: Optional[float] = None
+    pbr: Optional[float] = None
+    psr: Optional[float] = None
+    foreign_ownership: Optional[float] = None
+    dividend_yield: Optional[float] = None
+    market_cap: Optional[float] = None
+    revenue: Optional[float] = None
+    fetched_at: float = 0.0
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        known = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in data.items() if k in known})
+
+
+def parse_money(text: str) -> float:
+    """'595조 5,156억', '784억', '3,578조', '2,589,355'(억) 등을 조 단위로 변환합니다."""
+    if not text or not text.strip():
+        return 0.0
+    text = re.sub(r"[,\s]", "", text.strip())
+    val = 0.0
+
+    # 1. 조 단위
+    if "조" in text:
+        match = re.search(r"([\d\.]+)조", text)
+        if match:
+            val += float(match.group(1))
+        text = re.sub(r"[\d\.]*조", "", text)
+
+    # 2. 억 단위 (조가 없으면 남은 숫자는 무조건 억으로 간주)
+    match = re.search(r"([\d\.]+)", text)
+    if match:
+        val += float(match.group(1)) / 10_000  # 억 → 조
+
+    return round(val, 4)
+
+
+def _to_float(text):
+    match = _NUMBER.search(text or "")
+    if not match:
+        return None
+    try:
+        return round(float(match.group().replace(",", "")), 2)
+    except ValueError:
+        return None
+
+
+def _em_value(root, em_id):
+    nodes = root.xpath(f"//em[@id='{em_id}']")
+    return _to_float(nodes[0].text_content()) if nodes else None
+
+
+def _row_cells(root, header):
+    """머리글(th)에 header 가 들어간 첫 행의 td 텍스트 목록."""
+    rows = root.xpath(f"//tr[th[contains(normalize-space(.), '{header}')]]")
+    return [td.text_content().strip() for td in rows[0].xpath("./td")] if rows else []
+
+
+def _first_percent(cells):
+    for text in cells:
+        match = _PERCENT.search(text)
+        if match:
+            return float(match.group(1).replace(",", ""))
+    return None
+
+
+def _search(patterns, text):
+    for pattern in patterns:
+        match = pattern.search(text)
+        if match:
+            return float(match.group(1).replace(",", ""))
+    return None
+
+
+def parse_fundamentals(html: str, code: str = "") -> Fundamentals:
+    """종목 메인 페이지 HTML 에서 지표를 추출합니다 (네트워크 접근 없음)."""
+    record = Fundamentals(code=code, fetched_at=time.time())
+    if not html or not html.strip():
+        return record
+    root = lxml.html.fromstring(html)
+
+    # 1. PER, PBR, PSR → 네이버가 계산해 둔 값
+    record.per = _em_value(root, "_per")
+    record.pbr = _em_value(root, "_pbr")
+    record.psr = _em_value(root, "_psr")
+
+    # 2. 시가총액, 매출액 (연간 실적 표의 첫 값)
+    mcap = root.xpath("//em[@id='_market_sum']")
+    if mcap:
+        market_cap = parse_money(mcap[0].text_content())
+        record.market_cap = round(market_cap, 2) if market_cap > 0 else None
+    revenue = next((parse_money(t) for t in _row_cells(root, "매출액") if _NUMBER.search(t)), 0.0)
+    record.revenue = revenue or None
+    if record.psr is None and record.market_cap and record.revenue:
+        record.psr = round(record.market_cap / record.revenue, 2)
+
+    # 3. 외국인 소진율, 배당수익률: 표에서 먼저 찾고, 없을 때만 전체 텍스트(1회 계산)를 검색
+    # "외국인한도주식수(A)" 행(주식 수)이 먼저 나오므로 비율이 있는 소진율 행을 직접 지정
+    record.foreign_ownership = _first_percent(_row_cells(root, "외국인소진율"))
+    record.dividend_yield = _em_value(root, "_dvr")
+    if record.dividend_yield is None:
+        record.dividend_yield = _first_percent(_row_cells(root, "배당수익률"))
+    if record.foreign_ownership is None or record.dividend_yield is None:
+        full_text = root.text_content()
+        if record.foreign_ownership is None:
+            record.foreign_ownership = _search(_FOREIGN_PATTERNS, full_text)
+        if record.dividend_yield is None:
+            record.dividend_yield = _search(_DIVIDEND_PATTERNS, full_text)
+    return record
+
+
+_session = None
+_session_lock = threading.Lock()
+_code_locks = {}
+
+
+def _http_session():
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = make_session(4)
+            _session.headers.update({"Accept-Language": "ko-KR,ko;q=0.9"})
+        return _session
+
+
+def fetch_page(code: str, base_url: str = NAVER_FINANCE_URL) -> str:
+    response = _http_session().get(f"{base_url}/item/main.naver", params={"code": code}, timeout=HTTP_TIMEOUT)
+    response.raise_for_status()
+    return response.text
+
+
+def _cache_path(code: str, cache_dir: str) -> str:
+    return os.path.join(cache_dir, f"{code}.json")
+
+
+def read_cached(code: str, cache_dir: str = CACHE_DIR):
+    """디스크 캐시의 레코드 (없거나 깨졌으면 None). 만료 여부는 fetched_at 으로 판단합니다."""
+    try:
+        with open(_cache_path(code, cache_dir), encoding="utf-8") as f:
+            return Fundamentals.from_dict(json.load(f))
+    except (OSError, ValueError, TypeError):
+        return None
+
+
+def _write_cache(record: Fundamentals, cache_dir: str):
+    os.makedirs(cache_dir, exist_ok=True)
+    path = _cache_path(record.code, cache_dir)
+    # 다른 프로세스가 읽는 도중 깨진 파일을 보지 않도록 임시 파일에 쓴 뒤 교체
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(record.to_dict(), f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def get_fundamentals(code: str, ttl: float = FUNDAMENTALS_TTL, cache_dir: str = CACHE_DIR,
+                     base_url: str = NAVER_FINANCE_URL) -> Fundamentals:
+    """
+    캐시가 ttl 초 이내면 그대로, 아니면 페이지를 한 번 받아 파싱·저장한 레코드를 반환합니다.
+    접속에 실패하면 만료된 캐시라도 반환하고, 캐시도 없으면 예외를 그대로 올립니다.
+    """
+    cached = read_cached(code, cache_dir)
+    if cached is not None and time.time() - cached.fetched_at < ttl:
+        return cached
+
+    # 같은 프로세스의 여러 세션이 동시에 요청해도 한 번만 받음
+    with _session_lock:
+        lock = _code_locks.setdefault(code, threading.Lock())
+    with lock:
+        latest = read_cached(code, cache_dir)
+        if latest is not None and time.time() - latest.fetched_at < ttl:
+            return latest
+        try:
+            record = parse_fundamentals(fetch_page(code, base_url), code)
+        except Exception:
+            if cached is not None:
+                return cached
+            raise
+        _write_cache(record, cache_dir)
+        return record
@@ -0,0 +1,301 @@
+# indicators.py
+"""
+LSTM 학습/예측 공용 기술적 지표 엔진 (NumPy 벡터화).
+
+모든 함수는 마지막 축(시간축) 기준으로 동작하므로 1차원 시계열뿐 아니라
+(종목 수, 거래일 수) 형태의 2차원 배열도 한 번에 계산할 수 있습니다.
+행 단위 파이썬 호출 없이 누적합, 스트라이드 뷰, IIR 필터만 사용합니다.
+"""
+
+from collections import deque
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import lfilter
+
+FEATURES = ['Close', 'Volume', 'SMA_5', 'SMA_20', 'RSI', 'MACD', 'Volume_SMA',
+            'BB_Upper', 'BB_Lower', 'OBV', 'Stoch_K', 'Stoch_D', 'ROC']
+
+
+def _pad_front(values, n):
+    """앞쪽 n개를 NaN으로 채워 원래 길이로 맞춥니다 (pandas rolling 결과와 동일한 정렬)."""
+    pad = np.full(values.shape[:-1] + (n,), np.nan)
+    return np.concatenate([pad, values], axis=-1)
+
+
+def _window_sums(x, window):
+    csum = np.cumsum(x, axis=-1)
+    sums = csum[..., window - 1:].copy()
+    sums[..., 1:] -= csum[..., :-window]
+    return sums
+
+
+def rolling_mean(x, window):
+    """창 안에 NaN이 하나라도 있으면 NaN (pandas rolling 기본 min_periods와 동일)."""
+    x = np.asarray(x, dtype=float)
+    if x.shape[-1] < window:
+        return np.full(x.shape, np.nan)
+    missing = np.isnan(x)
+    means = _window_sums(np.where(missing, 0.0, x), window) / window
+    if missing.any():
+        means[_window_sums(missing, window) > 0] = np.nan
+    return _pad_front(means, window - 1)
+
+
+def rolling_std(x, window):
+    """표본 표준편차 (ddof=1, pandas 기본값과 동일)."""
+    x = np.asarray(x, dtype=float)
+    if x.shape[-1] < window:
+        return np.full(x.shape, np.nan)
+    return _pad_front(sliding_window_view(x, window, axis=-1).std(axis=-1, ddof=1), window - 1)
+
+
+def rolling_max(x, window):
+    x = np.asarray(x, dtype=float)
+    if x.shape[-1] < window:
+        return np.full(x.shape, np.nan)
+    return _pad_front(sliding_window_view(x, window, axis=-1).max(axis=-1), window - 1)
+
+
+def rolling_min(x, window):
+    x = np.asarray(x, dtype=float)
+    if x.shape[-1] < window:
+        return np.full(x.shape, np.nan)
+    return _pad_front(sliding_window_view(x, window, axis=-1).min(axis=-1), window - 1)
+
+
+def ema(x, span):
+    """adjust=False 지수이동평균: y[t] = a*x[t] + (1-a)*y[t-1], y[0] = x[0]."""
+    x = np.asarray(x, dtype=float)
+    alpha = 2.0 / (span + 1)
+    zi = (1 - alpha) * x[..., :1]
+    y, _ = lfilter([alpha], [1, alpha - 1], x, axis=-1, zi=zi)
+    return y
+
+
+def diff(x, periods=1):
+    x = np.asarray(x, dtype=float)
+    return _pad_front(x[..., periods:] - x[..., :-periods], periods)
+
+
+def rsi(close, window=14):
+    delta = diff(close)
+    # NaN(첫 행)은 비교 결과가 False 이므로 0으로 채워짐 (pandas where 와 동일)
+    gain = rolling_mean(np.where(delta > 0, delta, 0.0), window)
+    loss = rolling_mean(np.where(delta < 0, -delta, 0.0), window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rs_calc = 100 - (100 / (1 + gain / loss))
+    # 손실이 0이면 상승만 있었으면 100, 변동이 없었으면 0
+    out = np.where(loss == 0, np.where(gain > 0, 100.0, 0.0), rs_calc)
+    return np.where(np.isnan(loss), np.nan, out)
+
+
+def obv(close, volume):
+    direction = np.nan_to_num(np.sign(diff(close)))
+    return np.cumsum(direction * np.asarray(volume, dtype=float), axis=-1)
+
+
+def stochastic(high, low, close, window=14, smooth=3):
+    high_n = rolling_max(high, window)
+    low_n = rolling_min(low, window)
+    spread = high_n - low_n
+    spread = np.where(spread == 0, 1e-6, spread)
+    k = 100 * ((np.asarray(close, dtype=float) - low_n) / spread)
+    return k, rolling_mean(k, smooth)
+
+
+def roc(close, periods=9):
+    close = np.asarray(close, dtype=float)
+    prev = _pad_front(close[..., :-periods], periods)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (close - prev) / prev * 100
+
+
+def compute_features(high, low, close, volume):
+    """
+    13개 피처를 FEATURES 순서로 쌓은 배열을 반환합니다.
+    입력이 (T,)이면 (T, 13), (N, T)이면 (N, T, 13) 입니다. 워밍업 구간은 NaN 입니다.
+    """
+    close = np.asarray(close, dtype=float)
+    volume = np.asarray(volume, dtype=float)
+
+    sma_20 = rolling_mean(close, 20)
+    bb_std = rolling_std(close, 20)
+    stoch_k, stoch_d = stochastic(high, low, close)
+
+    columns = [
+        close,
+        volume,
+        rolling_mean(close, 5),
+        sma_20,
+        rsi(close),
+        ema(close, 12) - ema(close, 26),
+        rolling_mean(volume, 20),
+        sma_20 + bb_std * 2,
+        sma_20 - bb_std * 2,
+        obv(close, volume),
+        stoch_k,
+        stoch_d,
+        roc(close),
+    ]
+    return np.stack(columns, axis=-1)
+
+
+def add_technical_indicators(df):
+    """
+    LSTM 학습에 사용된 13가지 기술적 지표를 추가하고 워밍업 구간(NaN)을 제거합니다.
+    """
+    values = compute_features(df['High'].values, df['Low'].values,
+                              df['Close'].values, df['Volume'].values)
+    feats = pd.DataFrame(values, index=df.index, columns=FEATURES)
+    out = pd.concat([df.drop(columns=[c for c in FEATURES if c in df.columns]), feats], axis=1)
+    return out.dropna()
+
+
+class IndicatorState:
+    """
+    일봉을 한 개씩 받아 13개 피처를 상수 시간에 갱신하는 증분 지표 상태.
+
+    이동평균/볼린저/스토캐스틱은 고정 길이 deque와 누적합, MACD는 EMA 상태,
+    OBV는 누적값, ROC는 지연 버퍼로 유지합니다. from_history()로 과거 데이터에서
+    시드한 뒤 update()를 호출하면 배치 엔진(compute_features)의 마지막 행과 같은 값을 냅니다.
+    """
+
+    def __init__(self):
+        self.close_5 = deque(maxlen=5)
+        self.close_20 = deque(maxlen=20)
+        self.volume_20 = deque(maxlen=20)
+        self.gain_14 = deque(maxlen=14)
+        self.loss_14 = deque(maxlen=14)
+        self.high_14 = deque(maxlen=14)
+        self.low_14 = deque(maxlen=14)
+        self.stoch_k_3 = deque(maxlen=3)
+        self.close_lag = deque(maxlen=10)   # 현재 + 9거래일 전 종가 (ROC)
+        self.ema_12 = None
+        self.ema_26 = None
+        self.obv = 0.0
+        self.prev_close = None
+        self.count = 0
+        self._ref = 0.0                     # 분산 계산 시 자릿수 손실을 줄이기 위한 기준값
+        self._reset_sums()
+        self.last = np.full(len(FEATURES), np.nan)
+
+    def _reset_sums(self):
+        self._sum_5 = float(sum(self.close_5))
+        self._sum_20 = float(sum(c - self._ref for c in self.close_20))
+        self._sumsq_20 = float(sum((c - self._ref) ** 2 for c in self.close_20))
+        self._vsum_20 = float(sum(self.volume_20))
+        self._gain_sum = float(sum(self.gain_14))
+        self._loss_sum = float(sum(self.loss_14))
+        self._k_sum = float(sum(self.stoch_k_3))
+
+    @staticmethod
+    def _push(buf, value, total):
+        """deque에 값을 넣고, 밀려난 값을 반영한 새 합계를 반환합니다."""
+        if len(buf) == buf.maxlen:
+            total -= buf[0]
+        buf.append(value)
+        return total + value
+
+    @classmethod
+    def from_history(cls, df):
+        """OHLCV DataFrame의 마지막 시점 상태로 시드합니다 (EMA/OBV는 배치 엔진으로 계산)."""
+        state = cls()
+        high = df['High'].to_numpy(dtype=float)
+        low = df['Low'].to_numpy(dtype=float)
+        close = df['Close'].to_numpy(dtype=float)
+        volume = df['Volume'].to_numpy(dtype=float)
+        if len(close) == 0:
+            return state
+
+        feats = compute_features(high, low, close, volume)
+        delta = np.nan_to_num(diff(close))
+
+        state._ref = close[0]
+        state.close_5.extend(close[-5:])
+        state.close_20.extend(close[-20:])
+        state.volume_20.extend(volume[-20:])
+        state.gain_14.extend(np.where(delta > 0, delta, 0.0)[-14:])
+        state.loss_14.extend(np.where(delta < 0, -delta, 0.0)[-14:])
+        state.high_14.extend(high[-14:])
+        state.low_14.extend(low[-14:])
+        k_tail = feats[-3:, FEATURES.index('Stoch_K')]
+        state.stoch_k_3.extend(k_tail[~np.isnan(k_tail)])
+        state.close_lag.extend(close[-10:])
+        state.ema_12 = float(ema(close, 12)[-1])
+        state.ema_26 = float(ema(close, 26)[-1])
+        state.obv = float(feats[-1, FEATURES.index('OBV')])
+        state.prev_close = float(close[-1])
+        state.count = len(close)
+        state._reset_sums()
+        state.last = feats[-1].copy()
+        return state
+
+    def update(self, high, low, close, volume):
+        """새 일봉 하나를 반영하고 FEATURES 순서의 피처 벡터를 반환합니다 (워밍업 중엔 NaN 포함)."""
+        high, low, close, volume = float(high), float(low), float(close), float(volume)
+        if self.count == 0:
+            self._ref = close
+
+        delta = 0.0 if self.prev_close is None else close - self.prev_close
+        self._sum_5 = self._push(self.close_5, close, self._sum_5)
+        if len(self.close_20) == 20:
+            old = self.close_20[0] - self._ref
+            self._sum_20 -= old
+            self._sumsq_20 -= old * old
+        self.close_20.append(close)
+        self._sum_20 += close - self._ref
+        self._sumsq_20 += (close - self._ref) ** 2
+        self._vsum_20 = self._push(self.volume_20, volume, self._vsum_20)
+        self._gain_sum = self._push(self.gain_14, max(delta, 0.0), self._gain_sum)
+        self._loss_sum = self._push(self.loss_14, max(-delta, 0.0), self._loss_sum)
+        self.high_14.append(high)
+        self.low_14.append(low)
+        self.close_lag.append(close)
+
+        alpha_12, alpha_26 = 2.0 / 13, 2.0 / 27
+        self.ema_12 = close if self.ema_12 is None else alpha_12 * close + (1 - alpha_12) * self.ema_12
+        self.ema_26 = close if self.ema_26 is None else alpha_26 * close + (1 - alpha_26) * self.ema_26
+        if self.prev_close is not None:
+            self.obv += np.sign(delta) * volume
+        self.prev_close = close
+        self.count += 1
+
+        nan = np.nan
+        sma_5 = self._sum_5 / 5 if len(self.close_5) == 5 else nan
+        if len(self.close_20) == 20:
+            mean_20 = self._sum_20 / 20
+            var_20 = max((self._sumsq_20 - 20 * mean_20 ** 2) / 19, 0.0)
+            sma_20 = mean_20 + self._ref
+            bb_upper = sma_20 + 2 * var_20 ** 0.5
+            bb_lower = sma_20 - 2 * var_20 ** 0.5
+            volume_sma = self._vsum_20 / 20
+        else:
+            sma_20 = bb_upper = bb_lower = volume_sma = nan
+
+        if len(self.gain_14) == 14:
+            gain, loss = self._gain_sum / 14, self._loss_sum / 14
+            if loss <= 0:
+                rsi_val = 100.0 if gain > 0 else 0.0
+            else:
+                rsi_val = 100 - 100 / (1 + gain / loss)
+        else:
+            rsi_val = nan
+
+        if len(self.high_14) == 14:
+            spread = max(self.high_14) - min(self.low_14)
+            stoch_k = 100 * (close - min(self.low_14)) / (spread if spread != 0 else 1e-6)
+            self._k_sum = self._push(self.stoch_k_3, stoch_k, self._k_sum)
+        else:
+            stoch_k = nan
+        stoch_d = self._k_sum / 3 if len(self.stoch_k_3) == 3 else nan
+
+        if len(self.close_lag) == 10 and self.close_lag[0] != 0:
+            roc_val = (close - self.close_lag[0]) / self.close_lag[0] * 100
+        else:
+            roc_val = nan
+
+        self.last = np.array([close, volume, sma_5, sma_20, rsi_val, self.ema_12 - self.ema_26,
+                              volume_sma, bb_upper, bb_lower, self.obv, stoch_k, stoch_d, roc_val])
+        return self.last
@@ -0,0 +1,339 @@
+# jobs.py
+"""
+학습/예측 백그라운드 작업 큐.
+
+작업은 SQLite 테이블(data/jobs.sqlite)에 기록되고 백그라운드에서 실행되므로
+Streamlit 스크립트는 작업 ID만 들고 상태를 폴링합니다. 사용자가 페이지를 떠나도
+학습은 계속되고 결과(산출물 + 요약 JSON)는 남습니다.
+
+학습(train/fine_tune)은 프로세스 풀(train_batch.worker_pool)에서, 예측(predict)은 앱 프로세스의
+스레드에서 실행합니다. 예측은 프로세스 전역 model_registry 에 남아 있는 모델을 그대로 쓰므로
+자주 보는 종목은 디스크 I/O 나 Keras 역직렬화 없이 예측합니다.
+
+같은 (kind, symbol, time_steps, mode) 작업이 대기/실행 중이면 새로 만들지 않고 기존 작업 ID를
+돌려주므로(부분 UNIQUE 인덱스), 여러 세션이 같은 종목을 눌러도 학습은 한 번만 실행됩니다.
+전체 학습(train)과 증분 업데이트(fine_tune)는 같은 산출물을 쓰므로 둘 중 하나가 진행 중이면
+다른 쪽 제출도 진행 중인 작업 ID를 돌려받습니다.
+
+    runner = get_runner()
+    job_id = runner.submit("train", "005930.KS", 60)
+    runner.get(job_id)  # {'status': 'running', 'progress': 0.4, 'message': 'epoch 12/30 loss 0.00123', ...}
+"""
+
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from model_registry import MODE_STEP, MODEL_DIR, best_train_params
+from train_batch import release_worker_memory, worker_pool
+
+JOB_DB = os.path.join("data", "jobs.sqlite")
+JOB_WORKERS = int(os.getenv("ECOS_JOB_WORKERS", "2"))
+JOB_TF_THREADS = int(os.getenv("ECOS_JOB_TF_THREADS", "2"))
+JOB_PREDICT_THREADS = int(os.getenv("ECOS_JOB_PREDICT_THREADS", "2"))
+KINDS = ("train", "fine_tune", "predict")
+WRITER_KINDS = ("train", "fine_tune")   # 같은 모델/스케일러 파일을 쓰는 작업 (서로 중복 제출 불가)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind        TEXT NOT NULL,
+    symbol      TEXT NOT NULL,
+    time_steps  INTEGER NOT NULL,
+    mode        TEXT NOT NULL DEFAULT 'step',
+    params      TEXT NOT NULL DEFAULT '{}',
+    status      TEXT NOT NULL DEFAULT 'queued',
+    progress    REAL NOT NULL DEFAULT 0,
+    message     TEXT,
+    result      TEXT,
+    error       TEXT,
+    runner_pid  INTEGER,
+    created_at  REAL NOT NULL,
+    started_at  REAL,
+    finished_at REAL
+);
+"""
+_INFLIGHT_INDEX = """
+CREATE UNIQUE INDEX IF NOT EXISTS jobs_inflight_mode
+    ON jobs(kind, symbol, time_steps, mode) WHERE status IN ('queued', 'running');
+"""
+
+
+def connect(db_path: str = JOB_DB) -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)   # autocommit
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    return conn
+
+
+def init_db(db_path: str = JOB_DB):
+    conn = connect(db_path)
+    try:
+        conn.executescript(_SCHEMA)
+        # mode 컬럼 이전에 만든 테이블: 컬럼을 추가하고 (kind, symbol, time_steps) 인덱스를 교체
+        if "mode" not in {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}:
+            conn.execute("ALTER TABLE jobs ADD COLUMN mode TEXT NOT NULL DEFAULT 'step'")
+        conn.execute("DROP INDEX IF EXISTS jobs_inflight")
+        conn.executescript(_INFLIGHT_INDEX)
+    finally:
+        conn.close()
+
+
+def _update(db_path, job_id, **fields):
+    columns = ", ".join(f"{k} = ?" for k in fields)
+    conn = connect(db_path)
+    try:
+        conn.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+    finally:
+        conn.close()
+
+
+def get_job(job_id: int, db_path: str = JOB_DB):
+    """작업 상태 dict (params/result 는 JSON 해석). 없으면 None."""
+    conn = connect(db_path)
+    try:
+        row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    finally:
+        conn.close()
+    if row is None:
+        return None
+    job = dict(row)
+    job["params"] = json.loads(job["params"] or "{}")
+    job["result"] = json.loads(job["result"]) if job["result"] else None
+    return job
+
+
+def _pid_alive(pid) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+# ── 작업 본체 (학습: 워커 프로세스, 예측: 앱 프로세스의 스레드) ──
+
+def _progress_callback(db_path, job_id, epochs):
+    from tensorflow.keras.callbacks import Callback
+
+    class JobProgress(Callback):
+        """에폭이 끝날 때마다 진행률과 loss 를 작업 테이블에 기록합니다."""
+
+        def on_epoch_end(self, epoch, logs=None):
+            loss = (logs or {}).get("loss")
+            _update(db_path, job_id, progress=(epoch + 1) / epochs,
+                    message=f"epoch {epoch + 1}/{epochs}" + (f" loss {loss:.5f}" if loss is not None else ""))
+
+    return JobProgress()
+
+
+def _run_train(job, db_path, model_dir):
+    import ohlcv_store
+    from trainer import train_model
+
+    epochs = job["params"].get("epochs", 30)
+    df = ohlcv_store.update(job["symbol"].split(".")[0])
+    if df.empty:
+        raise ValueError("시세 데이터 없음")
+    # 스윕(sweep.py)이 고른 units/batch_size 가 있으면 그 설정으로 재학습
+    params = best_train_params(job["symbol"], job["time_steps"], model_dir, job["mode"])
+    _update(db_path, job["id"], message="학습 시작")
+    result = train_model(df, job["symbol"], job["time_steps"], epochs=epochs, model_dir=model_dir,
+                         callbacks=[_progress_callback(db_path, job["id"], epochs)], mode=job["mode"], **params)
+    return {
+        "rows": result["rows"],
+        "epochs": result["epochs"],
+        "fit_seconds": result["fit_seconds"],
+        "rmse": result["rmse"],
+        "mae": result["mae"],
+        "mape": result["mape"],
+        "test_y_true": [float(v) for v in result["test_y_true"]],
+        "test_y_pred": [float(v) for v in result["test_y_pred"]],
+        "test_dates": [d.strftime("%Y-%m-%d") for d in result["test_dates"]],
+    }
+
+
+def _run_fine_tune(job, db_path, model_dir):
+    import ohlcv_store
+    from trainer import FINE_TUNE_EPOCHS, fine_tune_model
+
+    epochs = job["params"].get("epochs", FINE_TUNE_EPOCHS)
+    df = ohlcv_store.update(job["symbol"].split(".")[0])
+    if df.empty:
+        raise ValueError("시세 데이터 없음")
+    _update(db_path, job["id"], message="새 거래일 미세조정 시작")
+    result = fine_tune_model(df, job["symbol"], job["time_steps"], epochs=epochs, model_dir=model_dir,
+                             callbacks=[_progress_callback(db_path, job["id"], epochs)])
+    return {k: result[k] for k in ("new_samples", "epochs", "fit_seconds", "loss_before", "loss_after",
+                                   "out_of_range", "last_date")}
+
+
+def _run_predict(job, db_path, model_dir):
+    import ohlcv_store
+    from predict import predict_next_month
+
+    df = ohlcv_store.update(job["symbol"].split(".")[0])
+    if df.empty:
+        raise ValueError("시세 데이터 없음")
+    _update(db_path, job["id"], progress=0.5, message="30일 예측 및 해석 생성 중")
+    pred_df, final_price, interpretation = predict_next_month(
+        df, job["symbol"], job["time_steps"], job["params"].get("company", job["symbol"]), mode=job["mode"])
+    if pred_df is None:
+        raise ValueError(interpretation)
+    return {
+        "dates": [d.strftime("%Y-%m-%d") for d in pred_df.index],
+        "close": [float(v) for v in pred_df["Close"]],
+        "final_price": float(final_price),
+        "interpretation": interpretation,
+    }
+
+
+def execute_job(job_id: int, db_path: str = JOB_DB, model_dir: str = MODEL_DIR):
+    """작업을 running 으로 바꾸고 수행한 뒤 결과/오류를 기록합니다."""
+    job = get_job(job_id, db_path)
+    _update(db_path, job_id, status="running", started_at=time.time(), message="시작")
+    try:
+        run = {"train": _run_train, "fine_tune": _run_fine_tune}.get(job["kind"], _run_predict)
+        result = run(job, db_path, model_dir)
+    except Exception as e:
+        _update(db_path, job_id, status="error", error=str(e) or type(e).__name__,
+                finished_at=time.time())
+        return
+    finally:
+        # 예측은 앱 프로세스에서 돌므로 Keras 상태를 비우면 레지스트리의 모델까지 잃음 → 학습 워커만 해제
+        if job["kind"] in WRITER_KINDS:
+            release_worker_memory()
+    _update(db_path, job_id, status="done", progress=1.0, message="완료",
+            result=json.dumps(result, ensure_ascii=False), finished_at=time.time())
+
+
+# ── 앱 프로세스의 작업 실행기 ──
+
+class JobRunner:
+    """작업 테이블에 기록하고 학습은 프로세스 풀, 예측은 스레드 풀에 넘기는 실행기 (프로세스당 하나)."""
+
+    def __init__(self, db_path: str = JOB_DB, workers: int = JOB_WORKERS,
+                 tf_threads: int = JOB_TF_THREADS, model_dir: str = MODEL_DIR,
+                 predict_threads: int = JOB_PREDICT_THREADS):
+        self.db_path = db_path
+        self.model_dir = model_dir
+        init_db(db_path)
+        self._recover()
+        # train_batch 와 같은 워커 풀 (spawn, 작업 후 Keras 상태 해제, 주기적 워커 교체)
+        self._pool_args = (workers, tf_threads)
+        self._pool = worker_pool(*self._pool_args)
+        # 예측은 워커 교체/clear_session 대상이 아니며 앱 프로세스의 model_registry 를 공유
+        self._threads = ThreadPoolExecutor(max_workers=predict_threads, thread_name_prefix="predict-job")
+        self._lock = threading.Lock()
+
+    def _recover(self):
+        """종료된 실행기가 남긴 대기/실행 중 작업을 오류로 정리해 같은 키로 다시 제출할 수 있게 합니다."""
+        conn = connect(self.db_path)
+        try:
+            rows = conn.execute("SELECT id, runner_pid FROM jobs WHERE status IN ('queued', 'running')").fetchall()
+            for row in rows:
+                if not _pid_alive(row["runner_pid"]) or row["runner_pid"] == os.getpid():
+                    conn.execute("UPDATE jobs SET status = 'error', error = ?, finished_at = ? WHERE id = ?",
+                                 ("서버 재시작으로 중단된 작업", time.time(), row["id"]))
+        finally:
+            conn.close()
+
+    def submit(self, kind: str, symbol: str, time_steps: int, mode: str = MODE_STEP, **params) -> int:
+        """작업을 등록하고 ID를 반환합니다. 같은 키의 작업이 진행 중이면 그 ID를 반환합니다."""
+        if kind not in KINDS:
+            raise ValueError(f"알 수 없는 작업 종류: {kind}")
+        kinds = WRITER_KINDS if kind in WRITER_KINDS else (kind,)
+        with self._lock:
+            conn = connect(self.db_path)
+            try:
+                # 다른 프로세스의 제출과 "진행 중 작업 확인 → 등록" 이 섞이지 않도록 쓰기 잠금을 먼저 잡음
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    row = conn.execute(
+                        f"SELECT id FROM jobs WHERE kind IN ({', '.join('?' * len(kinds))}) AND symbol = ? "
+                        "AND time_steps = ? AND mode = ? AND status IN ('queued', 'running') ORDER BY id LIMIT 1",
+                        (*kinds, symbol, int(time_steps), mode)).fetchone()
+                    if row is None:
+                        cur = conn.execute(
+                            "INSERT INTO jobs (kind, symbol, time_steps, mode, params, runner_pid, created_at) "
+                            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                            (kind, symbol, int(time_steps), mode, json.dumps(params, ensure_ascii=False),
+                             os.getpid(), time.time()))
+                        job_id = cur.lastrowid
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+            finally:
+                conn.close()
+            if row is not None:
+                return row["id"]
+
+        try:
+            try:
+                executor = self._pool if kind in WRITER_KINDS else self._threads
+                future = executor.submit(execute_job, job_id, self.db_path, self.model_dir)
+            except BrokenProcessPool:
+                # 워커가 비정상 종료(메모리 부족 등)하면 풀을 새로 만들어 이후 작업을 계속 받음
+                with self._lock:
+                    self._pool = worker_pool(*self._pool_args)
+                future = self._pool.submit(execute_job, job_id, self.db_path, self.model_dir)
+        except Exception as e:
+            # 풀에 넘기지 못한 작업이 queued 로 남으면 부분 UNIQUE 인덱스가 같은 키의 이후 제출을 모두 막음
+            _update(self.db_path, job_id, status="error", error=f"작업 제출 실패: {e or type(e).__name__}",
+                    finished_at=time.time())
+            raise
+        future.add_done_callback(lambda f, job_id=job_id: self._on_done(job_id, f))
+        return job_id
+
+    def _on_done(self, job_id, future):
+        # 워커 프로세스가 죽은 경우(BrokenProcessPool 등) 작업이 running 으로 남지 않도록 기록
+        error = None if future.cancelled() else future.exception()
+        if error is not None:
+            _update(self.db_path, job_id, status="error", error=str(error) or type(error).__name__,
+                    finished_at=time.time())
+
+    def get(self, job_id: int):
+        return get_job(job_id, self.db_path)
+
+    def active(self, symbol: str = None) -> list:
+        """대기/실행 중 작업 목록."""
+        conn = connect(self.db_path)
+        try:
+            query = "SELECT id, kind, symbol, time_steps, mode, status, progress, message FROM jobs " \
+                    "WHERE status IN ('queued', 'running')"
+            args = ()
+            if symbol is not None:
+                query += " AND symbol = ?"
+                args = (symbol,)
+            return [dict(row) for row in conn.execute(query + " ORDER BY id", args)]
+        finally:
+            conn.close()
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._threads.shutdown(wait=False, cancel_futures=True)
+
+
+_runner = None
+_runner_lock = threading.Lock()
+
+
+def get_runner() -> JobRunner:
+    """프로세스 전역 실행기 (모든 Streamlit 세션이 공유)."""
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = JobRunner()
+            atexit.register(_runner.shutdown)
+        return _runner
@@ -0,0 +1,213 @@
+# metadata.py
+"""
+Yahoo Finance 종목 메타데이터(영문명, 목표주가, 투자의견, 애널리스트 수) 캐시.
+
+yf.Ticker(symbol).info 는 quoteSummary 전체를 받는 무거운 요청이므로 종목당 TTL(기본 하루)
+안에 한 번만 호출하고, 결과를 data/metadata/{symbol}.json 에 저장해 여러 세션과
+프로세스(앱, 배치)가 공유합니다. 실패한 종목은 FAILURE_TTL 동안 다시 요청하지 않으므로
+한 화면에서 여러 곳이 같은 종목을 물어도 Yahoo 호출은 최대 한 번입니다.
+
+인기 종목은 미리 받아 둘 수 있습니다.
+    python metadata.py                       # ECOS_TOP_TICKERS 목록
+    python metadata.py 005930.KS 035720.KQ --workers 4 --rate 2
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, fields
+from typing import Optional
+
+from sise_fetcher import RateLimiter
+
+CACHE_DIR = os.path.join("data", "metadata")
+METADATA_TTL = float(os.getenv("ECOS_METADATA_TTL", "86400"))
+FAILURE_TTL = 300       # 실패 후 같은 종목을 다시 요청하지 않는 시간(초)
+PREWARM_WORKERS = 4
+PREWARM_RATE = 2.0      # 초당 최대 요청 수
+
+_INFO_KEYS = {
+    "long_name": "longName",
+    "short_name": "shortName",
+    "target_mean": "targetMeanPrice",
+    "target_high": "targetHighPrice",
+    "target_low": "targetLowPrice",
+    "recommendation": "recommendationKey",
+    "analyst_count": "numberOfAnalystOpinions",
+}
+
+
+@dataclass
+class SymbolMetadata:
+    """한 종목의 Yahoo 메타데이터. 없는 항목은 None."""
+    symbol: str
+    long_name: Optional[str] = None
+    short_name: Optional[str] = None
+    target_mean: Optional[float] = None
+    target_high: Optional[float] = None
+    target_low: Optional[float] = None
+    recommendation: Optional[str] = None
+    analyst_count: Optional[int] = None
+    fetched_at: float = 0.0
+
+    @property
+    def name(self) -> str:
+        return self.long_name or self.short_name or ""
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        known = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in data.items() if k in known})
+
+
+def name_keyword(name: str) -> str:
+    """'SK hynix Inc.' → 'sk hynix inc' (특수 문자 제거, 소문자, 앞 3단어) 뉴스 필터용 키워드."""
+    cleaned = re.sub(r"[^\w\s]", "", name or "")
+    return " ".join(cleaned.split()[:3]).lower()
+
+
+def from_info(symbol: str, info: dict) -> SymbolMetadata:
+    values = {field: info.get(key) for field, key in _INFO_KEYS.items()}
+    if values["recommendation"] in ("", "none"):
+        values["recommendation"] = None
+    return SymbolMetadata(symbol=symbol, fetched_at=time.time(), **values)
+
+
+def fetch_metadata(symbol: str) -> SymbolMetadata:
+    """Yahoo quoteSummary 요청 1회."""
+    import yfinance as yf
+
+    info = yf.Ticker(symbol).info
+    if not info:
+        raise ValueError(f"{symbol}: Yahoo 메타데이터 없음")
+    return from_info(symbol, info)
+
+
+def _cache_path(symbol: str, cache_dir: str) -> str:
+    return os.path.join(cache_dir, f"{symbol.upper()}.json")
+
+
+def read_cached(symbol: str, cache_dir: str = CACHE_DIR):
+    """디스크 캐시의 레코드 (없거나 깨졌으면 None)."""
+    try:
+        with open(_cache_path(symbol, cache_dir), encoding="utf-8") as f:
+            return SymbolMetadata.from_dict(json.load(f))
+    except (OSError, ValueError, TypeError):
+        return None
+
+
+def _write_cache(record: SymbolMetadata, cache_dir: str):
+    os.makedirs(cache_dir, exist_ok=True)
+    path = _cache_path(record.symbol, cache_dir)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(record.to_dict(), f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+_locks_lock = threading.Lock()
+_symbol_locks = {}
+_failures = {}   # symbol -> (실패 시각, 예외)
+
+
+def get_metadata(symbol: str, ttl: float = METADATA_TTL, cache_dir: str = CACHE_DIR,
+                 fetcher=fetch_metadata) -> SymbolMetadata:
+    """
+    캐시가 ttl 초 이내면 그대로, 아니면 Yahoo 에서 한 번 받아 저장한 레코드를 반환합니다.
+    실패하면 만료된 캐시라도 반환하고, 캐시도 없으면 예외를 올립니다(FAILURE_TTL 동안은 요청 없이).
+    """
+    cached = read_cached(symbol, cache_dir)
+    if cached is not None and time.time() - cached.fetched_at < ttl:
+        return cached
+
+    with _locks_lock:
+        lock = _symbol_locks.setdefault(symbol, threading.Lock())
+    with lock:
+        latest = read_cached(symbol, cache_dir)
+        if latest is not None and time.time() - latest.fetched_at < ttl:
+            return latest
+        failed = _failures.get(symbol)
+        if failed is not None and time.time() - failed[0] < FAILURE_TTL:
+            if latest is not None:
+                return latest
+            raise failed[1]
+        try:
+            record = fetcher(symbol)
+        except Exception as e:
+            _failures[symbol] = (time.time(), e)
+            if latest is not None:
+                return latest
+            raise
+        _failures.pop(symbol, None)
+        _write_cache(record, cache_dir)
+        return record
+
+
+def prewarm(symbols, workers: int = PREWARM_WORKERS, rate: float = PREWARM_RATE,
+            ttl: float = METADATA_TTL, cache_dir: str = CACHE_DIR, fetcher=fetch_metadata) -> dict:
+    """
+    여러 종목을 제한된 동시성/속도로 미리 받아 둡니다 (신선한 캐시는 요청 없음).
+    {symbol: SymbolMetadata 또는 예외 메시지 문자열} 을 반환합니다.
+    """
+    limiter = RateLimiter(rate)
+
+    def one(symbol):
+        cached = read_cached(symbol, cache_dir)
+        if cached is not None and time.time() - cached.fetched_at < ttl:
+            return cached
+        limiter.wait()
+        try:
+            return get_metadata(symbol, ttl, cache_dir, fetcher)
+        except Exception as e:
+            return str(e) or type(e).__name__
+
+    symbols = list(dict.fromkeys(symbols))
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        return dict(zip(symbols, pool.map(one, symbols)))
+
+
+_prewarm_started = threading.Event()
+
+
+def start_prewarm(symbols, **kwargs):
+    """프로세스당 한 번, 백그라운드 스레드에서 prewarm 을 실행합니다 (앱 시작 시 인기 종목용)."""
+    if _prewarm_started.is_set():
+        return
+    _prewarm_started.set()
+    threading.Thread(target=prewarm, args=(list(symbols),), kwargs=kwargs,
+                     name="metadata-prewarm", daemon=True).start()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from quotes import configured_tickers
+
+    parser = argparse.ArgumentParser(description="Yahoo 종목 메타데이터 미리 받기")
+    parser.add_argument("symbols", nargs="*", help="Yahoo 심볼 (없으면 ECOS_TOP_TICKERS 목록)")
+    parser.add_argument("--file", help="한 줄에 한 심볼씩 적힌 파일")
+    parser.add_argument("--workers", type=int, default=PREWARM_WORKERS)
+    parser.add_argument("--rate", type=float, default=PREWARM_RATE, help="초당 요청 제한")
+    parser.add_argument("--ttl", type=float, default=METADATA_TTL, help="0 이면 모두 다시 받음")
+    args = parser.parse_args()
+
+    symbols = [s.upper() for s in args.symbols]
+    if args.file:
+        with open(args.file, encoding="utf-8") as f:
+            symbols += [line.strip().upper() for line in f if line.strip() and not line.startswith("#")]
+    symbols = symbols or list(configured_tickers())
+
+    start = time.perf_counter()
+    results = prewarm(symbols, args.workers, args.rate, args.ttl)
+    print(f"{len(results)} 종목 ({time.perf_counter() - start:.1f}초) → {CACHE_DIR}")
+    for symbol, record in results.items():
+        if isinstance(record, SymbolMetadata):
+            print(f"  {symbol:<10} {record.name} | 목표가 {record.target_mean} | {record.recommendation}")
+        else:
+            print(f"  {symbol:<10} 실패: {record}")
@@ -0,0 +1,232 @@
+# model_registry.py
+"""
+프로세스 전역 모델/스케일러 레지스트리.
+
+(symbol, time_steps) 키로 models/ 의 산출물을 한 번만 역직렬화해 메모리에 두고,
+파일의 mtime/크기가 바뀌면(재학습) 다시 읽습니다. 메모리 예산을 넘으면
+가장 오래 쓰이지 않은 항목부터 내보냅니다(LRU).
+"""
+
+import gc
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from scaling import LEGACY_EXT, SCALER_EXT, load_scaler
+
+MODEL_DIR = "models"
+MEMORY_BUDGET_MB = float(os.getenv("ECOS_MODEL_CACHE_MB", "512"))
+
+# 모델 종류: 한 스텝 예측을 반복하는 기본 모델 / 30일을 한 번에 출력하는 다중 출력 모델
+MODE_STEP = "step"
+MODE_DIRECT = "direct"
+DIRECT_HORIZON = 30
+MODE_SUFFIXES = {MODE_STEP: "", MODE_DIRECT: f"_direct{DIRECT_HORIZON}"}
+
+
+def artifact_paths(symbol: str, time_steps: int, model_dir: str = MODEL_DIR, mode: str = MODE_STEP):
+    """
+    (모델 경로, 스케일러 경로)를 반환합니다. mode="direct" 는 ..._direct30 이름을 씁니다.
+    스케일러는 .npy 이며, 그것이 없고 이전 버전의 .pkl 만 있으면 .pkl 경로를 반환합니다.
+    """
+    safe = symbol.replace(".", "_")
+    suffix = MODE_SUFFIXES[mode]
+    scaler_path = os.path.join(model_dir, f"scaler_{safe}_{time_steps}{suffix}{SCALER_EXT}")
+    legacy_path = scaler_path[:-len(SCALER_EXT)] + LEGACY_EXT
+    if not os.path.exists(scaler_path) and os.path.exists(legacy_path):
+        scaler_path = legacy_path
+    return os.path.join(model_dir, f"model_{safe}_{time_steps}{suffix}.keras"), scaler_path
+
+
+TFLITE_SUFFIXES = {None: "", "float16": "_f16", "int8": "_int8"}
+
+
+def tflite_path(symbol: str, time_steps: int, quantize: str = None, model_dir: str = MODEL_DIR) -> str:
+    """model_{safe}_{ts}.keras 옆에 두는 TFLite 변환본 경로 (quantize: None / 'float16' / 'int8')."""
+    safe = symbol.replace(".", "_")
+    return os.path.join(model_dir, f"model_{safe}_{time_steps}{TFLITE_SUFFIXES[quantize]}.tflite")
+
+
+def meta_path(symbol: str, time_steps: int, model_dir: str = MODEL_DIR, mode: str = MODE_STEP) -> str:
+    """학습 이력(마지막 학습 데이터 날짜 등) JSON 경로."""
+    return os.path.join(model_dir, f"meta_{symbol.replace('.', '_')}_{time_steps}{MODE_SUFFIXES[mode]}.json")
+
+
+def best_config_path(symbol: str, model_dir: str = MODEL_DIR) -> str:
+    """하이퍼파라미터 스윕(sweep.py)이 고른 종목별 기본 설정 JSON 경로."""
+    return os.path.join(model_dir, f"best_{symbol.replace('.', '_')}.json")
+
+
+def read_best_config(symbol: str, model_dir: str = MODEL_DIR):
+    """{'time_steps', 'units', 'batch_size', 'val_rmse', ...} 또는 None (스윕 기록이 없을 때)."""
+    try:
+        with open(best_config_path(symbol, model_dir), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def best_train_params(symbol: str, time_steps: int, model_dir: str = MODEL_DIR, mode: str = MODE_STEP) -> dict:
+    """
+    스윕이 고른 units/batch_size ({} 이면 기본값). 스윕은 step 모델만 평가하므로
+    같은 time_steps 의 step 학습에만 적용합니다.
+    """
+    best = read_best_config(symbol, model_dir)
+    if mode != MODE_STEP or best is None or best.get("time_steps") != int(time_steps):
+        return {}
+    return {k: int(best[k]) for k in ("units", "batch_size") if best.get(k)}
+
+
+def delete_artifacts(symbol: str, time_steps: int = None, model_dir: str = MODEL_DIR,
+                     include_best: bool = False) -> list:
+    """
+    한 종목의 산출물만 삭제합니다 (time_steps 가 없으면 모든 time_steps). 삭제한 경로 목록을 반환.
+    스윕 결과(best_{safe}.json)는 재학습에 다시 쓰이므로 include_best=True 일 때만 지웁니다.
+    """
+    safe = symbol.replace(".", "_")
+    removed = []
+    if os.path.isdir(model_dir):
+        for name in os.listdir(model_dir):
+            kind, _, rest = name.partition("_")
+            if kind not in ("model", "scaler", "meta") or not rest.startswith(f"{safe}_"):
+                continue
+            ts_part = rest[len(safe) + 1:].split(".")[0].split("_")[0]
+            if time_steps is None or ts_part == str(time_steps):
+                os.remove(os.path.join(model_dir, name))
+                removed.append(name)
+        best = read_best_config(symbol, model_dir) if include_best else None
+        if best is not None and (time_steps is None or best.get("time_steps") == time_steps):
+            os.remove(best_config_path(symbol, model_dir))
+            removed.append(os.path.basename(best_config_path(symbol, model_dir)))
+    registry.invalidate(symbol, time_steps)
+    return removed
+
+
+def artifacts_exist(symbol: str, time_steps: int, model_dir: str = MODEL_DIR, mode: str = MODE_STEP) -> bool:
+    return all(os.path.exists(p) for p in artifact_paths(symbol, time_steps, model_dir, mode))
+
+
+def _signature(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _model_nbytes(model) -> int:
+    return int(sum(w.nbytes for w in model.get_weights()))
+
+
+def _entry_nbytes(entry) -> int:
+    # 스케일러는 무시할 만큼 작으므로 모델(Keras 가중치 / TFLite 버퍼)만 계산
+    total = 0
+    for kind, (obj, _) in entry.items():
+        if kind == "model":
+            total += _model_nbytes(obj)
+        elif kind.startswith("tflite"):
+            total += obj.nbytes
+    return total
+
+
+class ModelRegistry:
+    """스레드 안전한 LRU 모델/스케일러 캐시."""
+
+    def __init__(self, budget_mb: float = MEMORY_BUDGET_MB, model_dir: str = MODEL_DIR):
+        self.budget_bytes = int(budget_mb * 2**20)
+        self.model_dir = model_dir
+        self._entries = OrderedDict()   # (symbol, time_steps, mode) -> {kind: (obj, signature)}
+        self._sizes = {}
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def _load(self, kind, path):
+        if kind == "scaler":
+            return load_scaler(path)
+        if kind.startswith("tflite"):
+            from tflite_backend import TFLiteModel
+            return TFLiteModel(path)
+        from tensorflow.keras.models import load_model
+        return load_model(path)
+
+    def _path(self, symbol, time_steps, kind, mode):
+        if kind.startswith("tflite"):
+            return tflite_path(symbol, time_steps, kind.partition(":")[2] or None, self.model_dir)
+        model_path, scaler_path = artifact_paths(symbol, time_steps, self.model_dir, mode)
+        return model_path if kind == "model" else scaler_path
+
+    def _get(self, symbol, time_steps, kind, mode=MODE_STEP):
+        key = (symbol, int(time_steps), mode)
+        path = self._path(symbol, time_steps, kind, mode)
+        signature = _signature(path)   # 파일이 없으면 FileNotFoundError
+
+        with self._lock:
+            entry = self._entries.get(key, {})
+            cached = entry.get(kind)
+            if cached is not None and cached[1] == signature:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return cached[0]
+
+            self.misses += 1
+            obj = self._load(kind, path)
+            entry[kind] = (obj, signature)
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._sizes[key] = _entry_nbytes(entry)
+            self._evict()
+            return obj
+
+    def _evict(self):
+        evicted = False
+        while len(self._entries) > 1 and sum(self._sizes.values()) > self.budget_bytes:
+            key, _ = self._entries.popitem(last=False)
+            self._sizes.pop(key, None)
+            evicted = True
+        if evicted:
+            gc.collect()
+
+    def get_model(self, symbol, time_steps, mode=MODE_STEP):
+        return self._get(symbol, time_steps, "model", mode)
+
+    def get_scaler(self, symbol, time_steps, mode=MODE_STEP):
+        return self._get(symbol, time_steps, "scaler", mode)
+
+    def get_tflite(self, symbol, time_steps, quantize=None):
+        """TFLite 변환본 인터프리터 (tflite_backend.TFLiteModel). 변환본이 없으면 FileNotFoundError."""
+        return self._get(symbol, time_steps, f"tflite:{quantize}" if quantize else "tflite")
+
+    def get(self, symbol, time_steps, mode=MODE_STEP):
+        """(model, scaler)를 반환합니다. 산출물이 없으면 FileNotFoundError."""
+        return self.get_model(symbol, time_steps, mode), self.get_scaler(symbol, time_steps, mode)
+
+    def put(self, symbol, time_steps, model=None, scaler=None, mode=MODE_STEP):
+        """방금 저장한 산출물을 다시 읽지 않도록 메모리의 객체를 그대로 등록합니다."""
+        key = (symbol, int(time_steps), mode)
+        model_path, scaler_path = artifact_paths(symbol, time_steps, self.model_dir, mode)
+        with self._lock:
+            entry = {}
+            if model is not None:
+                entry["model"] = (model, _signature(model_path))
+            if scaler is not None:
+                entry["scaler"] = (scaler, _signature(scaler_path))
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._sizes[key] = _model_nbytes(model) if model is not None else 0
+            self._evict()
+
+    def invalidate(self, symbol=None, time_steps=None):
+        """조건에 맞는 항목을 내보냅니다. 인자가 없으면 전체를 비웁니다."""
+        with self._lock:
+            for key in list(self._entries):
+                if (symbol is None or key[0] == symbol) and (time_steps is None or key[1] == int(time_steps)):
+                    self._entries.pop(key)
+                    self._sizes.pop(key, None)
+        gc.collect()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": sum(self._sizes.values()),
+                    "budget_bytes": self.budget_bytes, "hits": self.hits, "misses": self.misses}
+
+
+registry = ModelRegistry()
@@ -1,82 +1,148 @@
 # news_scraper.py
 
-import streamlit as st
-import time
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-from bs4 import BeautifulSoup
-import re
-import numpy as np 
+import os
+import threading
+from collections import Counter
 # 🚨 [추가] URL 인코딩을 위해 urllib.parse 임포트
-from urllib.parse import quote 
+from urllib.parse import quote
 
-# ⚠️ 크롤링 주의 사항: Selenium은 requests보다 느리지만, 403 에러 회피에 필수적입니다.
-#    비상업적 학습 목적으로만 사용하고, 충분한 time.sleep을 유지해야 합니다.
+import lxml.html
+import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
 
-@st.cache_data(ttl=600, show_spinner=False)
-def scrape_investing_news_titles_selenium(query: str, max_articles: int = 10) -> list:
-    """
-    한국 Investing.com의 종목 검색 뉴스 결과 페이지에서 크롤링합니다.
-    (예: https://kr.investing.com/search/?q=%EC%82%BC%EC%84%B1%EC%A0%84%EC%9E%90&tab=news)
-    """
-    
-    # 🚨 [수정] 검색 결과 페이지 URL 사용
-    encoded_query = quote(query) # 한국어 쿼리 인코딩
-    base_url = f"https://kr.investing.com/search/?q={encoded_query}&tab=news" 
-    target_url = base_url
+# ⚠️ 크롤링 주의 사항: 비상업적 학습 목적으로만 사용하세요.
+#    먼저 일반 HTTP 요청(1단계)으로 검색 결과를 파싱하고, 차단(403 등)되거나
+#    결과가 비어 있을 때만 headless 브라우저(2단계, browser_pool)를 띄웁니다.
+
+INVESTING_BASE_URL = os.getenv("ECOS_INVESTING_URL", "https://kr.investing.com")
+NEWS_SELECTOR = "div.search-result-items"
+NEWS_WAIT = 10      # 브라우저에서 검색 결과가 나타날 때까지 기다리는 최대 시간(초)
+HTTP_TIMEOUT = 5
+
+TIER_HTTP = "http"
+TIER_BROWSER = "browser"
+
+HTTP_HEADERS = {
+    "User-Agent": ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                   "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7",
+    "Referer": f"{INVESTING_BASE_URL}/",
+}
 
+# div.search-result-items article a 와 같은 XPath (cssselect 의존성 없이 lxml 만 사용)
+_NEWS_XPATH = ("//div[contains(concat(' ', normalize-space(@class), ' '), ' search-result-items ')]"
+               "//article//a")
+
+_session = None
+_session_lock = threading.Lock()
+tier_counts = Counter()   # 단계별 처리 건수 (프로세스 전역)
+NEWS_CACHE_ENTRIES = int(os.getenv("ECOS_NEWS_CACHE_ENTRIES", "64"))   # 캐시할 검색어 수 (오래된 것부터 축출)
+
+
+class BlockedError(Exception):
+    """HTTP 단계가 차단(403/429/503 등)되어 브라우저 단계로 넘어가야 함."""
+
+
+def _http_session() -> requests.Session:
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4)
+            _session.mount("http://", adapter)
+            _session.mount("https://", adapter)
+            _session.headers.update(HTTP_HEADERS)
+        return _session
+
+
+def news_search_url(query: str, base_url: str = INVESTING_BASE_URL) -> str:
+    # 🚨 [수정] 검색 결과 페이지 URL 사용 (한국어 쿼리 인코딩)
+    return f"{base_url}/search/?q={quote(query)}&tab=news"
+
+
+def parse_news(html: str, max_articles: int = 10, base_url: str = INVESTING_BASE_URL) -> list:
+    """검색 결과 페이지 HTML에서 [{title, link}, ...] 를 추출합니다."""
+    if not html or not html.strip():
+        return []
     news_list = []
-    
-    # 🚨 [삭제] 검색 결과 페이지에서는 별도의 키워드 필터링은 하지 않습니다.
-    #    (검색 결과 자체가 이미 필터링된 것이므로)
-    
-    # --- Selenium 설정 ---
-    options = Options()
-    options.add_argument("--headless")              
-    options.add_argument("--no-sandbox")            
-    options.add_argument("--disable-dev-shm-usage") 
-    options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
-    
-    driver = None
+    for container in lxml.html.fromstring(html).xpath(_NEWS_XPATH):
+        title = " ".join(container.text_content().split())
+        link = container.get('href')
+        if link and title:
+            full_link = f"{base_url}{link}" if link.startswith('/') else link
+            news_list.append({"title": title, "link": full_link})
+        if len(news_list) >= max_articles:
+            break
+    return news_list
+
+
+def fetch_news_http(query: str, base_url: str = INVESTING_BASE_URL, timeout: float = HTTP_TIMEOUT) -> str:
+    """1단계: 브라우저 없이 검색 페이지 HTML을 받습니다. 차단 응답이면 BlockedError."""
+    response = _http_session().get(news_search_url(query, base_url), timeout=timeout)
+    if response.status_code in (401, 403, 429, 503):
+        raise BlockedError(f"HTTP {response.status_code}")
+    response.raise_for_status()
+    return response.text
+
+
+def fetch_news_html(query: str, base_url: str = INVESTING_BASE_URL, wait: float = NEWS_WAIT) -> str:
+    """2단계: 풀의 브라우저로 검색 페이지를 열고 결과 컨테이너가 생기는 즉시 HTML을 반환합니다."""
+    # Selenium 은 브라우저 단계가 실제로 필요할 때만 가져옴
+    from selenium.common.exceptions import TimeoutException
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    from browser_pool import get_pool
+
+    with get_pool().driver() as driver:
+        driver.get(news_search_url(query, base_url))
+        try:
+            # 🚨 [수정] 고정 5초 대기 대신 결과 목록이 나타나는 순간까지만 대기
+            WebDriverWait(driver, wait).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, f"{NEWS_SELECTOR} article")))
+        except TimeoutException:
+            pass   # 검색 결과가 없는 경우: 현재 페이지를 그대로 파싱 (빈 목록)
+        return driver.page_source
+
+
+def fetch_news(query: str, max_articles: int = 10, base_url: str = INVESTING_BASE_URL):
+    """
+    단계별로 뉴스를 가져와 (뉴스 목록, 제공 단계)를 반환합니다.
+    HTTP 단계가 차단되거나 실패하거나 article a 노드가 없을 때만 브라우저 단계를 사용합니다.
+    """
     try:
-        service = Service(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=options)
-        
-        with st.spinner(f"[{query.upper()}] 뉴스 검색 페이지를 브라우저로 로딩 중 (5초 대기)..."):
-            driver.get(target_url) 
-            # 페이지 로딩 및 동적 콘텐츠 생성을 위해 충분히 기다립니다.
-            time.sleep(5) 
-            soup = BeautifulSoup(driver.page_source, "html.parser")
-        
-        # --- 데이터 추출 로직 ---
-        # 🚨 [수정] 검색 결과 페이지의 뉴스 제목/링크 CSS Selector
-        # Investing.com 검색 결과 뉴스 탭의 링크 컨테이너
-        news_containers = soup.select('div.search-result-items article a')
-        
-        for container in news_containers:
-            # 제목은 a 태그의 텍스트
-            title = container.get_text(strip=True)
-            link = container.get('href')
-            
-            # 검색 결과 페이지이므로 별도 키워드 필터링 로직은 삭제 (성능 개선)
-            
-            if link and title:
-                # kr.investing.com 도메인을 사용하여 링크 구성
-                full_link = f"https://kr.investing.com{link}" if link.startswith('/') else link
-                news_list.append({"title": title, "link": full_link})
-            
-            if len(news_list) >= max_articles:
-                break
-                
-        driver.quit()
-        return news_list
+        news = parse_news(fetch_news_http(query, base_url), max_articles, base_url)
+        if news:
+            return news, TIER_HTTP
+    except (BlockedError, requests.RequestException) as e:
+        print(f"뉴스 HTTP 단계 실패 → 브라우저 사용: {e}")
+    return parse_news(fetch_news_html(query, base_url), max_articles, base_url), TIER_BROWSER
+
 
+@st.cache_data(ttl=600, max_entries=NEWS_CACHE_ENTRIES, show_spinner=False)
+def scrape_news_with_tier(query: str, max_articles: int = 10) -> tuple:
+    """
+    (뉴스 목록, 제공 단계) 를 함께 캐시합니다. 캐시에서 돌려줄 때도 그 결과를 실제로 가져온
+    단계('http' / 'browser')가 같이 나오며, 실패하면 ([], None) 입니다.
+    """
+    try:
+        with st.spinner(f"[{query.upper()}] 뉴스 검색 결과 로딩 중..."):
+            news, tier = fetch_news(query, max_articles)
+        tier_counts[tier] += 1
+        return news, tier
     except Exception as e:
-        if driver:
-             try: driver.quit()
-             except: pass
-        st.error(f"뉴스 크롤링 (Selenium) 실패: {e}")
+        st.error(f"뉴스 크롤링 실패: {e}")
         st.error("Selenium 설정 및 드라이버 오류 또는 웹사이트 구조 변경 문제일 수 있습니다.")
-        return []
\ No newline at end of file
+        return [], None
+
+
+def scrape_investing_news_titles_selenium(query: str, max_articles: int = 10) -> list:
+    """
+    한국 Investing.com의 종목 검색 뉴스 결과 페이지에서 크롤링합니다.
+    (예: https://kr.investing.com/search/?q=%EC%82%BC%EC%84%B1%EC%A0%84%EC%9E%90&tab=news)
+    일반 HTTP 요청을 먼저 시도하고, 필요할 때만 풀의 브라우저를 사용합니다.
+    """
+    return scrape_news_with_tier(query, max_articles)[0]
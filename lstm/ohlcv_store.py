@@ -0,0 +1,132 @@
+# ohlcv_store.py
+"""
+종목별 OHLCV 영구 저장소 (Parquet).
+
+6자리 종목 코드별로 data/ohlcv/{code}.parquet 와 메타데이터 {code}.json 을 보관합니다.
+갱신 시에는 최신 페이지부터 읽어 이미 가진 날짜에 도달하면 멈추므로,
+장중/일일 재로딩은 보통 HTTP 요청 1회로 끝납니다.
+
+수집 도중 페이지 요청이 실패하면 받은 만큼만 저장하되 메타데이터에 complete=False 를
+남기고, 다음 갱신에서 전체 이력을 다시 받아 빠진 거래일을 채웁니다.
+"""
+
+import json
+import os
+from datetime import datetime
+
+import pandas as pd
+
+from sise_fetcher import (MAX_PAGES, MIN_ROWS_PER_PAGE, NAVER_FINANCE_URL,
+                          fetch_history, fetch_page, make_session, pages_to_ohlcv)
+
+DATA_DIR = "data"
+STORE_DIR = os.path.join(DATA_DIR, "ohlcv")
+
+
+def _paths(code: str):
+    return (os.path.join(STORE_DIR, f"{code}.parquet"),
+            os.path.join(STORE_DIR, f"{code}.json"))
+
+
+def read(code: str) -> pd.DataFrame:
+    """저장된 OHLCV를 반환합니다. 없으면 빈 DataFrame."""
+    data_path, _ = _paths(code)
+    if not os.path.exists(data_path):
+        return pd.DataFrame()
+    try:
+        return pd.read_parquet(data_path)
+    except Exception:
+        return pd.DataFrame()
+
+
+def read_metadata(code: str):
+    """마지막 갱신 정보(last_updated, first_date, last_date, rows, fetched_pages, complete)를 반환합니다."""
+    _, meta_path = _paths(code)
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write(code: str, df: pd.DataFrame, fetched_pages: int, complete: bool = True):
+    os.makedirs(STORE_DIR, exist_ok=True)
+    data_path, meta_path = _paths(code)
+
+    # 다른 프로세스가 읽는 도중 깨진 파일을 보지 않도록 임시 파일에 쓴 뒤 교체
+    tmp_path = f"{data_path}.{os.getpid()}.tmp"
+    df.to_parquet(tmp_path)
+    os.replace(tmp_path, data_path)
+
+    meta = {
+        "code": code,
+        "last_updated": datetime.now().isoformat(timespec="seconds"),
+        "first_date": df.index.min().strftime("%Y-%m-%d"),
+        "last_date": df.index.max().strftime("%Y-%m-%d"),
+        "rows": int(len(df)),
+        "fetched_pages": fetched_pages,
+        "complete": complete,   # False: 중간 페이지 실패로 빠진 거래일이 있을 수 있음 (다음 갱신에서 전체 재수집)
+    }
+    tmp_meta = f"{meta_path}.{os.getpid()}.tmp"
+    with open(tmp_meta, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+    os.replace(tmp_meta, meta_path)
+
+
+def _fetch_new_pages(code: str, last_date, base_url: str):
+    """
+    최신 페이지부터 순차로 읽다가 last_date 이하의 날짜가 나오면 멈춥니다.
+    (페이지 목록, last_date 까지 빈틈없이 이어졌는지)를 반환합니다.
+    """
+    session = make_session(1)
+    pages = []
+    for page in range(1, MAX_PAGES + 1):
+        try:
+            _, df_page = fetch_page(session, code, page, base_url)
+        except Exception:
+            return pages, False
+        if len(df_page) < MIN_ROWS_PER_PAGE:
+            return pages, True   # 상장 이후 전체를 다 읽음
+        pages.append(df_page)
+        oldest = pd.to_datetime(df_page['날짜'], format='%Y.%m.%d', errors='coerce').min()
+        if pd.notna(oldest) and oldest <= last_date:
+            return pages, True
+    return pages, False
+
+
+def _merge(stored: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+    # 같은 날짜는 새로 받은 값(장중 갱신분 포함)으로 덮어씀
+    if stored.empty:
+        return new
+    df = pd.concat([stored, new])
+    return df[~df.index.duplicated(keep="last")].sort_index()
+
+
+def update(code: str, base_url: str = NAVER_FINANCE_URL) -> pd.DataFrame:
+    """
+    저장소를 최신 상태로 갱신하고 전체 OHLCV를 반환합니다.
+    저장된 데이터가 없거나 이전 수집이 불완전했으면 전체 이력을 병렬 수집하고,
+    그 밖에는 새 거래일만 덧붙입니다. 새 페이지가 저장된 마지막 날짜까지 이어지지 않으면
+    (중간 페이지 실패) 빈틈을 남기지 않도록 전체 이력 수집으로 넘어갑니다.
+    네트워크 오류 시에는 저장된 데이터를 그대로 반환합니다.
+    """
+    stored = read(code)
+    meta = read_metadata(code) or {}
+
+    if not stored.empty and meta.get("complete", True):
+        pages, complete = _fetch_new_pages(code, stored.index.max(), base_url)
+        if complete:
+            if not pages:
+                return stored
+            df = _merge(stored, pages_to_ohlcv(pages))
+            _write(code, df, fetched_pages=len(pages))
+            return df
+
+    pages, complete = fetch_history(code, base_url=base_url)
+    new = pages_to_ohlcv(pages)
+    if new.empty:
+        return stored
+
+    df = _merge(stored, new)
+    _write(code, df, fetched_pages=len(pages), complete=complete)
+    return df
@@ -1,8 +1,6 @@
 # predict.py
 import numpy as np
 import pandas as pd
-from tensorflow.keras.models import load_model 
-import joblib 
 import os
 import requests 
 import json
@@ -11,55 +9,67 @@ from datetime import datetime, timedelta
 import streamlit as st 
 import requests.exceptions 
 import numpy as np # np.sign 사용
+import copy
+import threading
+import weakref
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from indicators import FEATURES, IndicatorState, add_technical_indicators
+from model_registry import DIRECT_HORIZON, MODE_DIRECT, MODE_STEP, artifact_paths, registry
+from scaling import inverse_column
+import ohlcv_store
 
 # ── 설정 ──
 MODEL_DIR = "models" 
 API_MODEL_NAME = "gemini-1.5-flash" 
+FEATURE_TAIL = 256  # 종목별로 보관하는 최근 피처 행 수 (최대 time_steps 이상)
+INFERENCE_BACKEND = os.getenv("ECOS_INFERENCE_BACKEND", "keras")   # "keras" 또는 "tflite"
+TFLITE_QUANTIZE = os.getenv("ECOS_TFLITE_QUANTIZE") or None         # None / "float16" / "int8"
+FORECAST_MODE = os.getenv("ECOS_FORECAST_MODE", MODE_STEP)          # "step" 또는 "direct"
+INDICATOR_CACHE_ENTRIES = int(os.getenv("ECOS_INDICATOR_CACHE_ENTRIES", "256"))   # 지표 상태를 보관할 종목 수
 
-def add_technical_indicators(df):
+# 종목별 증분 지표 상태: 새 일봉만 반영해 전체 지표 재계산을 피함
+# (장수 프로세스에서 종목 수만큼 늘지 않도록 가장 오래 쓰이지 않은 종목부터 내보내는 LRU)
+_INDICATOR_CACHE = OrderedDict()
+_INDICATOR_LOCK = threading.Lock()
+_OHLCV = ['High', 'Low', 'Close', 'Volume']
+
+# 모델 객체별 컴파일된 예측 그래프 (모델이 해제되면 함께 사라짐)
+_ROLLOUTS = weakref.WeakKeyDictionary()
+
+
+def _recent_features(df, symbol):
     """
-    LSTM 학습에 사용된 13가지 기술적 지표를 계산합니다.
+    최근 피처 행 배열(최대 FEATURE_TAIL개)과 마지막 시점의 IndicatorState를 반환합니다.
+    이전 호출 이후 새로 추가된 일봉만 증분 반영하고, 과거 데이터가 바뀌었으면 전체를 다시 계산합니다.
     """
-    df = df.copy()
-    
-    # [기존 7개 피처 파생]
-    df['SMA_5'] = df['Close'].rolling(5).mean()
-    df['SMA_20'] = df['Close'].rolling(20).mean()
-    
-    delta = df['Close'].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(14).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
-    rs_calc = 100 - (100 / (1 + gain / loss.replace(0, np.nan))) # loss=0일 때 NaN
-    df['RSI'] = np.where(loss == 0, np.where(gain > 0, 100, 0), rs_calc)
-    
-    ema12 = df['Close'].ewm(span=12, adjust=False).mean()
-    ema26 = df['Close'].ewm(span=26, adjust=False).mean()
-    df['MACD'] = ema12 - ema26
-    
-    df['Volume_SMA'] = df['Volume'].rolling(20).mean()
-    
-    # 🚨 신규 6개 피처 추가 시작 🚨
-    
-    # 1. 볼린저 밴드 (BB)
-    df['BB_Std'] = df['Close'].rolling(window=20).std()
-    df['BB_Upper'] = df['SMA_20'] + (df['BB_Std'] * 2)
-    df['BB_Lower'] = df['SMA_20'] - (df['BB_Std'] * 2)
-    
-    # 2. OBV (On-Balance Volume)
-    df['OBV'] = (df['Close'].diff().apply(np.sign) * df['Volume']).fillna(0).cumsum()
-    
-    # 3. 스토캐스틱 오실레이터 (Stochastic Oscillator)
-    high_14 = df['High'].rolling(window=14).max()
-    low_14 = df['Low'].rolling(window=14).min()
-    df['Stoch_K'] = 100 * ((df['Close'] - low_14) / (high_14 - low_14).replace(0, 1e-6))
-    df['Stoch_D'] = df['Stoch_K'].rolling(window=3).mean()
-    
-    # 4. ROC (Rate of Change)
-    df['ROC'] = (df['Close'] - df['Close'].shift(9)) / df['Close'].shift(9) * 100
-    
-    # 🚨 신규 지표 추가 끝 🚨
-    
-    return df.drop(columns=['BB_Std']).dropna()
+    with _INDICATOR_LOCK:
+        entry = _INDICATOR_CACHE.get(symbol)
+        if entry is not None:
+            last_date = entry['last_date']
+            if (last_date in df.index and df.index[-1] >= last_date and
+                    np.array_equal(df.loc[last_date, _OHLCV].to_numpy(dtype=float), entry['last_bar'])):
+                for bar in df.loc[df.index > last_date, _OHLCV].itertuples(index=False):
+                    row = entry['state'].update(*bar)
+                    if not np.isnan(row).any():
+                        entry['tail'].append(row)
+            else:
+                entry = None
+
+        if entry is None:
+            df_proc = add_technical_indicators(df)
+            entry = {
+                'state': IndicatorState.from_history(df),
+                'tail': deque(df_proc[FEATURES].to_numpy(dtype=float)[-FEATURE_TAIL:], maxlen=FEATURE_TAIL),
+            }
+            _INDICATOR_CACHE[symbol] = entry
+        _INDICATOR_CACHE.move_to_end(symbol)
+        while len(_INDICATOR_CACHE) > max(1, INDICATOR_CACHE_ENTRIES):
+            _INDICATOR_CACHE.popitem(last=False)
+
+        entry['last_date'] = df.index[-1]
+        entry['last_bar'] = df[_OHLCV].iloc[-1].to_numpy(dtype=float)
+        return np.array(entry['tail']), copy.deepcopy(entry['state'])
 
 def _generate_mock_interpretation(company, final_predicted_price, change_pct):
     """API 호출 실패 시 사용자에게 보여줄 가상 해석을 생성합니다."""
@@ -158,55 +168,132 @@ def _generate_interpretation(company, current_price, final_predicted_price, chan
     return _generate_mock_interpretation(company, final_predicted_price, change_pct)
 
 
-def predict_next_month(df, symbol, time_steps, company): 
-    """저장된 다변량 모델을 사용하여 다음 30일 주가를 예측하고 LLM 해석을 반환합니다."""
-    
-    safe = symbol.replace(".", "_")
-    scaler_path = os.path.join(MODEL_DIR, f"scaler_{safe}_{time_steps}.pkl")
-    model_path = os.path.join(MODEL_DIR, f"model_{safe}_{time_steps}.keras") 
+def compiled_rollout(model, horizon=30):
+    """
+    모델별로 한 번만 트레이싱되는 자기회귀 예측 그래프를 반환합니다.
+    입력 (batch, time_steps, 13) 윈도에서 시작해 매 단계 예측 종가를 마지막 행에 덧붙이고
+    (종가 외 피처는 마지막 값 유지) 가장 오래된 행을 밀어내며 horizon 단계를 진행한 뒤
+    (batch, horizon) 의 정규화된 예측 종가를 돌려줍니다.
+    """
+    cache = _ROLLOUTS.setdefault(model, {})
+    if horizon in cache:
+        return cache[horizon]
 
-    if not os.path.exists(scaler_path) or not os.path.exists(model_path):
-        return None, None, f"'{company}' 모델이 없습니다. 'LSTM 학습 및 30일 예측 시작' 버튼으로 자동 학습하세요."
+    # TFLite 백엔드만 쓰는 프로세스는 TensorFlow 를 가져오지 않도록 여기서 import
+    import tensorflow as tf
+
+    @tf.function(input_signature=[tf.TensorSpec((None,) + tuple(model.input_shape[1:]), tf.float32)],
+                 jit_compile=True)
+    def rollout(window):
+        preds = tf.TensorArray(tf.float32, size=horizon)
+        x = window
+        for step in tf.range(horizon):
+            y = model(x, training=False)[:, :1]
+            next_row = tf.concat([y, x[:, -1, 1:]], axis=1)
+            x = tf.concat([x[:, 1:], next_row[:, None, :]], axis=1)
+            preds = preds.write(step, y[:, 0])
+        return tf.transpose(preds.stack())
+
+    cache[horizon] = rollout
+    return rollout
+
+
+def compiled_direct(model):
+    """다중 출력(direct) 모델의 컴파일된 순전파: (batch, time_steps, 13) → (batch, horizon)."""
+    cache = _ROLLOUTS.setdefault(model, {})
+    if "direct" not in cache:
+        import tensorflow as tf
+
+        cache["direct"] = tf.function(lambda window: model(window, training=False),
+                                      input_signature=[tf.TensorSpec((None,) + tuple(model.input_shape[1:]), tf.float32)],
+                                      jit_compile=True)
+    return cache["direct"]
+
+
+def _load_forecaster(symbol, time_steps, backend=None, mode=None):
+    """
+    (model, scaler, rollout) 을 반환합니다. rollout(window_batch, horizon) → (batch, horizon) 정규화 예측.
+    mode="direct" 이면 30일을 한 번의 순전파로 출력하는 모델을 사용합니다 (Keras 백엔드만 지원).
+    backend="tflite" 이면 Keras 모델보다 오래되지 않은 TFLite 변환본이 있을 때 그것을 쓰고,
+    없으면 Keras 모델로 대체합니다. 산출물이 없으면 FileNotFoundError.
+    """
+    if (mode or FORECAST_MODE) == MODE_DIRECT:
+        model, scaler = registry.get(symbol, time_steps, MODE_DIRECT)
+
+        def direct(window, horizon):
+            if horizon > DIRECT_HORIZON:
+                raise ValueError(f"direct 모델은 최대 {DIRECT_HORIZON}일까지 예측합니다.")
+            return compiled_direct(model)(window).numpy()[:, :horizon]
+        return model, scaler, direct
+
+    scaler = registry.get_scaler(symbol, time_steps)
+    if (backend or INFERENCE_BACKEND) == "tflite":
+        try:
+            lite = registry.get_tflite(symbol, time_steps, TFLITE_QUANTIZE)
+            model_path, _ = artifact_paths(symbol, time_steps)
+            # 재학습 후 다시 변환하지 않은 변환본은 사용하지 않음 (Keras 파일 없이 배포한 경우는 허용)
+            if not os.path.exists(model_path) or os.path.getmtime(lite.path) >= os.path.getmtime(model_path):
+                return lite, scaler, lambda window, horizon: np.stack([lite.rollout(w, horizon) for w in window])
+            print(f"{symbol} TFLite 변환본이 모델보다 오래되어 Keras 백엔드를 사용합니다.")
+        except FileNotFoundError:
+            pass
+    model = registry.get_model(symbol, time_steps)
+    return model, scaler, lambda window, horizon: compiled_rollout(model, horizon)(window).numpy()
+
+
+def _rollout_with_indicators(model, scaler, recent, state, last_volume, horizon=30):
+    """예측 종가로 지표 상태를 한 일봉씩 갱신하며 진행하는 자기회귀 예측 (advance_features)."""
+    window = recent.astype(np.float32)
+    predictions = []
+    for _ in range(horizon):
+        predicted_scaled_price = float(model(window[None], training=False)[0, 0])
+        predictions.append(predicted_scaled_price)
+
+        # 예측 종가를 고가=저가=종가, 거래량은 마지막 값으로 가정한 일봉으로 반영
+        price = float(inverse_column(scaler, predicted_scaled_price))
+        next_row = scaler.transform(state.update(price, price, price, last_volume)[None, :])[0]
+        next_row[0] = predicted_scaled_price
+        window = np.concatenate([window[1:], next_row[None].astype(np.float32)])
+    return np.array(predictions)
+
+
+def predict_next_month(df, symbol, time_steps, company, advance_features=False, backend=None, mode=None): 
+    """
+    저장된 다변량 모델을 사용하여 다음 30일 주가를 예측하고 LLM 해석을 반환합니다.
+    advance_features=True 이면 예측 종가로 지표 상태를 한 일봉씩 갱신해 다음 입력을 만들고,
+    기본값(False)은 학습 때와 같이 종가 외 피처를 마지막 값으로 유지합니다.
+    backend 는 "keras" / "tflite" (기본값: ECOS_INFERENCE_BACKEND 환경변수),
+    mode 는 "step" / "direct" (기본값: ECOS_FORECAST_MODE 환경변수). direct 는 자기회귀 없이
+    한 번에 30일을 예측하므로 advance_features 가 적용되지 않습니다.
+    """
+    mode = mode or FORECAST_MODE
 
+    # 레지스트리가 프로세스 내에서 모델/스케일러를 재사용 (파일이 바뀐 경우에만 다시 로드)
     try:
-        scaler = joblib.load(scaler_path)
-        model = load_model(model_path)
+        model, scaler, rollout = _load_forecaster(symbol, time_steps, backend, mode)
+    except FileNotFoundError:
+        return None, None, f"'{company}' 모델이 없습니다. 'LSTM 학습 및 30일 예측 시작' 버튼으로 자동 학습하세요."
     except Exception as e:
         return None, None, f"모델 로드 실패 ({e}). 재학습 후 재시도하세요."
 
-    # 1. 예측에 필요한 기술적 지표 추가
-    df_proc = add_technical_indicators(df.copy())
-    # 🚨 [수정] 피처 목록 업데이트 (lstm_model.py와 일치해야 함 - 13개)
-    features = ['Close', 'Volume', 'SMA_5', 'SMA_20', 'RSI', 'MACD', 'Volume_SMA', 
-                'BB_Upper', 'BB_Lower', 'OBV', 'Stoch_K', 'Stoch_D', 'ROC']
+    # 1. 예측에 필요한 기술적 지표 (새 일봉만 증분 반영)
+    recent_features, state = _recent_features(df, symbol)
+    features = FEATURES
     
-    if len(df_proc) < time_steps:
+    if len(recent_features) < time_steps:
         return None, None, "기술 지표 생성 후 과거 데이터 부족 (time_steps보다 짧음)"
 
     # 2. 스케일링 및 최근 데이터 준비
-    data_scaled = scaler.transform(df_proc[features].values) 
-    recent = data_scaled[-time_steps:] 
+    recent = scaler.transform(recent_features[-time_steps:]) 
     
-    # 3. 예측 루프 (안정화된 로직 적용)
-    predictions = []
-    current_input = recent.reshape(1, time_steps, len(features)) 
-
-    for _ in range(30):
-        predicted_scaled_price = model.predict(current_input, verbose=0)[0, 0]
-        predictions.append(predicted_scaled_price)
-        
-        # 다음 단계의 입력 시퀀스 준비
-        temp_scaled = current_input[0, -1].copy()
-        temp_scaled[0] = predicted_scaled_price
-
-        # 나머지 피처(1~12 인덱스)는 마지막 값 유지
-        new_scaled_sequence = np.append(current_input[0, 1:], [temp_scaled], axis=0)
-        current_input = new_scaled_sequence.reshape(1, time_steps, len(features))
+    # 3. 예측 루프 (모델별로 컴파일된 그래프 1회 호출)
+    if advance_features and mode != MODE_DIRECT:
+        predictions = _rollout_with_indicators(model, scaler, recent, state, float(df['Volume'].iloc[-1]))
+    else:
+        predictions = rollout(recent[None].astype(np.float32), 30)[0]
 
-    # 4. 역변환
-    dummy = np.zeros((30, len(features)))
-    dummy[:, 0] = predictions 
-    pred_prices = scaler.inverse_transform(dummy)[:, 0]
+    # 4. 역변환 (종가 열만)
+    pred_prices = inverse_column(scaler, predictions)
 
     # 5. 결과 DataFrame 생성
     last_date = df.index[-1]
@@ -219,7 +306,7 @@ def predict_next_month(df, symbol, time_steps, company):
     change_pct = (final_price - current_price) / current_price * 100 if current_price != 0 else 0
     
     # 🚨 [수정] LLM 분석을 위한 추가 지표 추출
-    latest_indicators = df_proc.iloc[-1]
+    latest_indicators = dict(zip(features, recent_features[-1]))
     
     rsi = latest_indicators['RSI']
     stoch_k = latest_indicators['Stoch_K']
@@ -242,4 +329,86 @@ def predict_next_month(df, symbol, time_steps, company):
         df_pred=pred_df 
     )
     
-    return pred_df, final_price, interpretation
\ No newline at end of file
+    return pred_df, final_price, interpretation
+
+def _forecast_one(symbol, time_steps, horizon, df, mode=None):
+    """한 종목의 정규화 예측을 수행해 가격 단위 예측 배열을 반환합니다 (LLM 해석 없음)."""
+    if df is None:
+        df = ohlcv_store.update(symbol.split(".")[0])
+    if df.empty:
+        raise ValueError("시세 데이터 없음")
+
+    _, scaler, rollout = _load_forecaster(symbol, time_steps, mode=mode)
+    recent_features, _ = _recent_features(df, symbol)
+    if len(recent_features) < time_steps:
+        raise ValueError("기술 지표 생성 후 과거 데이터 부족 (time_steps보다 짧음)")
+
+    window = scaler.transform(recent_features[-time_steps:])[None].astype(np.float32)
+    scaled = rollout(window, horizon)[0]
+    prices = inverse_column(scaler, scaled, copy=False)
+    return df.index[-1], float(df['Close'].iloc[-1]), prices
+
+
+def predict_many(symbols, time_steps=60, horizon=30, max_workers=4, data=None, mode=None):
+    """
+    여러 종목의 향후 horizon일 종가를 한 번에 예측합니다.
+
+    종목마다 가중치가 달라 한 배치로 묶을 수 없으므로, 종목별 컴파일된 예측 그래프를
+    스레드 풀에서 동시에 실행합니다 (TensorFlow 연산은 GIL을 놓음).
+    data 에 {symbol: OHLCV DataFrame} 을 주면 그 데이터를, 없으면 OHLCV 저장소를 사용합니다.
+
+    반환: symbol, date, step, close, last_close, change_pct 컬럼의 DataFrame.
+          실패한 종목은 df.attrs['errors'] = {symbol: 메시지} 에 기록됩니다.
+    """
+    data = data or {}
+    rows, errors = [], {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(_forecast_one, sym, time_steps, horizon, data.get(sym), mode): sym
+                   for sym in dict.fromkeys(symbols)}
+        for future, sym in futures.items():
+            try:
+                last_date, last_close, prices = future.result()
+            except Exception as e:
+                errors[sym] = str(e) or type(e).__name__
+                continue
+            for step, price in enumerate(prices, start=1):
+                rows.append({
+                    "symbol": sym,
+                    "date": last_date + timedelta(days=step),
+                    "step": step,
+                    "close": float(price),
+                    "last_close": last_close,
+                    "change_pct": (price - last_close) / last_close * 100 if last_close else 0.0,
+                })
+
+    result = pd.DataFrame(rows, columns=["symbol", "date", "step", "close", "last_close", "change_pct"])
+    result.attrs["errors"] = errors
+    return result
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="여러 종목 30일 예측 일괄 실행")
+    parser.add_argument("symbols", nargs="*", help="예: 005930.KS 000660.KS")
+    parser.add_argument("--file", help="한 줄에 한 종목씩 적힌 관심 종목 파일")
+    parser.add_argument("--time-steps", type=int, default=60)
+    parser.add_argument("--horizon", type=int, default=30)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--mode", choices=[MODE_STEP, MODE_DIRECT], help="기본값: ECOS_FORECAST_MODE")
+    parser.add_argument("--out", default="forecasts.csv")
+    args = parser.parse_args()
+
+    symbols = list(args.symbols)
+    if args.file:
+        with open(args.file, encoding="utf-8") as f:
+            symbols += [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+    start = time.perf_counter()
+    forecasts = predict_many(symbols, args.time_steps, args.horizon, args.workers, mode=args.mode)
+    forecasts.to_csv(args.out, index=False)
+    print(f"{forecasts['symbol'].nunique()}/{len(set(symbols))} 종목 예측 완료 "
+          f"({time.perf_counter() - start:.1f}초) → {args.out}")
+    for sym, msg in forecasts.attrs["errors"].items():
+        print(f"  실패 {sym}: {msg}")
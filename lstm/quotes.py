@@ -0,0 +1,130 @@
+# quotes.py
+"""
+인기 종목 시세 서비스.
+
+모든 종목을 yf.download 한 번으로 받아오고, 결과를 프로세스 전역(모든 세션 공유)에
+QUOTE_TTL 초 동안 보관합니다. TTL 이 지나면 이전 값을 즉시 돌려주고 백그라운드
+스레드에서 갱신하므로(stale-while-revalidate) 화면 렌더링이 네트워크를 기다리지 않습니다.
+
+종목 목록은 환경변수로 바꿀 수 있습니다.
+    ECOS_TOP_TICKERS="005930.KS:삼성전자,000660.KS:SK하이닉스"
+"""
+
+import os
+import threading
+import time
+
+import pandas as pd
+
+DEFAULT_TICKERS = {
+    "005930.KS": "삼성전자",
+    "373220.KS": "LG에너지솔루션",
+    "000660.KS": "SK하이닉스",
+    "005490.KS": "POSCO홀딩스",
+    "035420.KS": "네이버",
+}
+QUOTE_TTL = float(os.getenv("ECOS_QUOTE_TTL", "60"))
+COLD_WAIT = 3.0   # 캐시가 비어 있을 때 첫 응답을 기다리는 최대 시간(초)
+
+
+def parse_tickers(spec: str) -> dict:
+    """'005930.KS:삼성전자,000660.KS' 형식을 {ticker: name} 으로 변환합니다 (이름 생략 시 티커)."""
+    tickers = {}
+    for item in spec.split(","):
+        ticker, _, name = item.strip().partition(":")
+        if ticker:
+            tickers[ticker.strip().upper()] = name.strip() or ticker.strip().upper()
+    return tickers
+
+
+def configured_tickers() -> dict:
+    spec = os.getenv("ECOS_TOP_TICKERS", "")
+    return parse_tickers(spec) if spec.strip() else dict(DEFAULT_TICKERS)
+
+
+def _empty_quote(ticker, name):
+    return {"name": name, "ticker": ticker, "price": 0, "change_pct": 0.0}
+
+
+def fetch_quotes(tickers: dict) -> list:
+    """yf.download 한 번으로 전 종목의 최근 종가와 전일 대비 등락률을 계산합니다."""
+    import yfinance as yf
+
+    # 주말/공휴일에도 직전 두 거래일이 포함되도록 5일치를 요청
+    raw = yf.download(list(tickers), period="5d", interval="1d", group_by="column",
+                      auto_adjust=False, progress=False, threads=True)
+    close = raw["Close"] if not raw.empty else pd.DataFrame()
+    if isinstance(close, pd.Series):   # 종목이 하나면 Series 로 돌아옴
+        close = close.to_frame(next(iter(tickers)))
+
+    quotes = []
+    for ticker, name in tickers.items():
+        series = close[ticker].dropna() if ticker in close else pd.Series(dtype=float)
+        if series.empty:
+            quotes.append(_empty_quote(ticker, name))
+            continue
+        current_price = float(series.iloc[-1])
+        change_pct = 0.0
+        if len(series) >= 2 and series.iloc[-2]:
+            change_pct = (current_price - series.iloc[-2]) / series.iloc[-2] * 100
+        quotes.append({"name": name, "ticker": ticker, "price": current_price,
+                       "change_pct": float(change_pct)})
+    return quotes
+
+
+class QuoteService:
+    """TTL 캐시 + 백그라운드 갱신을 하는 스레드 안전한 시세 캐시."""
+
+    def __init__(self, ttl: float = QUOTE_TTL, fetcher=fetch_quotes):
+        self.ttl = ttl
+        self.fetcher = fetcher
+        self._cache = {}        # tuple(tickers) -> (fetched_at, quotes)
+        self._refreshing = {}   # tuple(tickers) -> threading.Event (갱신 완료 시 set)
+        self._lock = threading.Lock()
+
+    def _refresh(self, key, tickers, done):
+        try:
+            quotes = self.fetcher(tickers)
+            with self._lock:
+                self._cache[key] = (time.monotonic(), quotes)
+        except Exception as e:
+            print(f"시세 갱신 실패: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.pop(key, None)
+            done.set()
+
+    def _start_refresh(self, key, tickers):
+        # 같은 종목 목록에 대한 갱신은 동시에 하나만 실행 (호출자는 lock 을 잡고 있어야 함)
+        done = self._refreshing.get(key)
+        if done is None:
+            done = self._refreshing[key] = threading.Event()
+            threading.Thread(target=self._refresh, args=(key, tickers, done),
+                             name="quote-refresh", daemon=True).start()
+        return done
+
+    def get(self, tickers: dict = None, wait: float = COLD_WAIT) -> list:
+        """
+        [{name, ticker, price, change_pct}, ...] 를 반환합니다.
+        캐시가 신선하면 그대로, 오래됐으면 이전 값을 돌려주며 백그라운드 갱신을 시작합니다.
+        캐시가 비어 있을 때만 최대 wait 초 기다리고, 그래도 없으면 price=0 인 빈 시세를 반환합니다.
+        """
+        tickers = tickers or configured_tickers()
+        key = tuple(tickers)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                if time.monotonic() - cached[0] >= self.ttl:
+                    self._start_refresh(key, tickers)
+                return cached[1]
+            done = self._start_refresh(key, tickers)
+
+        done.wait(wait)
+        with self._lock:
+            cached = self._cache.get(key)
+        if cached is not None:
+            return cached[1]
+        return [_empty_quote(ticker, name) for ticker, name in tickers.items()]
+
+
+quote_service = QuoteService()
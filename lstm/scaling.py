@@ -0,0 +1,148 @@
+# scaling.py
+"""
+피처 MinMax 스케일러와 종가 열 역변환 도우미.
+
+FeatureScaler 는 sklearn MinMaxScaler(feature_range=(0, 1))와 같은 min_/scale_ 를 갖는
+읽기 전용 파라미터 묶음으로, scaler_{safe}_{ts}.npy 에 (4, 피처 수) float64 배열 하나로 저장합니다
+(행 순서: data_min_, data_max_, scale_, min_). pickle/zip 이 아니므로 로드에 수십 마이크로초면
+충분하고, 파일은 임시 파일에 쓴 뒤 교체하며
+배열은 쓰기 불가로 고정되므로 여러 프로세스·스레드가 같은 파일/객체를 안전하게 공유합니다.
+
+예측값(정규화 종가)만 가격으로 되돌릴 때는 13열 더미 행렬 없이 inverse_column 을 사용합니다.
+
+    python scaling.py models/   # 이전 버전의 scaler_*.pkl 을 .npy 로 변환
+"""
+
+import os
+
+import numpy as np
+
+SCALER_EXT = ".npy"
+LEGACY_EXT = ".pkl"
+_FIELDS = ("data_min_", "data_max_", "scale_", "min_")
+
+
+class FeatureScaler:
+    """
+    열별 MinMax 정규화 파라미터. transform/inverse_transform 은 MinMaxScaler 와 같은 결과를 냅니다.
+    """
+
+    __slots__ = _FIELDS
+
+    def __init__(self, data_min_, data_max_, scale_, min_):
+        for name, value in zip(_FIELDS, (data_min_, data_max_, scale_, min_)):
+            array = np.array(value, dtype=np.float64)
+            array.setflags(write=False)
+            object.__setattr__(self, name, array)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("FeatureScaler 는 변경할 수 없습니다.")
+
+    def __reduce__(self):
+        # 프로세스 풀/캐시로 넘길 때도 생성자를 거쳐 읽기 전용 상태로 복원
+        return type(self), tuple(getattr(self, name) for name in _FIELDS)
+
+    @classmethod
+    def fit(cls, data):
+        """MinMaxScaler().fit(data) 와 같은 파라미터 (범위가 0인 열은 scale 1)."""
+        data = np.asarray(data, dtype=np.float64)
+        data_min, data_max = np.nanmin(data, axis=0), np.nanmax(data, axis=0)
+        data_range = data_max - data_min
+        scale = 1.0 / np.where(data_range < 10 * np.finfo(np.float64).eps, 1.0, data_range)
+        return cls(data_min, data_max, scale, -data_min * scale)
+
+    @classmethod
+    def from_sklearn(cls, scaler):
+        return cls(*(getattr(scaler, name) for name in _FIELDS))
+
+    @property
+    def n_features_in_(self) -> int:
+        return len(self.scale_)
+
+    def transform(self, X) -> np.ndarray:
+        X = np.array(X, dtype=np.float64)
+        X *= self.scale_
+        X += self.min_
+        return X
+
+    def inverse_transform(self, X) -> np.ndarray:
+        X = np.array(X, dtype=np.float64)
+        X -= self.min_
+        X /= self.scale_
+        return X
+
+    def save(self, path: str):
+        """임시 파일에 쓴 뒤 교체하므로 읽는 쪽은 항상 완전한 파일만 봅니다."""
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, np.stack([getattr(self, name) for name in _FIELDS]))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str):
+        return cls(*np.load(path, allow_pickle=False))
+
+    def __eq__(self, other):
+        return isinstance(other, FeatureScaler) and all(
+            np.array_equal(getattr(self, name), getattr(other, name)) for name in _FIELDS)
+
+    def __repr__(self):
+        return f"FeatureScaler(n_features={self.n_features_in_})"
+
+
+def inverse_column(scaler, values, col: int = 0, copy: bool = True) -> np.ndarray:
+    """
+    정규화된 col 열 값(임의 shape)만 원래 단위로 되돌립니다. FeatureScaler / MinMaxScaler 모두 지원.
+    copy=False 이고 values 가 float64 배열이면 그 배열을 제자리에서 바꿉니다.
+    """
+    values = np.array(values, dtype=np.float64) if copy else np.asarray(values, dtype=np.float64)
+    values -= scaler.min_[col]
+    values /= scaler.scale_[col]
+    return values
+
+
+def save_scaler(scaler, path: str) -> str:
+    """
+    스케일러를 .npy 로 저장하고 실제 경로를 반환합니다. path 가 이전 형식(.pkl)이면 같은 이름의
+    .npy 로 저장한 뒤 .pkl 을 지웁니다.
+    """
+    if not isinstance(scaler, FeatureScaler):
+        scaler = FeatureScaler.from_sklearn(scaler)
+    root, ext = os.path.splitext(path)
+    npy_path = root + SCALER_EXT
+    scaler.save(npy_path)
+    if ext == LEGACY_EXT and os.path.exists(path):
+        os.remove(path)
+    return npy_path
+
+
+def load_scaler(path: str) -> FeatureScaler:
+    """.npy 스케일러를 읽습니다. 이전 버전의 joblib .pkl 이면 읽어서 FeatureScaler 로 바꿉니다."""
+    if path.endswith(LEGACY_EXT):
+        import joblib
+        return FeatureScaler.from_sklearn(joblib.load(path))
+    return FeatureScaler.load(path)
+
+
+def convert_dir(model_dir: str) -> list:
+    """폴더의 scaler_*.pkl 을 모두 .npy 로 변환하고 변환한 파일 이름 목록을 반환합니다."""
+    converted = []
+    for name in sorted(os.listdir(model_dir)):
+        if name.startswith("scaler_") and name.endswith(LEGACY_EXT):
+            path = os.path.join(model_dir, name)
+            save_scaler(load_scaler(path), path)
+            converted.append(name)
+    return converted
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="joblib 스케일러(.pkl)를 .npy 로 변환")
+    parser.add_argument("model_dir", nargs="?", default="models")
+    args = parser.parse_args()
+
+    names = convert_dir(args.model_dir)
+    for name in names:
+        print(f"  {name} → {os.path.splitext(name)[0]}{SCALER_EXT}")
+    print(f"{len(names)}개 변환 완료")
@@ -0,0 +1,31 @@
+# services.py
+"""
+app.py 가 쓰는 무거운 기능(작업 큐/뉴스)의 지연 import 창구.
+
+학습/예측은 jobs 작업 큐에서 실행됩니다. TensorFlow·scikit-learn·Keras(trainer, predict)와
+뉴스 크롤러는 각 함수가 처음 호출될 때 import 하므로, 기본 화면(시세·재무 정보)만 보는 세션과 컨테이너
+콜드 스타트에서는 로드되지 않습니다.
+"""
+
+import importlib
+import importlib.util
+
+# 앱 기능에 필요한 모듈 (존재 여부만 확인하고 실제 import 는 첫 사용 시)
+REQUIRED_MODULES = ("predict", "trainer", "jobs", "news_scraper", "tensorflow", "sklearn")
+
+
+def missing_modules() -> list:
+    """설치/배포되지 않은 모듈 이름 목록 (import 하지 않고 확인)."""
+    return [name for name in REQUIRED_MODULES if importlib.util.find_spec(name) is None]
+
+
+def _attr(module, name):
+    return getattr(importlib.import_module(module), name)
+
+
+def get_runner():
+    return _attr("jobs", "get_runner")()
+
+
+def scrape_news_with_tier(query, max_articles=10):
+    return _attr("news_scraper", "scrape_news_with_tier")(query, max_articles=max_articles)
@@ -0,0 +1,151 @@
+# sise_fetcher.py
+"""
+네이버 금융 일별 시세(sise_day) 페이지 동시 수집기.
+
+Streamlit에 의존하지 않으므로 앱, 배치 스크립트, 벤치마크에서 공통으로 사용합니다.
+1페이지에서 마지막 페이지 번호를 먼저 확인한 뒤, 나머지 페이지를 제한된 동시성과
+요청 속도 제한 아래에서 병렬로 가져오고 파싱까지 워커 스레드에서 처리합니다.
+"""
+
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+NAVER_FINANCE_URL = "https://finance.naver.com"
+HEADERS = {'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'}
+
+MAX_PAGES = 150
+MAX_WORKERS = 8
+RATE_LIMIT = 20.0       # 초당 최대 요청 수 (기존 순차 수집의 0.05초 간격과 동일)
+MIN_ROWS_PER_PAGE = 7   # 한 페이지의 행 수가 이보다 적으면 마지막 페이지로 간주
+
+_PAGE_LINK = re.compile(r"[?&;]page=(\d+)")
+
+
+class RateLimiter:
+    """요청 시작 시각을 일정 간격으로 벌려 주는 스레드 안전 속도 제한기."""
+
+    def __init__(self, rate_per_sec: float):
+        self.interval = 1.0 / rate_per_sec if rate_per_sec and rate_per_sec > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+def make_session(pool_size: int = MAX_WORKERS) -> requests.Session:
+    """워커 수만큼 커넥션을 재사용하는 세션을 만듭니다."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update(HEADERS)
+    return session
+
+
+def page_url(code: str, page: int, base_url: str = NAVER_FINANCE_URL) -> str:
+    return f"{base_url}/item/sise_day.naver?code={code}&page={page}"
+
+
+def find_last_page(html: str):
+    """페이지 네비게이션(맨뒤 pgRR 포함)의 링크 중 가장 큰 페이지 번호를 반환합니다."""
+    pages = [int(p) for p in _PAGE_LINK.findall(html)]
+    return max(pages) if pages else None
+
+
+def parse_page(html: str) -> pd.DataFrame:
+    return pd.read_html(StringIO(html), flavor='lxml')[0].dropna()
+
+
+def fetch_page(session: requests.Session, code: str, page: int, base_url: str = NAVER_FINANCE_URL):
+    """한 페이지를 받아 (원본 HTML, 파싱된 표)를 반환합니다."""
+    resp = session.get(page_url(code, page, base_url), timeout=10)
+    resp.raise_for_status()
+    return resp.text, parse_page(resp.text)
+
+
+def fetch_history(code: str, max_pages: int = MAX_PAGES, max_workers: int = MAX_WORKERS,
+                  rate_limit: float = RATE_LIMIT, session: requests.Session = None,
+                  base_url: str = NAVER_FINANCE_URL):
+    """
+    일별 시세 페이지들을 병렬로 수집해 (페이지 목록(최신 → 과거), 완전 여부)를 반환합니다.
+    행 수가 MIN_ROWS_PER_PAGE 미만인 페이지(마지막 페이지)를 만나면 그 앞까지 완전한 이력이고,
+    실패한 페이지를 만나 그 앞까지만 쓴 경우에는 완전 여부가 False 입니다.
+    """
+    session = session or make_session(max_workers)
+    limiter = RateLimiter(rate_limit)
+
+    def fetch_and_parse(page):
+        limiter.wait()
+        return fetch_page(session, code, page, base_url)
+
+    # 1. 첫 페이지로 마지막 페이지 번호 확인
+    try:
+        first_html, first = fetch_and_parse(1)
+    except Exception:
+        return [], False
+    if len(first) < MIN_ROWS_PER_PAGE:
+        return [], True
+
+    last_page = min(find_last_page(first_html) or max_pages, max_pages)
+    pages = [first]
+    if last_page < 2:
+        return pages, True
+
+    # 2. 나머지 페이지를 병렬 수집 (파싱도 워커 스레드에서 수행)
+    complete = True
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(fetch_and_parse, p) for p in range(2, last_page + 1)]
+        for future in futures:
+            try:
+                _, df_page = future.result()
+            except Exception:
+                complete = False
+                break
+            if len(df_page) < MIN_ROWS_PER_PAGE:
+                break
+            pages.append(df_page)
+        # 조기 종료 시 아직 시작하지 않은 요청은 취소
+        for future in futures:
+            future.cancel()
+
+    return pages, complete
+
+
+def fetch_pages(code: str, max_pages: int = MAX_PAGES, max_workers: int = MAX_WORKERS,
+                rate_limit: float = RATE_LIMIT, session: requests.Session = None,
+                base_url: str = NAVER_FINANCE_URL) -> list:
+    """
+    일별 시세 페이지들을 병렬로 수집해 페이지 순서(최신 → 과거)대로 반환합니다.
+    행 수가 MIN_ROWS_PER_PAGE 미만인 페이지나 실패한 페이지를 만나면 그 앞까지만 사용합니다.
+    """
+    return fetch_history(code, max_pages, max_workers, rate_limit, session, base_url)[0]
+
+
+def pages_to_ohlcv(pages: list) -> pd.DataFrame:
+    """수집된 페이지들을 날짜 오름차순 OHLCV DataFrame으로 변환합니다."""
+    if not pages:
+        return pd.DataFrame()
+
+    df = pd.concat(pages, ignore_index=True)
+    df['날짜'] = pd.to_datetime(df['날짜'], format='%Y.%m.%d', errors='coerce')
+    df = df.dropna(subset=['날짜']).drop_duplicates(subset=['날짜'])
+
+    for kr, en in zip(['종가', '시가', '고가', '저가', '거래량'], ['Close', 'Open', 'High', 'Low', 'Volume']):
+        df[en] = pd.to_numeric(df[kr].astype(str).str.replace(',', ''), errors='coerce')
+
+    return df.set_index('날짜').sort_index()[['Open', 'High', 'Low', 'Close', 'Volume']].dropna()
@@ -0,0 +1,231 @@
+# sweep.py
+"""
+종목별 time_steps / LSTM units / batch size 스윕.
+
+    python sweep.py 005930 000660.KS --time-steps 30 60 90 --units 50 100 --batch-sizes 32 64
+    python sweep.py --file universe.txt --metric mape --workers 6 --results sweep_results.csv
+
+종목마다 지표 생성과 스케일링은 부모 프로세스에서 한 번만 하고, 스케일된 (N, 13) 배열을
+.npy 하나로 저장합니다. 워커는 이 파일을 메모리 매핑해 후보 time_steps 별 윈도를 같은 버퍼 위의
+뷰로 만들므로 설정 수만큼 전처리를 반복하지 않습니다.
+
+모든 후보는 같은 검증 구간(가장 긴 time_steps 기준 뒤쪽 20%의 목표일)에서 평가되어
+time_steps 가 달라도 공정하게 비교되며, 결과는 학습 시간과 함께 CSV 로 남습니다.
+종목별 최고 설정의 모델은 models/ 의 기본 산출물(model_{safe}_{ts}.keras)로 등록되고
+best_{safe}.json 에 기록되어 앱의 Time Steps 기본값이 됩니다.
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import as_completed
+
+import numpy as np
+
+from model_registry import MODEL_DIR, artifact_paths, best_config_path
+from train_batch import normalize_symbol, release_worker_memory, worker_pool
+
+TIME_STEPS = (30, 60, 90)
+UNITS = (50, 100)
+BATCH_SIZES = (32, 64)
+TRAIN_RATIO = 0.8
+METRICS = ("rmse", "mae", "mape")
+
+RESULT_FIELDS = ["symbol", "time_steps", "units", "batch_size", "status", "rank", "best", "epochs",
+                 "train_samples", "val_samples", "fit_seconds", "val_rmse", "val_mae", "val_mape", "error"]
+
+
+def prepare(df, max_time_steps: int, train_ratio: float = TRAIN_RATIO) -> dict:
+    """
+    지표 생성 + 스케일링을 한 번 수행합니다. split_row 는 검증 목표일이 시작되는 행 번호로,
+    모든 time_steps 후보가 이 행부터의 종가를 같은 검증 구간으로 씁니다.
+    """
+    from indicators import FEATURES, add_technical_indicators
+    from scaling import FeatureScaler
+
+    df = add_technical_indicators(df)
+    data = df[FEATURES].values
+    targets = len(data) - max_time_steps
+    split_row = max_time_steps + int(targets * train_ratio)
+    if targets < 2 or split_row >= len(data):
+        raise ValueError(f"지표 생성 후 데이터 부족! {len(data)}일 (time_steps {max_time_steps})")
+
+    scaler = FeatureScaler.fit(data)
+    return {"scaled": scaler.transform(data), "scaler": scaler, "split_row": split_row,
+            "rows": len(data), "last_date": df.index[-1]}
+
+
+def _scaled_path(work_dir: str, symbol: str) -> str:
+    return os.path.join(work_dir, f"scaled_{symbol.replace('.', '_')}.npy")
+
+
+def candidate_path(work_dir: str, symbol: str, time_steps: int, units: int, batch_size: int) -> str:
+    return os.path.join(work_dir, f"model_{symbol.replace('.', '_')}_{time_steps}_u{units}_b{batch_size}.keras")
+
+
+def train_config(symbol, scaled_path, scaler, split_row, time_steps, units, batch_size, epochs, work_dir):
+    """
+    워커에서 실행: 공유 버퍼에서 윈도 뷰 생성 → 학습 → 검증 지표 계산 → 후보 모델 저장.
+    모델 객체는 돌려보내지 않고 결과 행(dict)만 반환합니다.
+    """
+    row = {"symbol": symbol, "time_steps": time_steps, "units": units, "batch_size": batch_size, "status": "ok"}
+    try:
+        from tensorflow.keras.callbacks import EarlyStopping
+
+        from trainer import build_model, scaled_metrics
+        from windows import WindowSequence, make_windows
+
+        scaled = np.load(scaled_path, mmap_mode="r")
+        X, y = make_windows(scaled, time_steps)
+        cut = split_row - time_steps   # 윈도 i 의 목표 행은 i + time_steps
+        X_train, X_val, y_train, y_val = X[:cut], X[cut:], y[:cut], y[cut:]
+
+        model = build_model(time_steps, X.shape[2], units)
+        start = time.perf_counter()
+        history = model.fit(WindowSequence(X_train, y_train, batch_size=batch_size, shuffle=True),
+                            epochs=epochs, verbose=0,
+                            callbacks=[EarlyStopping(patience=7, restore_best_weights=True, monitor='loss')])
+        row["fit_seconds"] = round(time.perf_counter() - start, 3)
+
+        y_pred = model.predict(WindowSequence(X_val, batch_size=256), verbose=0).ravel()
+        metrics = scaled_metrics(scaler, y_val, y_pred)
+        row.update({f"val_{k}": v for k, v in metrics.items()})
+        row.update(epochs=len(history.history.get("loss", [])), train_samples=len(X_train), val_samples=len(X_val))
+        model.save(candidate_path(work_dir, symbol, time_steps, units, batch_size))
+    except Exception as e:
+        row.update(status="error", error=str(e) or type(e).__name__)
+    finally:
+        model = None
+        release_worker_memory()
+    return row
+
+
+def rank_rows(rows, metric: str = "rmse") -> list:
+    """종목별로 검증 지표(같으면 학습 시간) 순위를 매기고 1위에 best=True 를 표시합니다."""
+    key = f"val_{metric}"
+    for symbol in dict.fromkeys(r["symbol"] for r in rows):
+        ok = sorted((r for r in rows if r["symbol"] == symbol and r["status"] == "ok"),
+                    key=lambda r: (r[key], r["fit_seconds"]))
+        for rank, row in enumerate(ok, 1):
+            row.update(rank=rank, best=rank == 1)
+    return rows
+
+
+def register_best(symbol, row, prepared, work_dir, model_dir: str = MODEL_DIR, metric: str = "rmse") -> str:
+    """최고 설정의 후보 모델과 공용 스케일러를 기본 산출물로 등록하고 best_{safe}.json 을 씁니다."""
+    from scaling import save_scaler
+    from trainer import _write_training_meta
+
+    time_steps = row["time_steps"]
+    os.makedirs(model_dir, exist_ok=True)
+    model_path, scaler_path = artifact_paths(symbol, time_steps, model_dir)
+    # 앱/레지스트리가 읽는 도중 깨진 파일을 보지 않도록 같은 폴더의 임시 파일에서 교체
+    tmp_path = f"{model_path}.{os.getpid()}.tmp.keras"
+    shutil.copyfile(candidate_path(work_dir, symbol, time_steps, row["units"], row["batch_size"]), tmp_path)
+    os.replace(tmp_path, model_path)
+    save_scaler(prepared["scaler"], scaler_path)
+    _write_training_meta(symbol, time_steps, model_dir, prepared["last_date"], mode="sweep",
+                         rows=prepared["rows"], units=row["units"], batch_size=row["batch_size"])
+
+    best = {k: row[k] for k in ("time_steps", "units", "batch_size", "epochs", "fit_seconds",
+                                "val_rmse", "val_mae", "val_mape")}
+    best.update(metric=metric, swept_at=time.strftime("%Y-%m-%dT%H:%M:%S"))
+    path = best_config_path(symbol, model_dir)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(best, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+    return model_path
+
+
+def run_sweep(symbols, time_steps=TIME_STEPS, units=UNITS, batch_sizes=BATCH_SIZES, epochs=30, workers=None,
+              tf_threads=2, model_dir=MODEL_DIR, metric="rmse", register=True, loader=None) -> list:
+    """
+    종목마다 전처리를 한 번 하고 모든 (time_steps, units, batch_size) 조합을 프로세스 풀에서 학습합니다.
+    loader(symbol) → OHLCV DataFrame (기본: ohlcv_store.update). 결과 행 목록을 반환합니다.
+    """
+    if loader is None:
+        import ohlcv_store
+        loader = lambda symbol: ohlcv_store.update(symbol.split(".")[0])
+
+    configs = list(itertools.product(sorted(set(time_steps)), sorted(set(units)), sorted(set(batch_sizes))))
+    workers = workers or max(1, (os.cpu_count() or 1) // tf_threads)
+    rows, prepared = [], {}
+    with tempfile.TemporaryDirectory(prefix="sweep_") as work_dir:
+        for symbol in symbols:
+            try:
+                df = loader(symbol)
+                if df.empty:
+                    raise ValueError("시세 데이터 없음")
+                prepared[symbol] = prepare(df, max(time_steps))
+                np.save(_scaled_path(work_dir, symbol), prepared[symbol]["scaled"])
+            except Exception as e:
+                rows.append({"symbol": symbol, "status": "error", "error": str(e) or type(e).__name__})
+
+        with worker_pool(workers, tf_threads) as pool:
+            futures = [pool.submit(train_config, symbol, _scaled_path(work_dir, symbol), prep["scaler"],
+                                   prep["split_row"], ts, u, bs, epochs, work_dir)
+                       for symbol, prep in prepared.items() for ts, u, bs in configs]
+            for done, future in enumerate(as_completed(futures), 1):
+                row = future.result()
+                rows.append(row)
+                score = f"{row[f'val_{metric}']:.4f}" if row["status"] == "ok" else "-"
+                print(f"[{done}/{len(futures)}] {row['symbol']:<10} ts={row['time_steps']:<3} units={row['units']:<4} "
+                      f"batch={row['batch_size']:<4} {row['status']:<5} val_{metric} {score}  "
+                      f"{row.get('fit_seconds', 0):6.1f}s  {row.get('error', '')}", flush=True)
+
+        rank_rows(rows, metric)
+        if register:
+            for row in rows:
+                if row.get("best"):
+                    path = register_best(row["symbol"], row, prepared[row["symbol"]], work_dir, model_dir, metric)
+                    print(f"  {row['symbol']}: ts={row['time_steps']} units={row['units']} "
+                          f"batch={row['batch_size']} → {path}")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LSTM time_steps / 하이퍼파라미터 스윕")
+    parser.add_argument("symbols", nargs="*", help="종목 코드 (예: 005930 또는 000660.KS)")
+    parser.add_argument("--file", help="한 줄에 한 종목씩 적힌 파일")
+    parser.add_argument("--time-steps", type=int, nargs="+", default=list(TIME_STEPS))
+    parser.add_argument("--units", type=int, nargs="+", default=list(UNITS))
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=list(BATCH_SIZES))
+    parser.add_argument("--epochs", type=int, default=30)
+    parser.add_argument("--metric", choices=METRICS, default="rmse", help="최고 설정 선택 기준 (검증 구간)")
+    parser.add_argument("--workers", type=int, help="동시 학습 프로세스 수 (기본: 코어 수 / tf-threads)")
+    parser.add_argument("--tf-threads", type=int, default=2, help="워커당 TensorFlow 연산 스레드 수")
+    parser.add_argument("--model-dir", default=MODEL_DIR)
+    parser.add_argument("--results", default="sweep_results.csv")
+    parser.add_argument("--no-register", dest="register", action="store_false",
+                        help="결과 표만 남기고 기본 산출물은 바꾸지 않음")
+    args = parser.parse_args()
+
+    symbols = list(args.symbols)
+    if args.file:
+        with open(args.file, encoding="utf-8") as f:
+            symbols += [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    symbols = list(dict.fromkeys(normalize_symbol(s) for s in symbols))
+    if not symbols:
+        parser.error("스윕할 종목이 없습니다.")
+
+    start = time.perf_counter()
+    rows = run_sweep(symbols, args.time_steps, args.units, args.batch_sizes, args.epochs, args.workers,
+                     args.tf_threads, args.model_dir, args.metric, args.register)
+
+    with open(args.results, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=RESULT_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(sorted(rows, key=lambda r: (r["symbol"], r.get("rank") or 10**6)))
+
+    ok = sum(r["status"] == "ok" for r in rows)
+    print(f"완료 {ok}/{len(rows)} 설정, 총 {time.perf_counter() - start:.1f}초 → {args.results}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,366 @@
+# symbols.py
+"""
+로컬 종목 마스터(한글명/영문명/코드)와 메모리 검색 색인.
+
+    index = get_index()
+    index.resolve("삼성전")      # 정확/부분 입력/초성만 처리 → Match(symbol='005930.KS', ...)
+    index.search("ㅋㅋㅇ", 5)    # 자동완성 후보 (카카오 ..., 오타는 유사도 후보로만 제시)
+
+마스터는 KRX 전종목 기본정보(요청 1회, 영문명 포함)나 pykrx 종목 목록으로 만들어
+data/universe/tickers.parquet 에 저장하고, ECOS_TICKER_MASTER_MAX_AGE_DAYS(기본 7일)가 지나면
+백그라운드에서 다시 받습니다(그동안은 기존 파일 사용). 시장에 따라 Yahoo 접미사
+.KS(KOSPI)/.KQ(KOSDAQ)를 붙입니다. 이전 버전이 KOSDAQ 종목을 .KS 이름으로 저장한 모델은
+`python symbols.py --migrate-artifacts models` 로 한 번 이름을 바꿔 줍니다.
+
+검색 순서: 정확 일치(코드/한글명/영문명) → 접두 일치(자모 단위라 '삼성저' 도 '삼성전자' 와 일치)
+→ 초성 일치('ㅅㅅㅈㅈ') → 자모 바이그램 유사도(오타). 모두 메모리 색인만 사용합니다.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+
+import pandas as pd
+
+MASTER_PATH = os.path.join("data", "universe", "tickers.parquet")
+MASTER_MAX_AGE_DAYS = float(os.getenv("ECOS_TICKER_MASTER_MAX_AGE_DAYS", "7"))
+KRX_JSON_URL = "http://data.krx.co.kr/comm/bldAttendant/getJsonData.cmd"
+MASTER_COLUMNS = ["code", "name", "name_en", "market", "market_cap"]
+SUFFIXES = {"KOSPI": ".KS", "KOSDAQ": ".KQ"}
+FUZZY_THRESHOLD = 0.5
+RESOLVE_KINDS = ("exact", "prefix", "chosung")   # resolve() 가 자동 선택하는 일치 종류
+RETRY_AFTER = 600   # 마스터 생성 실패 후 재시도까지 대기(초)
+
+_CHOSUNG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_JUNGSUNG = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+_JONGSUNG = ["", "ㄱ", "ㄲ", "ㄳ", "ㄴ", "ㄵ", "ㄶ", "ㄷ", "ㄹ", "ㄺ", "ㄻ", "ㄼ", "ㄽ", "ㄾ", "ㄿ", "ㅀ",
+             "ㅁ", "ㅂ", "ㅄ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ"]
+_CHOSUNG_SET = set(_CHOSUNG)
+_NON_WORD = re.compile(r"[^0-9a-z가-힣ㄱ-ㅣ]")
+
+
+def normalize(text: str) -> str:
+    """소문자로 바꾸고 공백/기호를 제거합니다."""
+    return _NON_WORD.sub("", (text or "").lower())
+
+
+def decompose(text: str) -> str:
+    """한글 음절을 자모로 분해합니다 ('전자' → 'ㅈㅓㄴㅈㅏ'). 그 외 문자는 그대로."""
+    out = []
+    for ch in text:
+        code = ord(ch) - 0xAC00
+        if 0 <= code < 11172:
+            out.append(_CHOSUNG[code // 588] + _JUNGSUNG[(code % 588) // 28] + _JONGSUNG[code % 28])
+        else:
+            out.append(ch)
+    return "".join(out)
+
+
+def chosung(text: str) -> str:
+    """초성만 남깁니다 ('삼성전자' → 'ㅅㅅㅈㅈ'). 한글이 아닌 문자는 그대로."""
+    return "".join(_CHOSUNG[(ord(ch) - 0xAC00) // 588] if 0 <= ord(ch) - 0xAC00 < 11172 else ch
+                   for ch in text)
+
+
+def _bigrams(text: str) -> set:
+    return {text[i:i + 2] for i in range(len(text) - 1)} or {text}
+
+
+def suffix_for(market: str) -> str:
+    return SUFFIXES.get("KOSDAQ" if str(market).startswith("KOSDAQ") else market, ".KS")
+
+
+@dataclass
+class Match:
+    code: str
+    name: str
+    market: str
+    symbol: str
+    kind: str      # exact / prefix / chosung / fuzzy
+    score: float
+
+
+class TickerIndex:
+    """종목 마스터 DataFrame 위의 불변 검색 색인 (스레드 간 공유 가능)."""
+
+    def __init__(self, master: pd.DataFrame):
+        master = master.reset_index(drop=True)
+        self.codes = master["code"].astype(str).tolist()
+        self.names = master["name"].fillna("").astype(str).tolist()
+        self.markets = master["market"].fillna("").astype(str).tolist()
+        self.symbols = [code + suffix_for(m) for code, m in zip(self.codes, self.markets)]
+        caps = master["market_cap"] if "market_cap" in master else pd.Series(0.0, index=master.index)
+        self._cap = caps.fillna(0.0).astype(float).tolist()
+        names_en = master["name_en"] if "name_en" in master else pd.Series("", index=master.index)
+        self.names_en = names_en.fillna("").astype(str).tolist()
+
+        self._exact = {}
+        self._prefix = []     # (키, id) 정렬 목록: 자모 분해 한글명 / 영문명 / 코드
+        self._chosung = []    # (초성 문자열, id) 정렬 목록
+        self._grams = defaultdict(list)   # 자모 바이그램 → id 목록
+        self._gram_count = []
+        self._by_code = {}
+        for i, (code, name, name_en) in enumerate(zip(self.codes, self.names, self.names_en)):
+            self._by_code[code] = i
+            name_key, en_key = normalize(name), normalize(name_en)
+            jamo = decompose(name_key)
+            for key in (code, name_key, en_key):
+                if key:
+                    self._exact.setdefault(key, i)
+            for key in (jamo, en_key, code):
+                if key:
+                    self._prefix.append((key, i))
+            self._chosung.append((chosung(name_key), i))
+            grams = _bigrams(jamo)
+            for gram in grams:
+                self._grams[gram].append(i)
+            self._gram_count.append(len(grams))
+        self._prefix.sort()
+        self._chosung.sort()
+
+    def __len__(self):
+        return len(self.codes)
+
+    def _match(self, i, kind, score) -> Match:
+        return Match(self.codes[i], self.names[i], self.markets[i], self.symbols[i], kind, round(score, 3))
+
+    @staticmethod
+    def _scan_prefix(keys, query, limit):
+        found = []
+        pos = bisect_left(keys, (query, -1))
+        while pos < len(keys) and keys[pos][0].startswith(query) and len(found) < limit:
+            found.append(keys[pos][1])
+            pos += 1
+        return found
+
+    def _rank(self, ids):
+        # 같은 단계 안에서는 시가총액이 큰(마스터에 있을 때), 이름이 짧은 종목 우선
+        return sorted(dict.fromkeys(ids), key=lambda i: (-self._cap[i], len(self.names[i]), self.codes[i]))
+
+    def symbol_for_code(self, code: str):
+        i = self._by_code.get(code)
+        return self.symbols[i] if i is not None else None
+
+    def english_name(self, code: str) -> str:
+        """마스터의 영문 종목명 (없으면 빈 문자열)."""
+        i = self._by_code.get(code)
+        return self.names_en[i] if i is not None else ""
+
+    def search(self, query: str, limit: int = 10) -> list:
+        """정확 → 접두 → 초성 → 유사도 순으로 최대 limit 개 후보를 반환합니다."""
+        query = normalize(query.split("[")[0].split(".")[0] if query else "")
+        if not query:
+            return []
+        results, seen = [], set()
+
+        def add(ids, kind, score_fn):
+            for i in ids:
+                if i not in seen and len(results) < limit:
+                    seen.add(i)
+                    results.append(self._match(i, kind, score_fn(i)))
+
+        if query in self._exact:
+            add([self._exact[query]], "exact", lambda i: 1.0)
+        jamo = decompose(query)
+        wide = max(limit * 20, 200)   # 시가총액 순 정렬 전 후보 수
+        add(self._rank(self._scan_prefix(self._prefix, jamo, wide)), "prefix",
+            lambda i: len(jamo) / max(len(decompose(normalize(self.names[i]))), len(jamo)))
+        if all(ch in _CHOSUNG_SET for ch in query):
+            add(self._rank(self._scan_prefix(self._chosung, query, wide)), "chosung",
+                lambda i: len(query) / max(len(self.names[i]), 1))
+        if len(results) < limit:
+            for score, i in self._fuzzy(jamo):
+                add([i], "fuzzy", lambda _, s=score: s)
+        return results
+
+    def _fuzzy(self, jamo: str):
+        """자모 바이그램 Dice 유사도가 FUZZY_THRESHOLD 이상인 (점수, id) 목록 (내림차순)."""
+        grams = _bigrams(jamo)
+        counts = defaultdict(int)
+        for gram in grams:
+            for i in self._grams.get(gram, ()):
+                counts[i] += 1
+        scored = [(2 * c / (len(grams) + self._gram_count[i]), i) for i, c in counts.items()]
+        return sorted((s, i) for s, i in scored if s >= FUZZY_THRESHOLD)[::-1]
+
+    def resolve(self, query: str):
+        """
+        검색어에 가장 잘 맞는 종목 하나 (없으면 None). 유사도(fuzzy) 후보는 다른 회사일 수 있으므로
+        자동 선택하지 않고 search() 의 추천으로만 보여 줍니다.
+        """
+        matches = self.search(query, 1)
+        return matches[0] if matches and matches[0].kind in RESOLVE_KINDS else None
+
+
+# ── 마스터 수집/저장 ──
+
+def fetch_krx_master() -> pd.DataFrame:
+    """KRX 전종목 기본정보 (요청 1회, 영문명 포함). KONEX 는 Yahoo 시세가 없어 제외."""
+    import requests
+
+    response = requests.post(KRX_JSON_URL, timeout=20, data={
+        "bld": "dbms/MDC/STAT/standard/MDCSTAT01901", "locale": "ko_KR", "mktId": "ALL",
+        "share": "1", "csvxls_isNo": "false",
+    }, headers={"User-Agent": "Mozilla/5.0", "Referer": "http://data.krx.co.kr/contents/MDC/MDI/mdiLoader"})
+    response.raise_for_status()
+    rows = response.json().get("OutBlock_1", [])
+    master = pd.DataFrame({
+        "code": [r["ISU_SRT_CD"] for r in rows],
+        "name": [r["ISU_ABBRV"] for r in rows],
+        "name_en": [r.get("ISU_ENG_NM", "") for r in rows],
+        "market": [r["MKT_TP_NM"] for r in rows],
+    })
+    master["market"] = master["market"].where(~master["market"].str.startswith("KOSDAQ"), "KOSDAQ")
+    return master[master["market"].isin(list(SUFFIXES))]
+
+
+def fetch_pykrx_master(date: str = None) -> pd.DataFrame:
+    """pykrx 시장별 종목 목록 (영문명 없음)."""
+    from pykrx import stock
+
+    date = date or datetime.now().strftime("%Y%m%d")
+    rows = [(code, stock.get_market_ticker_name(code), "", market)
+            for market in SUFFIXES for code in stock.get_market_ticker_list(date, market=market)]
+    return pd.DataFrame(rows, columns=["code", "name", "name_en", "market"])
+
+
+def build_master() -> pd.DataFrame:
+    """KRX → pykrx 순으로 마스터를 받고, 전 종목 스냅샷이 있으면 시가총액(검색 순위용)을 붙입니다."""
+    try:
+        master = fetch_krx_master()
+    except Exception as e:
+        print(f"KRX 종목 마스터 조회 실패 → pykrx 사용: {e}")
+        master = fetch_pykrx_master()
+
+    from universe import load_snapshot
+    snapshot = load_snapshot()
+    caps = snapshot["market_cap"] if snapshot is not None else pd.Series(dtype=float)
+    master["market_cap"] = master["code"].map(caps).astype(float)
+    return master.drop_duplicates("code").reset_index(drop=True)[MASTER_COLUMNS]
+
+
+def refresh_master(path: str = MASTER_PATH) -> pd.DataFrame:
+    master = build_master()
+    if master.empty:
+        raise ValueError("종목 마스터가 비어 있습니다.")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    master.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    return master
+
+
+_index = {"signature": None, "index": None, "failed_at": 0.0}
+_index_lock = threading.Lock()
+_refreshing = threading.Event()
+
+
+def _background_refresh(path):
+    try:
+        refresh_master(path)
+    except Exception as e:
+        print(f"종목 마스터 갱신 실패: {e}")
+    finally:
+        _refreshing.clear()
+
+
+def get_index(path: str = MASTER_PATH, max_age_days: float = MASTER_MAX_AGE_DAYS) -> TickerIndex:
+    """
+    프로세스 전역 색인. 파일이 바뀌면 다시 만들고, 오래됐으면 백그라운드에서 갱신합니다.
+    마스터 파일이 아직 없으면 한 번 동기적으로 받고, 그것도 실패하면 빈 색인을 반환합니다.
+    """
+    if not os.path.exists(path):
+        with _index_lock:
+            # 오프라인일 때 매 rerun 마다 타임아웃을 기다리지 않도록 실패 후 잠시 재시도하지 않음
+            if not os.path.exists(path) and time.time() - _index["failed_at"] > RETRY_AFTER:
+                try:
+                    refresh_master(path)
+                except Exception as e:
+                    print(f"종목 마스터 생성 실패: {e}")
+                    _index["failed_at"] = time.time()
+        if not os.path.exists(path):
+            return TickerIndex(pd.DataFrame(columns=MASTER_COLUMNS))
+
+    stat = os.stat(path)
+    if time.time() - stat.st_mtime > max_age_days * 86400 and not _refreshing.is_set():
+        _refreshing.set()
+        threading.Thread(target=_background_refresh, args=(path,), daemon=True).start()
+
+    signature = (path, stat.st_mtime_ns, stat.st_size)
+    with _index_lock:
+        if _index["signature"] != signature:
+            _index["index"] = TickerIndex(pd.read_parquet(path))
+            _index["signature"] = signature
+        return _index["index"]
+
+
+_LEGACY_ARTIFACT = re.compile(r"^(model|scaler|meta|best)_(\d{6})_KS([_.].*)$")
+
+
+def migrate_artifacts(model_dir: str = "models", index: TickerIndex = None) -> list:
+    """
+    이전 버전이 KOSDAQ 종목을 .KS 로 이름 붙여 저장한 산출물(model_035720_KS_60.keras 등)을
+    _KQ 이름으로 바꿉니다. 같은 이름의 _KQ 산출물이 이미 있으면 건너뜁니다. (이전, 이후) 이름 목록을 반환.
+    """
+    index = index or get_index()
+    renamed = []
+    if not os.path.isdir(model_dir):
+        return renamed
+    for name in sorted(os.listdir(model_dir)):
+        match = _LEGACY_ARTIFACT.match(name)
+        if not match or not (index.symbol_for_code(match.group(2)) or "").endswith(".KQ"):
+            continue
+        kind, code, rest = match.groups()
+        new_name = f"{kind}_{code}_KQ{rest}"
+        src, dst = os.path.join(model_dir, name), os.path.join(model_dir, new_name)
+        if os.path.exists(dst):
+            continue
+        if kind == "meta":
+            # 학습 이력의 symbol 필드도 새 접미사로 맞춤
+            try:
+                with open(src, encoding="utf-8") as f:
+                    meta = json.load(f)
+                meta["symbol"] = f"{code}.KQ"
+                with open(src, "w", encoding="utf-8") as f:
+                    json.dump(meta, f, ensure_ascii=False)
+            except (OSError, ValueError):
+                pass
+        os.replace(src, dst)
+        renamed.append((name, new_name))
+    return renamed
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="종목 마스터 갱신 / 검색")
+    parser.add_argument("queries", nargs="*", help="검색어 (없으면 마스터만 갱신)")
+    parser.add_argument("--refresh", action="store_true", help="기간과 무관하게 마스터를 다시 받음")
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument("--migrate-artifacts", metavar="MODEL_DIR", nargs="?", const="models",
+                        help="KOSDAQ 종목의 이전 _KS 산출물 이름을 _KQ 로 변경 (기본 폴더: models)")
+    args = parser.parse_args()
+
+    if args.migrate_artifacts:
+        renamed = migrate_artifacts(args.migrate_artifacts)
+        for old, new in renamed:
+            print(f"  {old} → {new}")
+        print(f"{len(renamed)}개 산출물 이름 변경")
+        raise SystemExit
+
+    if args.refresh or not args.queries:
+        start = time.perf_counter()
+        master = refresh_master()
+        print(f"{len(master)} 종목 ({time.perf_counter() - start:.1f}초) → {MASTER_PATH}")
+        print(master["market"].value_counts().to_string())
+    index = get_index()
+    for query in args.queries:
+        print(f"{query}:")
+        for m in index.search(query, args.limit):
+            print(f"  {m.symbol:<10} {m.name:<16} {m.kind:<8} {m.score:.2f}")
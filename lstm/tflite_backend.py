@@ -0,0 +1,186 @@
+# tflite_backend.py
+"""
+저장된 LSTM 모델의 TFLite 변환 및 경량 추론 백엔드.
+
+    python tflite_backend.py 005930.KS --time-steps 60 [--quantize float16] [--max-drift 0.01]
+
+model_{safe}_{ts}.keras 를 한 스텝 예측 그래프(batch=1)로 고정해 변환하고, 같은 폴더에
+model_{safe}_{ts}[_f16|_int8].tflite 로 저장합니다. 변환 직후 홀드아웃 윈도에서 Keras 모델과의
+예측 차이(drift)를 측정해 허용치를 넘으면 변환본을 남기지 않습니다.
+
+추론 시에는 ai_edge_litert → tflite_runtime → tf.lite 순서로 인터프리터를 찾으므로,
+앞의 두 패키지 중 하나가 설치돼 있으면 TensorFlow 를 가져오지 않고 예측할 수 있습니다.
+"""
+
+import os
+import threading
+
+import numpy as np
+
+from model_registry import MODEL_DIR, artifact_paths, tflite_path
+
+QUANTIZE_CHOICES = (None, "float16", "int8")
+INTERPRETER_THREADS = int(os.getenv("ECOS_TFLITE_THREADS", "1"))
+
+
+def _interpreter_class():
+    try:
+        from ai_edge_litert.interpreter import Interpreter
+    except ImportError:
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            import tensorflow as tf
+            Interpreter = tf.lite.Interpreter
+    return Interpreter
+
+
+class TFLiteModel:
+    """
+    TFLite 한 스텝 모델. model(x, training=False) 형태로도 호출할 수 있어
+    Keras 모델을 받는 예측 루프에 그대로 넘길 수 있습니다.
+    """
+
+    def __init__(self, path, num_threads=INTERPRETER_THREADS):
+        with open(path, "rb") as f:
+            self._content = f.read()
+        self.path = path
+        self.nbytes = len(self._content)
+        self._interpreter = _interpreter_class()(model_content=self._content, num_threads=num_threads)
+        self._interpreter.allocate_tensors()
+        self._input = self._interpreter.get_input_details()[0]
+        self._output = self._interpreter.get_output_details()[0]
+        self.input_shape = tuple(int(d) for d in self._input["shape"])   # (1, time_steps, n_features)
+        self._lock = threading.Lock()   # 인터프리터는 스레드 안전하지 않음
+
+    def predict_one(self, window) -> float:
+        """(time_steps, n_features) 윈도 하나의 다음 정규화 종가."""
+        x = np.asarray(window, dtype=np.float32).reshape(self.input_shape)
+        with self._lock:
+            self._interpreter.set_tensor(self._input["index"], x)
+            self._interpreter.invoke()
+            return float(self._interpreter.get_tensor(self._output["index"]).ravel()[0])
+
+    def predict(self, X) -> np.ndarray:
+        """(n, time_steps, n_features) 윈도들의 예측 (n,)."""
+        return np.array([self.predict_one(x) for x in X], dtype=np.float32)
+
+    def __call__(self, x, training=False):
+        return self.predict(np.asarray(x).reshape((-1,) + self.input_shape[1:]))[:, None]
+
+    def rollout(self, window, horizon=30) -> np.ndarray:
+        """predict.compiled_rollout 과 같은 자기회귀 예측 (종가 외 피처는 마지막 값 유지)."""
+        x = np.array(window, dtype=np.float32).reshape(self.input_shape[1:])
+        preds = np.empty(horizon, dtype=np.float32)
+        for step in range(horizon):
+            y = self.predict_one(x)
+            preds[step] = y
+            next_row = x[-1].copy()
+            next_row[0] = y
+            x = np.concatenate([x[1:], next_row[None]])
+        return preds
+
+
+def convert(model, quantize=None) -> bytes:
+    """Keras 모델을 batch=1 한 스텝 TFLite 플랫버퍼로 변환합니다."""
+    import tensorflow as tf
+    # 변수를 상수로 고정하지 않으면 LSTM while 루프 안의 READ_VARIABLE 이 인터프리터에서 실패함
+    from tensorflow.python.framework.convert_to_constants import convert_variables_to_constants_v2
+
+    if quantize not in QUANTIZE_CHOICES:
+        raise ValueError(f"지원하지 않는 양자화 방식: {quantize}")
+
+    @tf.function(input_signature=[tf.TensorSpec((1,) + tuple(model.input_shape[1:]), tf.float32)])
+    def step(x):
+        return model(x, training=False)
+
+    converter = tf.lite.TFLiteConverter.from_concrete_functions(
+        [convert_variables_to_constants_v2(step.get_concrete_function())])
+    if quantize is not None:
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]   # int8: 가중치 동적 범위 양자화
+    if quantize == "float16":
+        converter.target_spec.supported_types = [tf.float16]
+    return converter.convert()
+
+
+def drift_report(model, tflite_model, X, horizon=30) -> dict:
+    """홀드아웃 윈도 X 에서 한 스텝 예측과 마지막 윈도의 horizon 예측 차이 (정규화 값 기준)."""
+    from predict import compiled_rollout
+
+    X = np.asarray(X, dtype=np.float32)
+    keras_pred = model.predict(X, verbose=0, batch_size=256).ravel()
+    lite_pred = tflite_model.predict(X)
+    keras_roll = compiled_rollout(model, horizon)(X[-1:]).numpy()[0]
+    lite_roll = tflite_model.rollout(X[-1], horizon)
+    return {
+        "windows": len(X),
+        "max_abs": float(np.max(np.abs(keras_pred - lite_pred))),
+        "mean_abs": float(np.mean(np.abs(keras_pred - lite_pred))),
+        "rollout_max_abs": float(np.max(np.abs(keras_roll - lite_roll))),
+    }
+
+
+def holdout_windows(df, scaler, time_steps, train_ratio=0.8):
+    """trainer.train_model 과 같은 방식으로 나눈 테스트 구간 윈도."""
+    from indicators import FEATURES, add_technical_indicators
+    from windows import chronological_split, make_windows
+
+    scaled = scaler.transform(add_technical_indicators(df)[FEATURES].values)
+    X, y = make_windows(scaled, time_steps)
+    return chronological_split(X, y, train_ratio)[1]
+
+
+def export_symbol(symbol, time_steps=60, quantize=None, model_dir=MODEL_DIR, df=None,
+                  max_drift=None) -> dict:
+    """
+    저장된 Keras 모델을 TFLite 로 변환·저장하고 drift 보고서를 반환합니다.
+    max_drift 를 주면 한 스텝 예측 최대 오차가 이를 넘을 때 변환본을 지우고 ValueError.
+    """
+    from tensorflow.keras.models import load_model
+
+    from scaling import load_scaler
+
+    model_path, scaler_path = artifact_paths(symbol, time_steps, model_dir)
+    model = load_model(model_path)
+    out_path = tflite_path(symbol, time_steps, quantize, model_dir)
+
+    tmp_path = f"{out_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(convert(model, quantize))
+    os.replace(tmp_path, out_path)
+
+    report = {"path": out_path, "bytes": os.path.getsize(out_path),
+              "keras_bytes": os.path.getsize(model_path), "quantize": quantize}
+    if df is None:
+        import ohlcv_store
+        df = ohlcv_store.read(symbol.split(".")[0])
+    if df is not None and not df.empty:
+        X_test = holdout_windows(df, load_scaler(scaler_path), time_steps)
+        if len(X_test):
+            report.update(drift_report(model, TFLiteModel(out_path), X_test))
+    if max_drift is not None and report.get("max_abs", 0.0) > max_drift:
+        os.remove(out_path)
+        raise ValueError(f"TFLite 변환 오차 {report['max_abs']:.5f} > 허용치 {max_drift} (변환본 삭제)")
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="저장된 LSTM 모델을 TFLite 로 변환")
+    parser.add_argument("symbols", nargs="+", help="예: 005930.KS 000660.KS")
+    parser.add_argument("--time-steps", type=int, default=60)
+    parser.add_argument("--quantize", choices=["float16", "int8"])
+    parser.add_argument("--model-dir", default=MODEL_DIR)
+    parser.add_argument("--max-drift", type=float, help="허용할 한 스텝 예측 최대 오차 (정규화 값)")
+    args = parser.parse_args()
+
+    for sym in args.symbols:
+        try:
+            r = export_symbol(sym, args.time_steps, args.quantize, args.model_dir, max_drift=args.max_drift)
+        except Exception as e:
+            print(f"{sym:<10} 실패: {e}")
+            continue
+        drift = (f"max {r['max_abs']:.2e} mean {r['mean_abs']:.2e} rollout {r['rollout_max_abs']:.2e} "
+                 f"({r['windows']} windows)" if "max_abs" in r else "drift 미측정 (시세 없음)")
+        print(f"{sym:<10} {r['keras_bytes'] / 1024:7.0f} KB → {r['bytes'] / 1024:7.0f} KB  {drift}")
@@ -0,0 +1,166 @@
+# train_batch.py
+"""
+Streamlit 없이 여러 종목을 프로세스 풀에서 병렬 학습하는 CLI (cron/야간 배치용).
+
+    python train_batch.py 005930 000660.KS --time-steps 60 --workers 8 --tf-threads 2
+    python train_batch.py --file universe.txt --summary training_summary.csv
+    python train_batch.py --file universe.txt --update   # 새 거래일만 미세조정
+    python train_batch.py 005930 --mode direct           # 30일 다중 출력 모델
+
+워커마다 TensorFlow 스레드 수를 제한해 코어 수만큼의 종목을 동시에 학습하고,
+앱과 같은 model_{safe}_{ts}.keras / scaler_{safe}_{ts}.npy 산출물과 학습 요약 CSV를 남깁니다.
+"""
+
+import argparse
+import csv
+import multiprocessing as mp
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# 작업마다 Keras 상태를 비워도 TF 런타임이 잡은 메모리는 남으므로 이 수만큼 처리한 워커는 새로 띄움
+WORKER_MAX_TASKS = int(os.getenv("ECOS_WORKER_MAX_TASKS", "10"))
+
+SUMMARY_FIELDS = ["symbol", "time_steps", "status", "mode", "rows", "epochs", "new_samples", "load_seconds",
+                  "fit_seconds", "total_seconds", "rmse", "mae", "mape", "error"]
+
+
+def normalize_symbol(symbol: str) -> str:
+    """
+    '005930' → '005930.KS', '035720' / '035720.KS' → '035720.KQ'.
+    접미사는 종목 마스터의 시장으로 정하므로 앱과 같은 산출물 이름(model_{safe}_{ts})이 됩니다.
+    마스터에 없는 코드는 주어진 접미사를 유지하고, 접미사가 없으면 .KS 로 간주합니다.
+    """
+    from symbols import get_index
+
+    symbol = symbol.strip().upper()
+    code, _, suffix = symbol.partition(".")
+    resolved = get_index().symbol_for_code(code) if code.isdigit() else None
+    return resolved or (symbol if suffix else f"{code}.KS")
+
+
+def init_worker(tf_threads: int):
+    """워커 프로세스에서 TensorFlow 를 가져오기 전에 스레드 수를 고정합니다."""
+    os.environ["OMP_NUM_THREADS"] = str(tf_threads)
+    os.environ["TF_NUM_INTRAOP_THREADS"] = str(tf_threads)
+    os.environ["TF_NUM_INTEROP_THREADS"] = "1"
+    os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "2")
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(tf_threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+
+def worker_pool(workers: int, tf_threads: int) -> ProcessPoolExecutor:
+    """학습 워커 풀 (train_batch / sweep / jobs 공용): spawn, TF 스레드 고정, WORKER_MAX_TASKS 마다 교체."""
+    kwargs = {}
+    if WORKER_MAX_TASKS > 0 and sys.version_info >= (3, 11):
+        kwargs["max_tasks_per_child"] = WORKER_MAX_TASKS
+    # fork 된 프로세스에서는 이미 초기화된 TF 스레드 설정을 바꿀 수 없으므로 spawn 사용
+    return ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn"),
+                               initializer=init_worker, initargs=(tf_threads,), **kwargs)
+
+
+def release_worker_memory():
+    """
+    작업 하나가 끝날 때 워커에서 호출: Keras 전역 상태(그래프, 레이어 이름 등)를 비우고 회수합니다.
+    장수 워커가 모델을 계속 만들어도 상주 메모리가 작업 수에 비례해 늘지 않게 합니다.
+    """
+    import gc
+
+    import tensorflow as tf
+    tf.keras.backend.clear_session()
+    gc.collect()
+
+
+def train_symbol(symbol, time_steps, epochs, model_dir, update=False, mode="step"):
+    """
+    워커에서 실행: 시세 갱신 → 학습 → 요약 dict 반환 (모델 객체는 돌려보내지 않음).
+    update=True 이면 기존 모델을 새 거래일로만 미세조정하고, 모델이나 학습 이력이 없을 때만
+    전체 학습합니다 (미세조정은 step 모델만 지원).
+    """
+    import ohlcv_store
+    from model_registry import artifacts_exist, best_train_params
+    from trainer import fine_tune_model, read_training_meta, train_model
+
+    row = {"symbol": symbol, "time_steps": time_steps, "status": "ok", "mode": "full" if mode == "step" else mode}
+    start = time.perf_counter()
+    try:
+        df = ohlcv_store.update(symbol.split(".")[0])
+        row["load_seconds"] = round(time.perf_counter() - start, 3)
+        if df.empty:
+            raise ValueError("시세 데이터 없음")
+        # 학습 이력(meta)이 없는 이전 산출물은 마지막 학습일을 모르므로 전체 학습으로 대체
+        if (update and mode == "step" and artifacts_exist(symbol, time_steps, model_dir)
+                and read_training_meta(symbol, time_steps, model_dir) is not None):
+            result = fine_tune_model(df, symbol, time_steps, model_dir=model_dir)
+            row.update(mode="fine_tune", new_samples=result["new_samples"], epochs=result["epochs"])
+        else:
+            result = train_model(df, symbol, time_steps, epochs=epochs, model_dir=model_dir, mode=mode,
+                                 **best_train_params(symbol, time_steps, model_dir, mode))
+            row.update({k: result[k] for k in ("rows", "epochs", "rmse", "mae", "mape")})
+        row["fit_seconds"] = round(result["fit_seconds"], 3)
+    except Exception as e:
+        row.update(status="error", error=str(e) or type(e).__name__)
+    finally:
+        result = None
+        release_worker_memory()
+    row["total_seconds"] = round(time.perf_counter() - start, 3)
+    return row
+
+
+def run_batch(symbols, time_steps=60, epochs=30, workers=None, tf_threads=2, model_dir="models",
+              update=False, mode="step"):
+    """종목 목록을 프로세스 풀에서 학습하고 요약 행 목록을 완료 순서대로 반환합니다."""
+    workers = workers or max(1, (os.cpu_count() or 1) // tf_threads)
+    rows = []
+    with worker_pool(workers, tf_threads) as pool:
+        futures = [pool.submit(train_symbol, sym, time_steps, epochs, model_dir, update, mode) for sym in symbols]
+        for future in as_completed(futures):
+            row = future.result()
+            rows.append(row)
+            mape = f"{row['mape']:.2f}%" if row.get("mape") is not None else "-"
+            print(f"[{len(rows)}/{len(symbols)}] {row['symbol']:<10} {row['status']:<5} {row['mode']:<9} "
+                  f"{row['total_seconds']:7.1f}s  MAPE {mape}  {row.get('error', '')}", flush=True)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LSTM 모델 일괄 학습")
+    parser.add_argument("symbols", nargs="*", help="종목 코드 (예: 005930 또는 000660.KS)")
+    parser.add_argument("--file", help="한 줄에 한 종목씩 적힌 파일")
+    parser.add_argument("--time-steps", type=int, default=60)
+    parser.add_argument("--epochs", type=int, default=30)
+    parser.add_argument("--workers", type=int, help="동시 학습 프로세스 수 (기본: 코어 수 / tf-threads)")
+    parser.add_argument("--tf-threads", type=int, default=2, help="워커당 TensorFlow 연산 스레드 수")
+    parser.add_argument("--model-dir", default="models")
+    parser.add_argument("--summary", default="training_summary.csv")
+    parser.add_argument("--update", action="store_true",
+                        help="기존 모델은 마지막 학습 이후 새 거래일만 미세조정 (모델이나 학습 이력이 없으면 전체 학습)")
+    parser.add_argument("--mode", choices=["step", "direct"], default="step",
+                        help="step: 한 스텝 예측 반복 / direct: 30일 다중 출력 모델 (..._direct30)")
+    args = parser.parse_args()
+
+    symbols = list(args.symbols)
+    if args.file:
+        with open(args.file, encoding="utf-8") as f:
+            symbols += [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    symbols = list(dict.fromkeys(normalize_symbol(s) for s in symbols))
+    if not symbols:
+        parser.error("학습할 종목이 없습니다.")
+
+    start = time.perf_counter()
+    rows = run_batch(symbols, args.time_steps, args.epochs, args.workers, args.tf_threads, args.model_dir,
+                     args.update, args.mode)
+
+    with open(args.summary, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(sorted(rows, key=lambda r: r["symbol"]))
+
+    ok = sum(r["status"] == "ok" for r in rows)
+    print(f"완료 {ok}/{len(rows)} 종목, 총 {time.perf_counter() - start:.1f}초 → {args.summary}")
+
+
+if __name__ == "__main__":
+    main()
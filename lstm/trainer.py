@@ -0,0 +1,213 @@
+# trainer.py
+"""
+Streamlit에 의존하지 않는 LSTM 학습 코어.
+
+앱의 작업 큐(jobs.py)와 배치 학습 CLI(train_batch.py)가 같은 함수를 사용하며,
+models/ 에 model_{safe}_{ts}.keras / scaler_{safe}_{ts}.npy 산출물과
+마지막 학습 데이터 날짜를 담은 meta_{safe}_{ts}.json 을 저장합니다.
+mode="direct" 는 30일 종가를 한 번에 출력하는 모델을 ..._direct30 이름으로 따로 저장합니다.
+"""
+
+import json
+import os
+import time
+from datetime import datetime
+
+import numpy as np
+from sklearn.metrics import mean_absolute_error, mean_squared_error
+from tensorflow.keras.callbacks import EarlyStopping
+from tensorflow.keras.layers import LSTM, Dense, Input
+from tensorflow.keras.models import Sequential, load_model
+from tensorflow.keras.optimizers import Adam
+
+from indicators import FEATURES, add_technical_indicators
+from model_registry import DIRECT_HORIZON, MODE_DIRECT, MODE_STEP, MODEL_DIR, artifact_paths, meta_path
+from scaling import FeatureScaler, inverse_column, load_scaler, save_scaler
+from windows import WindowSequence, chronological_split, make_direct_windows, make_windows
+
+FINE_TUNE_EPOCHS = 3
+FINE_TUNE_LR = 1e-4   # 기존 가중치를 크게 흔들지 않는 낮은 학습률
+
+
+def build_model(time_steps, n_features, units=100, outputs=1):
+    model = Sequential([
+        Input(shape=(time_steps, n_features)), # Input Layer
+        LSTM(units, return_sequences=True), # The Feature Extractor
+        LSTM(units), # The Pattern Analyzer
+        Dense(50),
+        Dense(outputs) # Output Layer (direct 모드는 horizon일 종가를 한 번에 출력)
+    ])
+    model.compile(optimizer='adam', loss='mse') #Adaptive Moment Estimation
+    return model
+
+
+def scaled_metrics(scaler, y_true_scaled, y_pred_scaled) -> dict:
+    """정규화 값 기준 RMSE/MAE와 가격 기준 MAPE를 계산합니다."""
+    y_true_scaled = np.asarray(y_true_scaled).ravel()
+    y_pred_scaled = np.asarray(y_pred_scaled).ravel()
+    true_price = inverse_column(scaler, y_true_scaled)
+    pred_price = inverse_column(scaler, y_pred_scaled)
+    return {
+        "rmse": float(np.sqrt(mean_squared_error(y_true_scaled, y_pred_scaled))),
+        "mae": float(mean_absolute_error(y_true_scaled, y_pred_scaled)),
+        "mape": float(np.mean(np.abs((true_price - pred_price) / (true_price + 1e-10))) * 100),
+    }
+
+
+def read_training_meta(symbol, time_steps, model_dir=MODEL_DIR, mode=MODE_STEP):
+    """
+    학습 이력 JSON을 읽습니다. 없거나 깨졌으면 None.
+    모델 파일 수정일은 복사/체크아웃으로도 바뀌어 실제 마지막 학습일을 알 수 없으므로 쓰지 않습니다.
+    """
+    try:
+        with open(meta_path(symbol, time_steps, model_dir, mode), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_training_meta(symbol, time_steps, model_dir, last_date, model_mode=MODE_STEP, **extra):
+    meta = {
+        "symbol": symbol,
+        "time_steps": time_steps,
+        "model_mode": model_mode,
+        "last_date": last_date.strftime("%Y-%m-%d"),
+        "trained_at": datetime.now().isoformat(timespec="seconds"),
+        **extra,
+    }
+    with open(meta_path(symbol, time_steps, model_dir, model_mode), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+
+
+def train_model(df, symbol, time_steps=60, epochs=30, batch_size=32, units=100,
+                model_dir=MODEL_DIR, callbacks=None, mode=MODE_STEP) -> dict:
+    """
+    지표 생성 → 스케일링 → 윈도 생성 → 학습 → 테스트 예측 → 산출물 저장을 수행합니다.
+    데이터가 부족하면 ValueError 를 발생시킵니다.
+
+    mode="direct" 이면 같은 13개 피처 윈도에서 다음 DIRECT_HORIZON 일 종가를 한 번에 학습하며,
+    test_y_true/test_y_pred 는 1일 후 값, test_Y_true/test_Y_pred 는 (n, horizon) 전체이고
+    RMSE/MAE/MAPE 는 전 구간 기준입니다.
+
+    반환 dict: model, scaler, processed_df, test_y_true, test_y_pred (정규화 값), test_dates,
+               rows, epochs, fit_seconds, rmse, mae, mape, model_path, scaler_path, mode
+    """
+    df = add_technical_indicators(df)
+    data = df[FEATURES].values
+    horizon = DIRECT_HORIZON if mode == MODE_DIRECT else 1
+
+    if len(data) < time_steps + horizon:
+        raise ValueError(f"지표 생성 후 데이터 부족! {len(data)}일 < {time_steps + horizon}일")
+
+    scaler = FeatureScaler.fit(data)
+    scaled = scaler.transform(data)
+
+    # 슬라이딩 윈도는 scaled 위의 뷰로 만들고, Keras에는 배치 단위로만 복사해 공급
+    if mode == MODE_DIRECT:
+        X, y = make_direct_windows(scaled, time_steps, horizon)
+    else:
+        X, y = make_windows(scaled, time_steps)
+    X_train, X_test, y_train, y_test = chronological_split(X, y, 0.8)
+    test_dates = df.index[time_steps:][len(X_train):len(X)]
+
+    model = build_model(time_steps, len(FEATURES), units, outputs=horizon)
+
+    start = time.perf_counter()
+    history = model.fit(WindowSequence(X_train, y_train, batch_size=batch_size, shuffle=True),
+                        epochs=epochs, verbose=0,
+                        # EarlyStopping으로 7번 학습 시에도 Loss값 개선되지 않을 시 과적합으로 판단 (방지용)
+                        callbacks=[EarlyStopping(patience=7, restore_best_weights=True, monitor='loss')]
+                        + list(callbacks or []))
+    fit_seconds = time.perf_counter() - start
+
+    test_Y_true = np.array(y_test).reshape(len(y_test), horizon)
+    test_Y_pred = model.predict(WindowSequence(X_test, batch_size=256), verbose=0).reshape(len(y_test), horizon)
+    test_y_true, test_y_pred = test_Y_true[:, 0], test_Y_pred[:, 0]
+
+    os.makedirs(model_dir, exist_ok=True)
+    model_path, scaler_path = artifact_paths(symbol, time_steps, model_dir, mode)
+    scaler_path = save_scaler(scaler, scaler_path)   # 이전 버전의 .pkl 이 있으면 .npy 로 교체
+    model.save(model_path)
+    _write_training_meta(symbol, time_steps, model_dir, df.index[-1], model_mode=mode,
+                         mode="full", rows=len(data), units=units, batch_size=batch_size)
+
+    result = {
+        "model": model,
+        "scaler": scaler,
+        "processed_df": df,
+        "test_y_true": test_y_true,
+        "test_y_pred": test_y_pred,
+        "test_dates": test_dates,
+        "rows": len(data),
+        "epochs": len(history.history.get("loss", [])),
+        "fit_seconds": fit_seconds,
+        "model_path": model_path,
+        "scaler_path": scaler_path,
+        "mode": mode,
+        **(scaled_metrics(scaler, test_Y_true, test_Y_pred) if len(test_y_true) else
+           {"rmse": None, "mae": None, "mape": None}),
+    }
+    if mode == MODE_DIRECT:
+        result.update(test_Y_true=test_Y_true, test_Y_pred=test_Y_pred)
+    return result
+
+
+def fine_tune_model(df, symbol, time_steps=60, epochs=FINE_TUNE_EPOCHS, batch_size=32,
+                    model_dir=MODEL_DIR, callbacks=None) -> dict:
+    """
+    기존 모델을 불러와 마지막 학습일 이후에 추가된 거래일의 윈도로만 몇 에폭 미세조정합니다.
+
+    스케일러는 다시 학습하지 않고 기존 min/max 를 그대로 사용합니다 (가중치가 그 스케일에
+    맞춰져 있으므로). 새 데이터가 기존 범위를 벗어난 비율은 out_of_range 로 보고하며,
+    이 값이 커지면 전체 재학습을 고려해야 합니다. 모델이 없거나, 마지막 학습일을 담은 학습 이력
+    JSON 이 없으면(이전 버전 산출물) 어느 거래일부터 학습할지 알 수 없으므로 FileNotFoundError.
+
+    반환 dict: model, scaler, new_samples, epochs, fit_seconds, loss_before, loss_after,
+               out_of_range, last_date
+    """
+    model_path, scaler_path = artifact_paths(symbol, time_steps, model_dir)
+    if not os.path.exists(model_path) or not os.path.exists(scaler_path):
+        raise FileNotFoundError(f"{symbol} ({time_steps}) 모델이 없습니다. 먼저 전체 학습을 실행하세요.")
+    meta = read_training_meta(symbol, time_steps, model_dir)
+    if meta is None:
+        raise FileNotFoundError(f"{symbol} ({time_steps}) 학습 이력(meta)이 없어 마지막 학습일을 알 수 없습니다. "
+                                "전체 재학습을 한 번 실행하세요.")
+
+    scaler = load_scaler(scaler_path)
+    df = add_technical_indicators(df)
+    scaled = scaler.transform(df[FEATURES].values)
+
+    X, y = make_windows(scaled, time_steps)
+    target_dates = df.index[time_steps:]
+    new_mask = np.asarray(target_dates > np.datetime64(meta["last_date"]))
+    new_samples = int(new_mask.sum())
+
+    result = {"scaler": scaler, "new_samples": new_samples, "epochs": 0, "fit_seconds": 0.0,
+              "loss_before": None, "loss_after": None, "out_of_range": 0.0,
+              "last_date": meta["last_date"], "model": None}
+    if new_samples == 0:
+        return result
+
+    X_new = np.ascontiguousarray(X[new_mask], dtype=np.float32)
+    y_new = np.asarray(y[new_mask], dtype=np.float32)
+    new_rows = scaled[time_steps:][new_mask]
+    result["out_of_range"] = float(np.mean((new_rows < 0) | (new_rows > 1)))
+
+    model = load_model(model_path)
+    # 저장된 옵티마이저 상태 대신 낮은 학습률로 다시 컴파일
+    model.compile(optimizer=Adam(learning_rate=FINE_TUNE_LR), loss='mse')
+    result["loss_before"] = float(model.evaluate(X_new, y_new, verbose=0))
+
+    start = time.perf_counter()
+    model.fit(X_new, y_new, epochs=epochs, batch_size=batch_size, shuffle=True, verbose=0,
+              callbacks=list(callbacks or []))
+    result["fit_seconds"] = time.perf_counter() - start
+    result["loss_after"] = float(model.evaluate(X_new, y_new, verbose=0))
+    result["epochs"] = epochs
+
+    model.save(model_path)
+    _write_training_meta(symbol, time_steps, model_dir, df.index[-1], mode="fine_tune",
+                         new_samples=new_samples, previous_last_date=meta["last_date"])
+    result["model"] = model
+    result["last_date"] = df.index[-1].strftime("%Y-%m-%d")
+    return result
@@ -0,0 +1,244 @@
+# universe.py
+"""
+KOSPI/KOSDAQ 전 종목 기업 가치 지표 일일 스냅샷 (Parquet).
+
+    python universe.py                       # 최근 거래일, KOSPI + KOSDAQ
+    python universe.py --date 20240105 --naver-fill all --workers 8 --rate 5
+
+KRX 시장 전체 조회(pykrx)로 시장당 요청 몇 번에 PER/PBR/배당수익률/시가총액/외국인 지분율을
+받고, KRX 에 없는 종목(또는 pykrx 를 쓸 수 없을 때 --codes 로 준 종목)만 속도 제한 아래에서
+네이버 종목 페이지를 동시에 파싱해 채웁니다(fundamentals.get_fundamentals). PSR 은 KRX 에
+없으므로 --naver-fill all 이면 종목 페이지 값으로, 그 밖에는 스냅샷을 만들 때 종목 페이지 디스크 캐시
+(fundamentals.read_cached, 요청 없음)의 연간 매출액과 KRX 시가총액으로 계산해 채웁니다.
+
+foreign_ownership 은 출처에 따라 의미가 다릅니다. KRX 값은 상장주식 대비 외국인 보유 비율(지분율)이고,
+네이버 값은 외국인 한도 대비 보유 비율(소진율)입니다. 한도가 100% 가 아닌 종목에서는 두 값이 다르며,
+--naver-fill all 이면 겹치는 종목의 KRX 지분율이 네이버 소진율로 덮어써집니다.
+
+결과는 data/universe/fundamentals_{YYYYMMDD}.parquet 과 최신본 fundamentals.parquet 에 저장되고,
+앱은 lookup(code) 로 이 파일에서 바로 읽으므로 종목 화면을 열 때 HTTP 요청이 없습니다.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from fundamentals import FUNDAMENTALS_TTL, Fundamentals, get_fundamentals, read_cached
+from sise_fetcher import RateLimiter
+
+UNIVERSE_DIR = os.path.join("data", "universe")
+SNAPSHOT_NAME = "fundamentals.parquet"
+SNAPSHOT_MAX_AGE_DAYS = float(os.getenv("ECOS_UNIVERSE_MAX_AGE_DAYS", "4"))   # 주말/연휴 포함
+MARKETS = ("KOSPI", "KOSDAQ")
+NAVER_WORKERS = 8
+NAVER_RATE = 5.0   # 초당 최대 요청 수
+FILL_CHOICES = ("none", "missing", "all")
+
+COLUMNS = ["code", "name", "market", "per", "pbr", "psr", "dividend_yield", "market_cap",
+           "foreign_ownership", "revenue", "source", "as_of"]
+_VALUE_FIELDS = ("per", "pbr", "psr", "dividend_yield", "market_cap", "foreign_ownership", "revenue")
+
+
+def _latest_path(universe_dir):
+    return os.path.join(universe_dir, SNAPSHOT_NAME)
+
+
+def krx_snapshot(date: str = None, markets=MARKETS) -> pd.DataFrame:
+    """pykrx 시장 전체 조회로 만든 스냅샷 (시장당 3회 요청). pykrx 가 없으면 ImportError."""
+    from pykrx import stock
+
+    date = stock.get_nearest_business_day_in_a_week(date or datetime.now().strftime("%Y%m%d"))
+    frames = []
+    for market in markets:
+        fund = stock.get_market_fundamental(date, market=market)                      # BPS PER PBR EPS DIV DPS
+        cap = stock.get_market_cap(date, market=market)                               # 종가 시가총액 ...
+        foreign = stock.get_exhaustion_rates_of_foreign_investment(date, market=market)   # ... 지분율 ...
+
+        codes = cap.index.union(fund.index)
+        frame = pd.DataFrame(index=codes)
+        frame["code"] = codes
+        frame["name"] = [stock.get_market_ticker_name(code) for code in codes]
+        frame["market"] = market
+        # KRX 는 적자 등으로 의미 없는 PER/PBR 을 0 으로 내려줌 → 결측 처리
+        frame["per"] = fund["PER"].replace(0, np.nan)
+        frame["pbr"] = fund["PBR"].replace(0, np.nan)
+        frame["psr"] = np.nan
+        frame["dividend_yield"] = fund["DIV"]
+        frame["market_cap"] = cap["시가총액"] / 1e12   # 원 → 조 원
+        frame["foreign_ownership"] = foreign["지분율"] if "지분율" in foreign else np.nan
+        frame["revenue"] = np.nan
+        frames.append(frame)
+
+    snapshot = pd.concat(frames, ignore_index=True)
+    snapshot["source"] = "krx"
+    snapshot["as_of"] = pd.Timestamp(date)
+    return snapshot[COLUMNS]
+
+
+def naver_rows(codes, workers: int = NAVER_WORKERS, rate: float = NAVER_RATE,
+               ttl: float = FUNDAMENTALS_TTL) -> pd.DataFrame:
+    """네이버 종목 페이지를 제한된 동시성/속도로 파싱한 행들 (실패한 종목은 attrs['errors'])."""
+    limiter = RateLimiter(rate)
+    errors = {}
+    lock = threading.Lock()
+
+    def one(code):
+        limiter.wait()
+        try:
+            return get_fundamentals(code, ttl=ttl)
+        except Exception as e:
+            with lock:
+                errors[code] = str(e) or type(e).__name__
+            return None
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        records = [r for r in pool.map(one, codes) if r is not None]
+
+    today = pd.Timestamp(datetime.now().date())
+    rows = pd.DataFrame([{**{k: getattr(r, k) for k in _VALUE_FIELDS}, "code": r.code, "name": None,
+                          "market": None, "source": "naver", "as_of": today} for r in records],
+                        columns=COLUMNS)
+    rows.attrs["errors"] = errors
+    return rows
+
+
+def build_snapshot(date: str = None, markets=MARKETS, codes=None, naver_fill: str = "missing",
+                   workers: int = NAVER_WORKERS, rate: float = NAVER_RATE) -> pd.DataFrame:
+    """
+    KRX 스냅샷에 네이버 파싱 결과를 합칩니다.
+    naver_fill="missing": KRX 에 없는 codes 만, "all": 모든 종목(PSR 포함, 네이버 값 우선), "none": KRX 만.
+    pykrx 를 쓸 수 없으면 codes 의 네이버 파싱 결과만으로 만듭니다.
+    """
+    errors = {}
+    try:
+        snapshot = krx_snapshot(date, markets)
+    except ImportError:
+        if not codes:
+            raise ValueError("pykrx 가 설치되지 않았습니다. --codes/--file 로 종목을 지정하세요.")
+        snapshot = pd.DataFrame(columns=COLUMNS)
+        naver_fill = "all"
+
+    if naver_fill == "all":
+        targets = list(dict.fromkeys(list(codes or []) + snapshot["code"].tolist()))
+    elif naver_fill == "missing":
+        targets = [c for c in dict.fromkeys(codes or []) if c not in set(snapshot["code"])]
+    else:
+        targets = []
+
+    if targets:
+        naver = naver_rows(targets, workers, rate)
+        errors = naver.attrs["errors"]
+        if len(snapshot):
+            # 겹치는 종목은 네이버 값이 있는 칸만 덮어쓰고(이름/시장은 KRX 유지), 새 종목은 추가
+            merged = snapshot.set_index("code")
+            update = naver.set_index("code")
+            overlap = update.index.intersection(merged.index)
+            merged.update(update.loc[overlap, list(_VALUE_FIELDS)])
+            merged.loc[overlap, "source"] = "krx+naver"
+            merged = pd.concat([merged, update.loc[update.index.difference(merged.index)]])
+            snapshot = merged.rename_axis("code").reset_index()[COLUMNS]
+        else:
+            snapshot = naver
+
+    snapshot = fill_psr_from_cache(snapshot)
+    snapshot = snapshot.sort_values("code", ignore_index=True)
+    snapshot.attrs["errors"] = errors
+    return snapshot
+
+
+def fill_psr_from_cache(snapshot: pd.DataFrame) -> pd.DataFrame:
+    """
+    PSR 이 없는 행을 종목 페이지 디스크 캐시의 연간 매출액으로 채웁니다 (네트워크 접근 없음).
+    매출액은 연간 실적이므로 캐시의 TTL 과 무관하게 쓰고, 시가총액은 스냅샷 값을 씁니다.
+    """
+    for i in snapshot.index[snapshot["psr"].isna()]:
+        cached = read_cached(snapshot.at[i, "code"])
+        revenue = cached.revenue if cached is not None else None
+        if pd.isna(snapshot.at[i, "revenue"]) and revenue:
+            snapshot.at[i, "revenue"] = revenue
+        market_cap, revenue = snapshot.at[i, "market_cap"], snapshot.at[i, "revenue"]
+        if pd.notna(market_cap) and pd.notna(revenue) and revenue > 0:
+            snapshot.at[i, "psr"] = round(market_cap / revenue, 2)
+    return snapshot
+
+
+def write_snapshot(snapshot: pd.DataFrame, universe_dir: str = UNIVERSE_DIR) -> str:
+    """날짜별 파일과 최신본을 임시 파일에 쓴 뒤 교체합니다. 최신본 경로를 반환."""
+    os.makedirs(universe_dir, exist_ok=True)
+    as_of = pd.to_datetime(snapshot["as_of"]).max() if len(snapshot) else pd.Timestamp(datetime.now())
+    paths = [os.path.join(universe_dir, f"fundamentals_{as_of:%Y%m%d}.parquet"), _latest_path(universe_dir)]
+    for path in paths:
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        snapshot.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+    return paths[-1]
+
+
+_snapshot_cache = {"signature": None, "table": None}
+_snapshot_lock = threading.Lock()
+
+
+def load_snapshot(universe_dir: str = UNIVERSE_DIR):
+    """code 로 색인된 최신 스냅샷 (파일이 바뀌었을 때만 다시 읽음). 없으면 None."""
+    path = _latest_path(universe_dir)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    signature = (path, stat.st_mtime_ns, stat.st_size)
+    with _snapshot_lock:
+        if _snapshot_cache["signature"] != signature:
+            _snapshot_cache["table"] = pd.read_parquet(path).set_index("code")
+            _snapshot_cache["signature"] = signature
+        return _snapshot_cache["table"]
+
+
+def lookup(code: str, max_age_days: float = SNAPSHOT_MAX_AGE_DAYS, universe_dir: str = UNIVERSE_DIR):
+    """
+    스냅샷의 한 종목을 Fundamentals 로 반환합니다 (네트워크 접근 없음).
+    스냅샷이 없거나, 종목이 없거나, 기준일이 max_age_days 보다 오래됐으면 None.
+    """
+    table = load_snapshot(universe_dir)
+    if table is None or code not in table.index:
+        return None
+    row = table.loc[code]
+    as_of = pd.Timestamp(row["as_of"])
+    if (pd.Timestamp(datetime.now()) - as_of).days > max_age_days:
+        return None
+    # revenue 열이 없던 이전 스냅샷도 읽을 수 있도록 없는 열은 None
+    values = {k: (None if pd.isna(row.get(k)) else round(float(row[k]), 2)) for k in _VALUE_FIELDS}
+    return Fundamentals(code=code, fetched_at=as_of.timestamp(), **values)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="KOSPI/KOSDAQ 기업 가치 지표 스냅샷 생성")
+    parser.add_argument("--date", help="기준일 YYYYMMDD (기본값: 최근 거래일)")
+    parser.add_argument("--markets", nargs="+", default=list(MARKETS))
+    parser.add_argument("--codes", nargs="*", default=[], help="네이버로 채울 6자리 종목 코드")
+    parser.add_argument("--file", help="한 줄에 한 종목 코드씩 적힌 파일")
+    parser.add_argument("--naver-fill", choices=FILL_CHOICES, default="missing")
+    parser.add_argument("--workers", type=int, default=NAVER_WORKERS)
+    parser.add_argument("--rate", type=float, default=NAVER_RATE, help="네이버 초당 요청 제한")
+    parser.add_argument("--universe-dir", default=UNIVERSE_DIR)
+    args = parser.parse_args()
+
+    codes = [c.split(".")[0] for c in args.codes]
+    if args.file:
+        with open(args.file, encoding="utf-8") as f:
+            codes += [line.strip().split(".")[0] for line in f if line.strip() and not line.startswith("#")]
+
+    start = time.perf_counter()
+    table = build_snapshot(args.date, args.markets, codes, args.naver_fill, args.workers, args.rate)
+    path = write_snapshot(table, args.universe_dir)
+    print(f"{len(table)} 종목 ({time.perf_counter() - start:.1f}초) → {path}")
+    for source, count in table["source"].value_counts().items():
+        print(f"  {source:<10} {count}")
+    for code, msg in table.attrs["errors"].items():
+        print(f"  실패 {code}: {msg}")
@@ -0,0 +1,71 @@
+# windows.py
+"""
+LSTM 학습용 슬라이딩 윈도 데이터셋.
+
+(N, 13) 스케일 배열 위에 스트라이드 뷰로 (N - time_steps, time_steps, 13) 윈도를 만들고,
+Keras에는 배치 단위로만 복사해 공급하므로 3차원 텐서 전체를 메모리에 만들지 않습니다.
+"""
+
+import math
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from tensorflow.keras.utils import Sequence
+
+
+def make_windows(scaled, time_steps, target_col=0):
+    """
+    X[i] = scaled[i:i + time_steps], y[i] = scaled[i + time_steps, target_col].
+    둘 다 scaled 의 뷰이며 데이터 복사가 일어나지 않습니다.
+    """
+    X = sliding_window_view(scaled[:-1], time_steps, axis=0).transpose(0, 2, 1)
+    y = scaled[time_steps:, target_col]
+    return X, y
+
+
+def make_direct_windows(scaled, time_steps, horizon, target_col=0):
+    """
+    다중 출력(직접 horizon일) 모델용 윈도.
+    X[i] = scaled[i:i + time_steps], Y[i] = scaled[i + time_steps:i + time_steps + horizon, target_col].
+    make_windows 와 같은 시작점을 쓰되 뒤쪽 horizon - 1 개 샘플은 목표가 모자라 제외됩니다.
+    """
+    X = sliding_window_view(scaled[:len(scaled) - horizon], time_steps, axis=0).transpose(0, 2, 1)
+    Y = sliding_window_view(scaled[time_steps:, target_col], horizon)
+    return X, Y
+
+
+def chronological_split(X, y, train_ratio=0.8):
+    """시간 순서를 유지한 학습/테스트 분할 (뷰 슬라이싱이므로 복사 없음)."""
+    train_size = int(len(X) * train_ratio)
+    return X[:train_size], X[train_size:], y[:train_size], y[train_size:]
+
+
+class WindowSequence(Sequence):
+    """윈도 뷰에서 요청된 배치만 float32 로 복사해 돌려주는 Keras 데이터셋."""
+
+    def __init__(self, X, y=None, batch_size=32, shuffle=False, seed=None, **kwargs):
+        super().__init__(**kwargs)
+        self.X = X
+        self.y = y
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self._rng = np.random.default_rng(seed)
+        self._order = np.arange(len(X))
+        if shuffle:
+            self._rng.shuffle(self._order)
+
+    def __len__(self):
+        return math.ceil(len(self.X) / self.batch_size)
+
+    def __getitem__(self, idx):
+        lo, hi = idx * self.batch_size, (idx + 1) * self.batch_size
+        ids = self._order[lo:hi] if self.shuffle else slice(lo, hi)
+        xb = np.asarray(self.X[ids], dtype=np.float32)
+        if self.y is None:
+            return (xb,)
+        return xb, np.asarray(self.y[ids], dtype=np.float32)
+
+    def on_epoch_end(self):
+        # model.fit(배열)의 기본 동작처럼 에폭마다 샘플 순서를 섞음
+        if self.shuffle:
+            self._rng.shuffle(self._order)